@@ -0,0 +1,148 @@
+import copy
+import numpy as np
+import pandas as pd
+from ligand_index import BEST_POSE, RAW_POSES
+from stats_engine import DatasetStats, NUMERIC_COLUMNS
+
+class SeenHashes:
+    # Exact cross-chunk dedup state: 8 bytes per unique row, kept as sorted
+    # runs that are merged like a binary counter so inserts stay O(log n).
+    def __init__(self):
+        self.runs = []
+    
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+    
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == hashes
+        return found
+    
+    def add(self, hashes):
+        run = np.sort(hashes)
+        while self.runs and len(self.runs[-1]) <= len(run):
+            run = np.sort(np.concatenate((self.runs.pop(), run)), kind='mergesort')
+        self.runs.append(run)
+    
+    def filter_new(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        _, first = np.unique(hashes, return_index=True)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first] = True
+        if self.runs:
+            keep &= ~self.contains(hashes)
+        if keep.any():
+            self.add(hashes[keep])
+        return keep
+
+class RunningAggregates:
+    def __init__(self, top_k=10, sample_size=100_000, seed=0):
+        self.top_k = top_k
+        self.sample_size = sample_size
+        self.stats = DatasetStats()
+        self.zero_rmsd_top = None
+        self.all_top = None
+        self.zero_rmsd_best = None
+        self.all_best = None
+        self.sample = None
+        self._sample_keys = np.zeros(0)
+        self._rng = np.random.default_rng(seed)
+    
+    @property
+    def count(self):
+        return self.stats.rows
+    
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return
+        self.stats.update(chunk)
+        self._update_top(chunk)
+        self._update_sample(chunk)
+    
+    def _update_top(self, chunk):
+        required = ['ligand'] + NUMERIC_COLUMNS
+        if not all(col in chunk.columns for col in required):
+            return
+        
+        zero = chunk[(chunk['rmsd_ub'] == 0) & (chunk['rmsd_lb'] == 0)]
+        self.zero_rmsd_top = self._merge_top(self.zero_rmsd_top, zero)
+        self.zero_rmsd_best = self._merge_best(self.zero_rmsd_best, zero)
+        # Only needed while no zero-RMSD pose has been seen
+        if self.zero_rmsd_top is None or len(self.zero_rmsd_top) == 0:
+            self.all_top = self._merge_top(self.all_top, chunk)
+            self.all_best = self._merge_best(self.all_best, chunk)
+        else:
+            self.all_top = None
+            self.all_best = None
+    
+    def _merge_top(self, current, rows):
+        candidates = rows.nsmallest(self.top_k, 'binding_affinity')
+        if current is not None and len(current):
+            candidates = pd.concat([current, candidates])
+            candidates = candidates.nsmallest(self.top_k, 'binding_affinity')
+        return candidates
+    
+    def _merge_best(self, current, rows):
+        # A ligand in the global top-k by best pose is also in the top-k of
+        # every prefix that contains that pose, so keeping k ligands is exact.
+        rows = rows.dropna(subset=['ligand', 'binding_affinity'])
+        if current is not None and len(current):
+            rows = pd.concat([current, rows])
+        if len(rows) == 0:
+            return current
+        rows = rows.reset_index(drop=True)
+        best = rows.loc[rows.groupby('ligand', sort=False)['binding_affinity'].idxmin()]
+        return best.nsmallest(self.top_k, 'binding_affinity')
+    
+    def _update_sample(self, chunk):
+        # Bottom-k sampling on random keys is a uniform reservoir sample
+        keys = self._rng.random(len(chunk))
+        if self.sample is not None:
+            keys = np.concatenate((self._sample_keys, keys))
+            candidates = pd.concat([self.sample, chunk], ignore_index=True)
+        else:
+            candidates = chunk.reset_index(drop=True)
+        
+        if len(candidates) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keep.sort()
+            candidates = candidates.iloc[keep].reset_index(drop=True)
+            keys = keys[keep]
+        
+        self.sample = candidates
+        self._sample_keys = keys
+    
+    def without_sample(self):
+        light = copy.copy(self)
+        light.sample = None
+        light._sample_keys = np.zeros(0)
+        return light
+    
+    def has_column(self, col):
+        return self.stats.has_column(col)
+    
+    def describe(self, col):
+        return self.stats.describe(col)
+    
+    def histogram(self, col, bins=30):
+        return self.stats.histogram(col, bins)
+    
+    def box_stats(self, col):
+        return self.stats.box_stats(col)
+    
+    def top_ligands(self, ranking=RAW_POSES):
+        if ranking == BEST_POSE:
+            zero_top, all_top = self.zero_rmsd_best, self.all_best
+        else:
+            zero_top, all_top = self.zero_rmsd_top, self.all_top
+        
+        if zero_top is not None and len(zero_top):
+            top = zero_top
+        elif all_top is not None:
+            top = all_top
+        else:
+            return pd.DataFrame()
+        return top.sort_values('binding_affinity').head(self.top_k).copy()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pipeline import AnalysisPipeline, STREAMING_THRESHOLD_BYTES
+from ligand_index import BEST_POSE, RANKING_MODES
+from plot_generator import RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+from data_loader import expand_sources, source_label, is_glob
+from pdf_generator import parse_appendix
+from bootstrap import DEFAULT_ITERATIONS, DEFAULT_SEED
+
+MERGED_REPORT_DIR = "merged"
+
+def expand_inputs(patterns):
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if is_glob(pattern) else [pattern]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+def assign_output_dirs(paths, output_root):
+    used = {}
+    output_dirs = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        used[stem] = used.get(stem, 0) + 1
+        name = stem if used[stem] == 1 else f"{stem}_{used[stem]}"
+        output_dirs.append(os.path.join(output_root, name))
+    return output_dirs
+
+def analyze_file(csv_path, output_dir, parallel_plots, streaming_threshold, use_cache, ranking,
+                 render_profile, profile_stages=None, compact=False, appendix=None, store_results=True,
+                 results_db=None, bootstrap_iterations=DEFAULT_ITERATIONS, bootstrap_seed=DEFAULT_SEED):
+    start = time.perf_counter()
+    try:
+        if isinstance(csv_path, str) and not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No such file: {csv_path}")
+        os.makedirs(output_dir, exist_ok=True)
+        pipeline = AnalysisPipeline(csv_path, output_dir, parallel_plots=parallel_plots,
+                                    streaming_threshold=streaming_threshold, use_cache=use_cache,
+                                    ranking=ranking, render_profile=render_profile,
+                                    profile_stages=profile_stages, compact=compact, appendix=appendix,
+                                    store_results=store_results, results_db=results_db,
+                                    bootstrap_iterations=bootstrap_iterations, bootstrap_seed=bootstrap_seed)
+        pdf_path = pipeline.run()
+        return (csv_path, True, pdf_path, time.perf_counter() - start)
+    except Exception as e:
+        detail = f"{e}\n{traceback.format_exc()}"
+        return (csv_path, False, detail, time.perf_counter() - start)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Generate docking analysis reports for many CSV files without a display.")
+    parser.add_argument('inputs', nargs='+',
+                        help="CSV files, directories of AutoDock Vina *_out.pdbqt / log files, or glob "
+                             "patterns (quote patterns, e.g. 'runs/**/*.csv')")
+    parser.add_argument('-o', '--output-root', required=True,
+                        help="Directory that receives one report folder per input")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Number of files processed at the same time (default: CPU count)")
+    parser.add_argument('--parallel-plots', action='store_true',
+                        help="Also render the plots of each file in a process pool")
+    parser.add_argument('--stream-above-mb', type=float, default=STREAMING_THRESHOLD_BYTES / (1024 * 1024),
+                        help="Use the chunked streaming loader for files larger than this (MB)")
+    parser.add_argument('--ranking', choices=RANKING_MODES, default=BEST_POSE,
+                        help="Rank the best pose of each ligand or every pose (default: best_pose)")
+    parser.add_argument('--appendix', metavar='N|all', type=parse_appendix, default=None,
+                        help="Add an appendix ranking the best N ligands, or all of them, to the report")
+    parser.add_argument('--profile', choices=sorted(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE,
+                        help="Plot render profile: draft (fast), publication (300 dpi PNG), vector (PDF) "
+                             "or svg")
+    parser.add_argument('--cprofile', metavar='STAGES', default='',
+                        help="Comma-separated stages to run under cProfile (load, plots, pdf, plot:<method> "
+                             "or *); .prof files are written to <report>/profiles")
+    parser.add_argument('--merge', action='store_true',
+                        help="Combine all inputs (files, directories or patterns) into one dataset and one "
+                             "report, with a 'source' column naming the file of each row")
+    parser.add_argument('--compact', action='store_true',
+                        help="Hold in-memory data compactly (categorical ligands, float32 numbers, only the "
+                             "analysed columns) and write memory_report.json next to each report")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Do not read or write the normalized-data cache")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Do not add the poses and ligand summaries to the results database")
+    parser.add_argument('--results-db', metavar='PATH', default=None,
+                        help="Results database to add to (default: results.sqlite in the cache directory)")
+    parser.add_argument('--bootstrap', metavar='N', type=int, default=DEFAULT_ITERATIONS,
+                        help="Bootstrap resamples behind the top-ligand confidence intervals and rank "
+                             "probabilities (default: 1000, 0 turns them off)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="Random seed for the bootstrap, so reports are reproducible (default: 0)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Print full tracebacks for failed files")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    if args.merge:
+        sources = expand_sources(args.inputs)
+        paths = [sources] if sources else []
+    else:
+        paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No input files matched.", file=sys.stderr)
+        return 2
+    
+    os.makedirs(args.output_root, exist_ok=True)
+    if args.merge:
+        output_dirs = [os.path.join(args.output_root, MERGED_REPORT_DIR)]
+    else:
+        output_dirs = assign_output_dirs(paths, args.output_root)
+    streaming_threshold = int(args.stream_above_mb * 1024 * 1024)
+    jobs = max(1, min(args.jobs, len(paths)))
+    profile_stages = [stage.strip() for stage in args.cprofile.split(',') if stage.strip()]
+    
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(analyze_file, path, output_dir, args.parallel_plots, streaming_threshold,
+                            not args.no_cache, args.ranking, args.profile, profile_stages, args.compact,
+                            args.appendix, not args.no_store, args.results_db, args.bootstrap, args.seed)
+            for path, output_dir in zip(paths, output_dirs)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            csv_path, ok, detail, elapsed = future.result()
+            if not isinstance(csv_path, str):
+                csv_path = source_label(csv_path)
+            if ok:
+                print(f"[{done}/{len(paths)}] OK     {csv_path} -> {detail} ({elapsed:.1f}s)", flush=True)
+            else:
+                failures += 1
+                message = detail if args.verbose else detail.splitlines()[0]
+                print(f"[{done}/{len(paths)}] FAILED {csv_path}: {message}", file=sys.stderr, flush=True)
+    
+    print(f"{len(paths) - failures} succeeded, {failures} failed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,64 @@
+import argparse
+import json
+import sys
+
+DEFAULT_TIME_THRESHOLD = 0.20
+DEFAULT_MEMORY_THRESHOLD = 0.20
+
+# Differences below these are timer and allocator noise, not regressions
+MIN_TIME_DELTA_S = 0.05
+MIN_MEMORY_DELTA_MB = 5.0
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare_results(baseline, current, time_threshold=DEFAULT_TIME_THRESHOLD,
+                    memory_threshold=DEFAULT_MEMORY_THRESHOLD):
+    rows = []
+    for size, result in current['results'].items():
+        base_stages = baseline['results'].get(size, {}).get('stages', {})
+        for stage, measured in result['stages'].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            checks = [
+                ('wall_s', time_threshold, MIN_TIME_DELTA_S),
+                ('peak_mb', memory_threshold, MIN_MEMORY_DELTA_MB)
+            ]
+            for metric, threshold, min_delta in checks:
+                if base.get(metric) is None or measured.get(metric) is None:
+                    continue
+                delta = measured[metric] - base[metric]
+                ratio = measured[metric] / base[metric] if base[metric] > 0 else float('inf')
+                regressed = delta > min_delta and ratio > 1 + threshold
+                rows.append((size, stage, metric, base[metric], measured[metric], ratio, regressed))
+    return rows
+
+def print_comparison(rows, out=sys.stdout):
+    print(f"{'size':>6}  {'stage':<40} {'metric':<8} {'baseline':>10} {'current':>10} {'ratio':>7}",
+          file=out)
+    for size, stage, metric, base, measured, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>6}  {stage:<40} {metric:<8} {base:>10.3f} {measured:>10.3f} {ratio:>7.2f}{flag}",
+              file=out)
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"{regressions} regression(s) in {len(rows)} comparison(s)", file=out)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline', help="Baseline results JSON")
+    parser.add_argument('current', help="Results JSON to check")
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help="Allowed relative wall-time increase (default: 0.20)")
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="Allowed relative peak-memory increase (default: 0.20)")
+    args = parser.parse_args(argv)
+    
+    rows = compare_results(load_results(args.baseline), load_results(args.current),
+                           args.time_threshold, args.memory_threshold)
+    return 1 if print_comparison(rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported before the GUI window is shown
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'mpl_toolkits', 'reportlab', 'PIL', 'seaborn', 'scipy', 'pyarrow']
+
+DEFAULT_MODULES = ['main', 'pipeline']
+DEFAULT_REPEAT = 5
+
+def parse_importtime(stderr, module):
+    # Lines look like "import time:  self [us] | cumulative | imported package";
+    # a package's imports are listed before it, indented one level deeper
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(parts[1]), depth))
+    
+    children = []
+    for name, cumulative, depth in entries:
+        if depth == 0:
+            if name == module:
+                return cumulative, children
+            children = []
+        elif depth == 1:
+            children.append((cumulative, name))
+    raise ValueError(f"{module} not found in -X importtime output")
+
+def measure_import(module, repeat=DEFAULT_REPEAT):
+    # Every run is a fresh interpreter, so nothing is already in sys.modules;
+    # the OS file cache is warm after the first run, which is what a user sees
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))")
+    totals = []
+    heavy = []
+    slowest = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True)
+        total, children = parse_importtime(proc.stderr, module)
+        totals.append(total / 1e6)
+        heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+        slowest = sorted(((cumulative / 1e6, name) for cumulative, name in children), reverse=True)[:10]
+    return {
+        'module': module,
+        'seconds': min(totals),
+        'median_seconds': statistics.median(totals),
+        'heavy_modules': heavy,
+        'slowest_children': [{'module': name, 'seconds': seconds} for seconds, name in slowest]
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how long the application modules take to import.")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES,
+                        help="Modules to import in a fresh interpreter (default: main pipeline)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Fresh interpreters per module; the fastest is reported (default: 5)")
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help="Exit with 1 if importing main takes longer than this")
+    parser.add_argument('-o', '--output', help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+    
+    results = [measure_import(module, max(1, args.repeat)) for module in args.modules]
+    failed = False
+    for result in results:
+        print(f"{result['module']:<12} {result['seconds'] * 1000:8.1f} ms  "
+              f"heavy: {', '.join(result['heavy_modules']) or 'none'}")
+        for child in result['slowest_children'][:5]:
+            print(f"    {child['module']:<30} {child['seconds'] * 1000:8.1f} ms")
+        if result['module'] == 'main':
+            if result['heavy_modules']:
+                print("main imports heavy modules at startup", file=sys.stderr)
+                failed = True
+            if args.max_seconds is not None and result['seconds'] > args.max_seconds:
+                print(f"main took longer than {args.max_seconds:.3f} s to import", file=sys.stderr)
+                failed = True
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,198 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from data_cache import cache_root
+from data_loader import DataLoader
+from dataset_memo import forget
+from ligand_index import RANKING_MODES
+from pdf_generator import PDFGenerator
+from pipeline import AnalysisPipeline, STREAMING_THRESHOLD_BYTES
+from plot_generator import PlotGenerator, PLOT_METHODS, RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+from stats_engine import dataset_stats
+from synthetic_data import synthetic_csv, parse_size, format_size, DEFAULT_SEED
+from compare import compare_results, load_results, print_comparison, \
+    DEFAULT_TIME_THRESHOLD, DEFAULT_MEMORY_THRESHOLD
+
+DEFAULT_SIZES = '10k,100k,1m'
+DEFAULT_REPEAT = 3
+
+MB = 1024 * 1024
+
+def default_data_dir():
+    return os.path.join(cache_root(), "benchmarks")
+
+def measure(func, repeat, trace_memory, setup=None):
+    # Timed runs are untraced; peak memory comes from one extra run under
+    # tracemalloc, which slows allocation-heavy code down too much to time.
+    walls = []
+    cpus = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = func()
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+    
+    peak_mb = None
+    if trace_memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / MB
+        finally:
+            tracemalloc.stop()
+    
+    return {
+        'wall_s': min(walls),
+        'wall_median_s': statistics.median(walls),
+        'cpu_s': min(cpus),
+        'peak_mb': peak_mb,
+        'runs': repeat
+    }, result
+
+def benchmark_size(csv_path, rows, repeat, trace_memory, profile, streaming_threshold):
+    stages = {}
+    with tempfile.TemporaryDirectory(prefix='docking_bench_') as work_dir:
+        plots_dir = os.path.join(work_dir, "plots")
+        os.makedirs(plots_dir)
+        
+        def load():
+            pipeline = AnalysisPipeline(csv_path, work_dir, use_cache=False,
+                                        streaming_threshold=streaming_threshold)
+            pipeline.load()
+            return pipeline
+        
+        stages['load'], pipeline = measure(load, repeat, trace_memory)
+        df, summary = pipeline.df, pipeline.summary
+        
+        def cold():
+            forget(df)
+        
+        def warm_stats():
+            # Plots and the PDF share one statistics pass; it is timed on its own
+            forget(df)
+            dataset_stats(df, summary)
+        
+        stages['stats'], _ = measure(lambda: dataset_stats(df, summary), repeat, trace_memory, cold)
+        
+        loader = DataLoader(csv_path, cache=False)
+        for ranking in RANKING_MODES:
+            if summary is not None:
+                top = lambda: summary.top_ligands(ranking)
+            else:
+                top = lambda: loader.get_top_ligands(df, ranking=ranking)
+            stages[f'top_ligands:{ranking}'], _ = measure(top, repeat, trace_memory, cold)
+        
+        plot_files = []
+        generator = PlotGenerator(df, plots_dir, summary=summary, profile=profile)
+        for name in PLOT_METHODS:
+            stages[f'plot:{name}'], result = measure(getattr(generator, name), repeat, trace_memory,
+                                                     warm_stats)
+            if result is not None:
+                plot_files.append(result)
+        
+        pdf_path = os.path.join(work_dir, "report.pdf")
+        pdf = PDFGenerator(df, plot_files, plots_dir, csv_path, summary=summary)
+        stages['pdf'], _ = measure(lambda: pdf.generate_pdf(pdf_path), repeat, trace_memory, warm_stats)
+    
+    return {
+        'rows': rows,
+        'file_bytes': os.path.getsize(csv_path),
+        'streamed': summary is not None,
+        'stages': stages
+    }
+
+def environment():
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__
+    }
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Time load, top-ligand selection, each plot and the PDF build on synthetic data.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help="Comma-separated row counts, e.g. 10k,1m,50m (default: 10k,100k,1m)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Timed runs per stage; the fastest is reported (default: 3)")
+    parser.add_argument('--profile', choices=sorted(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE)
+    parser.add_argument('--stream-above-mb', type=float, default=STREAMING_THRESHOLD_BYTES / MB,
+                        help="Use the chunked streaming loader for files larger than this (MB)")
+    parser.add_argument('--data-dir', default=None,
+                        help="Where generated CSVs are kept and reused (default: cache directory)")
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help="Results JSON to write")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the traced peak-memory run of each stage")
+    parser.add_argument('--baseline', help="Compare against this results JSON and exit 1 on regressions")
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD)
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    data_dir = args.data_dir or default_data_dir()
+    streaming_threshold = int(args.stream_above_mb * MB)
+    
+    results = {}
+    for rows in [parse_size(size) for size in args.sizes.split(',') if size.strip()]:
+        label = format_size(rows)
+        print(f"[{label}] preparing data...", flush=True)
+        csv_path = synthetic_csv(data_dir, rows, args.seed)
+        
+        # A fresh process per size, so memoized structures and allocator
+        # state from the previous size do not leak into the numbers
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(benchmark_size, csv_path, rows, max(1, args.repeat),
+                                     not args.no_memory, args.profile, streaming_threshold).result()
+        results[label] = result
+        
+        for stage, measured in result['stages'].items():
+            peak = f"{measured['peak_mb']:9.1f} MB" if measured['peak_mb'] is not None else ""
+            print(f"[{label}] {stage:<40} {measured['wall_s']:8.3f} s {peak}", flush=True)
+    
+    output = {
+        'environment': environment(),
+        'settings': {'seed': args.seed, 'repeat': args.repeat, 'profile': args.profile,
+                     'streaming_threshold': streaming_threshold},
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+    
+    if args.baseline:
+        rows = compare_results(load_results(args.baseline), output, args.time_threshold,
+                               args.memory_threshold)
+        return 1 if print_comparison(rows) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,124 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Column names as written by the usual Vina post-processing scripts
+HEADER = ['Ligand', 'Binding Affinity', 'rmsd/ub', 'rmsd/lb']
+
+MALFORMED_TOKENS = np.array(['', 'NaN', 'n/a', 'ERROR', '-', '1.2.3'], dtype=object)
+
+DEFAULT_SEED = 0
+DEFAULT_DUPLICATE_FRACTION = 0.02
+DEFAULT_MALFORMED_FRACTION = 0.001
+CHUNK_ROWS = 1_000_000
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+def parse_size(text):
+    text = str(text).strip().lower().replace('_', '')
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+def format_size(rows):
+    for suffix, factor in sorted(SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if rows >= factor and rows % factor == 0:
+            return f"{rows // factor}{suffix}"
+    return str(rows)
+
+def generate_chunk(rng, first_ligand, rows, duplicate_fraction, malformed_fraction):
+    # Vina writes up to 9 poses per ligand, best first. Pose 1 is its own
+    # reference (RMSD ub/lb = 0); later poses are weaker and drift away.
+    poses = rng.choice(np.arange(1, 10), size=rows // 6 + 2,
+                       p=[0.04, 0.02, 0.02, 0.02, 0.03, 0.04, 0.05, 0.08, 0.70])
+    poses = poses[:np.searchsorted(np.cumsum(poses), rows) + 1]
+    ligand_count = len(poses)
+    
+    ligand_codes = np.repeat(np.arange(ligand_count), poses)
+    pose_rank = np.arange(len(ligand_codes)) - np.repeat(np.cumsum(poses) - poses, poses)
+    
+    best = np.clip(rng.normal(-7.2, 1.4, ligand_count), -14.0, -1.0)
+    steps = rng.gamma(1.5, 0.25, len(ligand_codes))
+    steps[pose_rank == 0] = 0.0
+    offsets = np.cumsum(steps) - np.repeat(np.cumsum(steps)[np.cumsum(poses) - poses], poses)
+    affinity = np.round(best[ligand_codes] + offsets, 3)
+    
+    rmsd_lb = np.round(rng.gamma(2.0, 1.1, len(ligand_codes)), 3)
+    rmsd_ub = np.round(rmsd_lb + rng.gamma(2.0, 1.6, len(ligand_codes)), 3)
+    rmsd_lb[pose_rank == 0] = 0.0
+    rmsd_ub[pose_rank == 0] = 0.0
+    
+    names = np.char.add('ZINC', np.char.zfill((first_ligand + np.arange(ligand_count)).astype(str), 12))
+    chunk = pd.DataFrame({
+        'Ligand': names[ligand_codes],
+        'Binding Affinity': affinity,
+        'rmsd/ub': rmsd_ub,
+        'rmsd/lb': rmsd_lb
+    })
+    
+    # Exact repeats of earlier rows, as left behind by re-run batches
+    duplicates = int(rows * duplicate_fraction)
+    unique_rows = rows - duplicates
+    chunk = chunk.iloc[:unique_rows]
+    if duplicates and unique_rows:
+        sources = rng.integers(0, unique_rows, duplicates)
+        # Each repeat lands somewhere after its original; pose order is kept
+        positions = np.concatenate([np.arange(unique_rows), rng.uniform(sources, unique_rows)])
+        chunk = pd.concat([chunk, chunk.iloc[sources]]).iloc[np.argsort(positions, kind='stable')]
+    chunk = chunk.reset_index(drop=True)
+    
+    malformed = int(rows * malformed_fraction)
+    if malformed:
+        for col in HEADER[1:]:
+            positions = rng.integers(0, len(chunk), malformed)
+            chunk[col] = chunk[col].astype(object)
+            chunk.loc[positions, col] = rng.choice(MALFORMED_TOKENS, malformed)
+    
+    return chunk, ligand_count
+
+def generate_csv(path, rows, seed=DEFAULT_SEED, duplicate_fraction=DEFAULT_DUPLICATE_FRACTION,
+                 malformed_fraction=DEFAULT_MALFORMED_FRACTION, chunk_rows=CHUNK_ROWS):
+    # Each chunk has its own generator seeded from (seed, chunk number), so a
+    # file is reproducible and its first chunks do not depend on its size.
+    tmp_path = path + '.tmp'
+    written = 0
+    first_ligand = 0
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        f.write(','.join(HEADER) + '\n')
+        for chunk_number in range((rows + chunk_rows - 1) // chunk_rows):
+            size = min(chunk_rows, rows - written)
+            rng = np.random.default_rng([seed, chunk_number])
+            chunk, ligand_count = generate_chunk(rng, first_ligand, size, duplicate_fraction,
+                                                 malformed_fraction)
+            chunk.to_csv(f, header=False, index=False)
+            written += size
+            first_ligand += ligand_count
+    os.replace(tmp_path, path)
+    return path
+
+def synthetic_csv(data_dir, rows, seed=DEFAULT_SEED):
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{format_size(rows)}_seed{seed}.csv")
+    if not os.path.exists(path):
+        generate_csv(path, rows, seed)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic docking results CSV.")
+    parser.add_argument('rows', help="Number of rows, e.g. 10k, 2.5m, 50m")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--duplicates', type=float, default=DEFAULT_DUPLICATE_FRACTION,
+                        help="Fraction of rows that repeat an earlier row")
+    parser.add_argument('--malformed', type=float, default=DEFAULT_MALFORMED_FRACTION,
+                        help="Fraction of malformed values per numeric column")
+    args = parser.parse_args(argv)
+    
+    generate_csv(args.output, parse_size(args.rows), args.seed, args.duplicates, args.malformed)
+    print(f"Wrote {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,141 @@
+import numpy as np
+from dataset_memo import dataset_memo
+from stats_engine import dataset_stats, NUMERIC_COLUMNS
+
+# Every bin count the plots use (20 and 30 for histograms, 40 for the 3D
+# voxels, 300 for the density grids) divides this, so each column is put
+# into fine bins in one pass and coarser counts are sums of fine ones
+FINE_BINS = 600
+
+def bin_edges(lo, hi, bins):
+    if not hi > lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+def bin_index(values, edges):
+    bins = len(edges) - 1
+    scaled = (values - edges[0]) * (bins / (edges[-1] - edges[0]))
+    index = np.clip(scaled.astype(np.int64), 0, bins - 1)
+    # Values on an edge (e.g. affinities on a 0.1 grid) can round to the
+    # neighbouring bin; compare with the edges the way np.histogram does
+    index[values < edges[index]] -= 1
+    index[(values >= edges[index + 1]) & (index < bins - 1)] += 1
+    return index
+
+class ColumnBins:
+    # The fine bin of every row over the column's [min, max], -1 where the
+    # value is missing
+    def __init__(self, values, lo, hi):
+        self.edges = bin_edges(lo, hi, FINE_BINS)
+        finite = np.isfinite(values)
+        self.index = np.full(len(values), -1, dtype=np.int16)
+        self.index[finite] = bin_index(values[finite], self.edges)
+        self.counts = np.bincount(self.index[finite], minlength=FINE_BINS)
+    
+    def factor(self, bins):
+        if FINE_BINS % bins:
+            raise ValueError(f"{bins} bins do not divide the {FINE_BINS} fine bins")
+        return FINE_BINS // bins
+    
+    def histogram(self, bins, rows=None):
+        # rows: a mask restricting the counts to some rows
+        factor = self.factor(bins)
+        counts = self.counts if rows is None else np.bincount(self.index[rows & (self.index >= 0)],
+                                                              minlength=FINE_BINS)
+        return counts.reshape(bins, factor).sum(axis=1), self.edges[::factor]
+    
+    def coarse_index(self, bins):
+        # -1 stays -1 under floor division
+        return self.index // self.factor(bins)
+
+class PairGrid:
+    # counts[x, y] over the two columns' bins, and the rows that fall in
+    # cells holding at most sparse_count rows
+    def __init__(self, counts, xedges, yedges, sparse):
+        self.counts = counts
+        self.xedges = xedges
+        self.yedges = yedges
+        self.sparse = sparse
+    
+    def transposed(self):
+        return PairGrid(self.counts.T, self.yedges, self.xedges, self.sparse)
+
+class DatasetBins:
+    # Bins of the numeric columns of one dataset. 2D grids are summed from
+    # the column bins without touching the values again, and a pair and its
+    # mirror image share one grid.
+    def __init__(self, columns):
+        self.columns = columns
+        self.grids = {}
+    
+    @classmethod
+    def from_frame(cls, df, stats=None):
+        stats = stats or dataset_stats(df)
+        columns = {}
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns and stats.has_column(col) and stats.column(col).count:
+                values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                columns[col] = ColumnBins(values, stats.column(col).min, stats.column(col).max)
+        return cls(columns)
+    
+    @classmethod
+    def for_frame(cls, df, stats=None):
+        return dataset_memo(df, 'bins', lambda: cls.from_frame(df, stats))
+    
+    def has_column(self, col):
+        return col in self.columns
+    
+    def histogram(self, col, bins, rows=None):
+        return self.columns[col].histogram(bins, rows)
+    
+    def complete_rows(self, cols):
+        # Mask of the rows with a value in every one of cols; None when one
+        # of them has no values at all
+        if not all(col in self.columns for col in cols):
+            return None
+        rows = np.ones(len(self.columns[cols[0]].index), dtype=bool)
+        for col in cols:
+            rows &= self.columns[col].index >= 0
+        return rows
+    
+    def edges(self, col, bins):
+        return self.columns[col].edges[::self.columns[col].factor(bins)]
+    
+    def pair_grid(self, xcol, ycol, bins, sparse_count=0):
+        if xcol not in self.columns or ycol not in self.columns:
+            return None
+        key = (xcol, ycol, bins, sparse_count)
+        mirror = (ycol, xcol, bins, sparse_count)
+        if key not in self.grids:
+            if mirror in self.grids:
+                return self.grids[mirror].transposed()
+            ix = self.columns[xcol].coarse_index(bins).astype(np.int32)
+            iy = self.columns[ycol].coarse_index(bins).astype(np.int32)
+            valid = (ix >= 0) & (iy >= 0)
+            if not valid.any():
+                return None
+            cells = np.where(valid, ix * bins + iy, 0)
+            counts = np.bincount(cells[valid], minlength=bins * bins)
+            sparse = np.flatnonzero(valid & (counts[cells] <= sparse_count))
+            self.grids[key] = PairGrid(counts.reshape(bins, bins), self.edges(xcol, bins),
+                                       self.edges(ycol, bins), sparse)
+        return self.grids[key]
+    
+    def voxels(self, cols, bins):
+        # Counts over a bins**3 grid and the bin centers along each column
+        if not all(col in self.columns for col in cols):
+            return None
+        key = (tuple(cols), bins)
+        if key not in self.grids:
+            flat = np.zeros(len(self.columns[cols[0]].index), dtype=np.int64)
+            valid = np.ones(len(flat), dtype=bool)
+            for col in cols:
+                index = self.columns[col].coarse_index(bins)
+                valid &= index >= 0
+                flat = flat * bins + index
+            if not valid.any():
+                return None
+            counts = np.bincount(flat[valid], minlength=bins ** len(cols))
+            centers = [(edges[:-1] + edges[1:]) / 2 for edges in (self.edges(col, bins) for col in cols)]
+            self.grids[key] = (counts, centers)
+        return self.grids[key]
\ No newline at end of file
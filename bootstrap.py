@@ -0,0 +1,148 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from ligand_index import LigandIndex, smallest_k
+
+DEFAULT_ITERATIONS = 1000
+DEFAULT_SEED = 0
+
+CONFIDENCE = 0.95
+RANK_THRESHOLDS = (1, 3, 10)
+
+# Iterations are split into fixed tasks, each with its own child seed, so
+# the result depends on the seed only, not on the number of workers
+ITERATIONS_PER_TASK = 100
+
+# Below this many potential draws (iterations x ligands) a pool costs more
+# than it saves; most ligands are never drawn, their ranks are settled early
+POOL_MIN_DRAWS = 200_000_000
+
+# Other ligands are resampled this many at a time, best observed first,
+# until every top ligand's rank is settled
+RANK_BLOCK = 2048
+
+def grouped_pool(index):
+    # Candidate poses (the same pool LigandIndex ranks) sorted by ligand and
+    # then affinity: start and count of every ligand's run of poses
+    codes = index.codes[index.pool]
+    named = codes >= 0
+    codes = codes[named]
+    affinity = index.pool_affinity[named]
+    order = np.lexsort((affinity, codes))
+    codes = codes[order]
+    ligands, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+    return ligands, affinity[order], starts, counts
+
+def resample_best(rng, values, starts, counts, iterations):
+    # The best pose of n poses drawn with replacement from a ligand's n
+    # sorted poses is pose i with P(min >= i) = ((n - i) / n) ** n, so one
+    # uniform per ligand and iteration samples it exactly, however many
+    # poses the ligand has
+    u = rng.random((iterations, len(counts)))
+    offsets = np.floor(counts * (1 - u ** (1 / counts))).astype(np.int64)
+    np.minimum(offsets, counts - 1, out=offsets)
+    return values[starts + offsets]
+
+class RankingData:
+    # Poses of the top ligands first, then every other ligand in order of
+    # its observed best, as runs of sorted values
+    def __init__(self, values, starts, counts, top_count, observed, thresholds):
+        self.values = values
+        self.starts = starts
+        self.counts = counts
+        self.top_count = top_count
+        self.observed = observed
+        self.thresholds = np.asarray(thresholds)
+
+def rank_task(data, seed, iterations):
+    # Resampled bests of the top ligands, and per top ligand how many
+    # resamples kept it within each threshold
+    rng = np.random.default_rng(seed)
+    top = data.top_count
+    top_best = resample_best(rng, data.values, data.starts[:top], data.counts[:top], iterations)
+    limit = data.thresholds.max()
+    # Ligands strictly better than each top ligand; counting stops once
+    # every top ligand has reached the limit or cannot be overtaken
+    better = (top_best[:, None, :] < top_best[:, :, None]).sum(axis=2)
+    for start in range(top, len(data.counts), RANK_BLOCK):
+        open_best = top_best[better < limit]
+        # A resampled best is never better than the observed one, so the
+        # remaining ligands cannot overtake anything that is still open
+        if len(open_best) == 0 or data.observed[start] >= open_best.max():
+            break
+        block = slice(start, start + RANK_BLOCK)
+        draws = resample_best(rng, data.values, data.starts[block], data.counts[block], iterations)
+        better += (draws[:, None, :] < top_best[:, :, None]).sum(axis=2)
+    ranks = better + 1
+    return top_best, (ranks[:, :, None] <= data.thresholds).sum(axis=0)
+
+_worker_data = None
+
+def _init_rank_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _pool_rank_task(seed, iterations):
+    return rank_task(_worker_data, seed, iterations)
+
+def bootstrap_ranking(df, top_count=10, iterations=DEFAULT_ITERATIONS, seed=DEFAULT_SEED, max_workers=None,
+                      monitor=None):
+    # Per ligand in the best-pose top list: a confidence interval of its best
+    # affinity over resamples of its poses, and the share of resamples in
+    # which it still ranks within each of RANK_THRESHOLDS. None if the frame
+    # cannot be ranked.
+    index = LigandIndex.for_frame(df)
+    if not index.valid or iterations <= 0:
+        return None
+    ligands, values, starts, counts = grouped_pool(index)
+    if len(ligands) == 0:
+        return None
+    
+    observed = values[starts]
+    # The same ligands, in the same order, as LigandIndex.top()
+    top_codes = index.best_codes[smallest_k(index.best_affinity, top_count)]
+    top = np.searchsorted(ligands, top_codes)
+    rest = np.setdiff1d(np.arange(len(ligands)), top)
+    rest = rest[np.argsort(observed[rest], kind='stable')]
+    order = np.concatenate((top, rest))
+    thresholds = [t for t in RANK_THRESHOLDS if t <= max(len(top), 1)] or [1]
+    data = RankingData(values, starts[order], counts[order], len(top), observed[order], thresholds)
+    
+    tasks = [min(ITERATIONS_PER_TASK, iterations - start) for start in range(0, iterations, ITERATIONS_PER_TASK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    results = [None] * len(tasks)
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1 and iterations * len(order) >= POOL_MIN_DRAWS:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_rank_worker,
+                                 initargs=(data,)) as executor:
+            futures = {executor.submit(_pool_rank_task, task_seed, size): i
+                       for i, (task_seed, size) in enumerate(zip(seeds, tasks))}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    if monitor:
+                        monitor.check_cancelled()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+    else:
+        for i, (task_seed, size) in enumerate(zip(seeds, tasks)):
+            results[i] = rank_task(data, task_seed, size)
+            if monitor:
+                monitor.check_cancelled()
+    top_best = np.concatenate([best for best, _ in results])
+    hits = sum(task_hits for _, task_hits in results)
+    
+    tail = (1 - CONFIDENCE) / 2 * 100
+    low, high = np.percentile(top_best, [tail, 100 - tail], axis=0)
+    result = pd.DataFrame({
+        'best_affinity': observed[top],
+        'ci_low': low,
+        'ci_high': high,
+        'pose_count': counts[top]
+    }, index=pd.Index([str(name) for name in index.categories[ligands[top]]], name='ligand'))
+    for i, threshold in enumerate(thresholds):
+        result[f'p_top{threshold}'] = hits[:, i] / iterations
+    result.attrs.update({'iterations': iterations, 'seed': seed})
+    return result
\ No newline at end of file
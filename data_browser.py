@@ -0,0 +1,223 @@
+import os
+import queue
+import re
+import threading
+import traceback
+import numpy as np
+import pandas as pd
+from data_loader import (DataLoader, MultiSourceLoader, is_multi_source, normalize_columns, coerce_numeric,
+                         downcast_float32, NUMERIC_COLUMNS)
+from pipeline import STREAMING_THRESHOLD_BYTES
+from vina_parser import VinaLoader, is_vina_directory
+
+FILTER_HELP = "ligand text, or conditions like: binding_affinity < -9, rmsd_lb <= 2"
+
+CONDITION_PATTERN = re.compile(r'^\s*(.+?)\s*(<=|>=|==|!=|<|>|=)\s*(\S+)\s*$')
+
+OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '=': np.equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+# A CSV the pipeline would stream is browsed through its first rows only
+WINDOW_ROWS = 1_000_000
+WINDOW_NOTE = 'browse_note'
+
+def load_dataset(source, compact=True, streaming_threshold=STREAMING_THRESHOLD_BYTES):
+    if is_vina_directory(source):
+        return VinaLoader(source).load_data()
+    if is_multi_source(source):
+        return MultiSourceLoader(source, compact=compact).load_data()
+    if streaming_threshold is not None and os.path.getsize(source) > streaming_threshold:
+        return load_window(source)
+    return DataLoader(source, compact=compact).load_data()
+
+def load_window(csv_path, rows=WINDOW_ROWS):
+    # One row more than shown tells whether the file goes on
+    df = pd.read_csv(csv_path, nrows=rows + 1)
+    more = len(df) > rows
+    df = df.iloc[:rows]
+    df.columns = normalize_columns(df.columns)
+    df = coerce_numeric(df.drop_duplicates()).reset_index(drop=True)
+    if 'ligand' in df.columns:
+        df['ligand'] = df['ligand'].astype('category')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = downcast_float32(df[col])
+    if more:
+        df.attrs[WINDOW_NOTE] = f"first {rows:,} rows of a file too large to browse in full"
+    return df
+
+def format_value(value):
+    if pd.isna(value):
+        return ""
+    if isinstance(value, (float, np.floating)):
+        return f"{value:g}"
+    return str(value)
+
+def sort_key(series):
+    # One comparable number per row, NaN where the value is missing
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        ranks = np.argsort(np.argsort(series.cat.categories.astype(str), kind='stable'))
+        codes = series.cat.codes.to_numpy()
+        ranks = np.append(ranks, -1)
+        return np.where(codes >= 0, ranks[codes], np.nan)
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, _ = pd.factorize(series, sort=True)
+    return np.where(codes >= 0, codes, np.nan)
+
+class DatasetView:
+    # Rows of a dataset in a given order; only the requested page is looked up
+    def __init__(self, df, order=None, sort_column=None, descending=False, filter_text=""):
+        self.df = df
+        self.order = order
+        self.columns = [str(col) for col in df.columns]
+        self.sort_column = sort_column
+        self.descending = descending
+        self.filter_text = filter_text
+        self.note = df.attrs.get(WINDOW_NOTE)
+    
+    def __len__(self):
+        return len(self.df) if self.order is None else len(self.order)
+    
+    def rows(self, start, count):
+        positions = np.arange(start, min(start + count, len(self)))
+        if self.order is not None:
+            positions = self.order[positions]
+        page = self.df.iloc[positions]
+        columns = [page[col].tolist() for col in page.columns]
+        return [tuple(format_value(value) for value in row) for row in zip(*columns)]
+
+class DatasetIndex:
+    # Sort orders are computed once per column and direction and kept, so
+    # changing the filter or going back to an earlier sort costs one pass
+    def __init__(self, df):
+        self.df = df
+        self.orders = {}
+        self.masks = {}
+    
+    def sort_order(self, column, descending=False):
+        key = (column, descending)
+        if key not in self.orders:
+            values = sort_key(self.df[column])
+            if descending:
+                values = -values
+            # NaN sorts last in both directions
+            self.orders[key] = np.argsort(values, kind='stable')
+        return self.orders[key]
+    
+    def precompute(self, should_stop=lambda: False):
+        for column in self.df.columns:
+            if should_stop():
+                return
+            self.sort_order(column)
+    
+    def filter_mask(self, text):
+        text = text.strip()
+        if not text:
+            return None
+        if text not in self.masks:
+            mask = np.ones(len(self.df), dtype=bool)
+            for part in text.split(','):
+                mask &= self.condition_mask(part)
+            # Only the most recent filter is kept
+            self.masks = {text: mask}
+        return self.masks[text]
+    
+    def condition_mask(self, text):
+        match = CONDITION_PATTERN.match(text)
+        if match:
+            column, op, value = match.groups()
+            if column not in self.df.columns:
+                raise ValueError(f"Unknown column '{column}'")
+            series = self.df[column]
+            if pd.api.types.is_numeric_dtype(series.dtype):
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise ValueError(f"'{value}' is not a number")
+                return OPERATORS[op](series.to_numpy(dtype=np.float64, na_value=np.nan), number)
+            equal = (series.astype(str) == value).to_numpy()
+            return ~equal if op == '!=' else equal
+        return self.text_mask(text.strip())
+    
+    def text_mask(self, text):
+        if 'ligand' not in self.df.columns:
+            raise ValueError("Text filters need a ligand column")
+        series = self.df['ligand']
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Matched once per distinct name, then looked up by code
+            names = series.cat.categories.astype(str)
+            hits = np.append(names.str.contains(text, case=False, regex=False), False)
+            return hits[series.cat.codes.to_numpy()]
+        return series.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+    
+    def query(self, sort_column=None, descending=False, filter_text=""):
+        mask = self.filter_mask(filter_text)
+        if sort_column is None or sort_column not in self.df.columns:
+            order = None if mask is None else np.flatnonzero(mask)
+            sort_column = None
+        else:
+            order = self.sort_order(sort_column, descending)
+            if mask is not None:
+                order = order[mask[order]]
+        return DatasetView(self.df, order, sort_column, descending, filter_text)
+
+class BrowserWorker:
+    # Loads, sorts and filters off the Tk thread. Results are posted to the
+    # app's queue as ('browser_ready', generation, view) or ('browser_error',
+    # generation, message); requests that were overtaken are skipped.
+    def __init__(self, task_queue):
+        self.task_queue = task_queue
+        self.requests = queue.Queue()
+        self.index = None
+        self.generation = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def load(self, source, compact=True, sort_column=None, descending=False, filter_text=""):
+        self.generation += 1
+        self.requests.put(('load', self.generation, (source, compact), (sort_column, descending, filter_text)))
+        return self.generation
+    
+    def query(self, sort_column=None, descending=False, filter_text=""):
+        self.generation += 1
+        self.requests.put(('query', self.generation, None, (sort_column, descending, filter_text)))
+        return self.generation
+    
+    def next_request(self):
+        request = self.requests.get()
+        # Only the newest query matters, but a load must not be skipped
+        # in favour of a query against the dataset it replaces
+        while True:
+            try:
+                newer = self.requests.get_nowait()
+            except queue.Empty:
+                return request
+            if newer[0] == 'query' and request[0] == 'load':
+                request = (request[0], newer[1], request[2], newer[3])
+            else:
+                request = newer
+    
+    def run(self):
+        while True:
+            kind, generation, load_args, query_args = self.next_request()
+            try:
+                if kind == 'load':
+                    self.index = None
+                    self.index = DatasetIndex(load_dataset(*load_args))
+                if self.index is None:
+                    continue
+                view = self.index.query(*query_args)
+                self.task_queue.put(('browser_ready', generation, view))
+                # Idle time goes into the remaining sort orders
+                self.index.precompute(should_stop=lambda: not self.requests.empty())
+            except Exception as e:
+                message = str(e) if isinstance(e, ValueError) else f"{e}\n{traceback.format_exc()}"
+                self.task_queue.put(('browser_error', generation, message))
\ No newline at end of file
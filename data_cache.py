@@ -0,0 +1,278 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Only looked up here; pandas imports pyarrow when a frame is first written
+# or read as Parquet, so importing the cache stays cheap
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Bump whenever load_data's normalization changes so stale frames are ignored
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024 * 1024
+
+SAMPLE_BLOCK_SIZE = 64 * 1024
+SAMPLE_BLOCKS = 64
+
+INDEX_FILENAME = "index.json"
+LOCK_FILENAME = "index.lock"
+# A file is written before its index entry; files without an entry are only
+# swept once they are this old, so one still being recorded is left alone
+ORPHAN_GRACE_S = 600
+
+def cache_root():
+    override = os.environ.get('DOCKING_CACHE_DIR')
+    if override:
+        return override
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "docking_affinity_plotter")
+
+def default_cache_dir():
+    return os.path.join(cache_root(), "data")
+
+def content_hash(path, size):
+    # Head, tail and evenly spaced blocks: constant cost even for multi-GB
+    # files, and together with size and mtime it catches in-place edits.
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        if size <= SAMPLE_BLOCK_SIZE * SAMPLE_BLOCKS:
+            digest.update(f.read())
+        else:
+            step = (size - SAMPLE_BLOCK_SIZE) // (SAMPLE_BLOCKS - 1)
+            for i in range(SAMPLE_BLOCKS):
+                f.seek(i * step)
+                digest.update(f.read(SAMPLE_BLOCK_SIZE))
+    return digest.hexdigest()
+
+def fingerprint(path):
+    stat = os.stat(path)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'content_hash': content_hash(path, stat.st_size),
+        'version': CACHE_VERSION
+    }
+
+def lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    # LK_LOCK gives up after 10 seconds; keep waiting like flock does
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class DiskCache:
+    # Shared index handling: entries carry 'file' (plus optional
+    # 'extra_files'), 'bytes' and 'last_used' and are evicted
+    # least-recently-used first once max_bytes is exceeded.
+    # The index is replaced atomically, so reading it needs no lock; every
+    # change goes through update_index(), which holds a lock file shared by
+    # all processes and threads using the cache.
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        self.lock_path = os.path.join(self.cache_dir, LOCK_FILENAME)
+    
+    def read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def write_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+    
+    @contextmanager
+    def update_index(self):
+        # Read-modify-write of the index; the changed index is written back
+        # before the lock is released
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.lock_path, 'a+b') as lock:
+            lock_file(lock)
+            try:
+                index = self.read_index()
+                yield index
+                self.write_index(index)
+            finally:
+                unlock_file(lock)
+    
+    def add_entry(self, key, entry):
+        with self.update_index() as index:
+            index[key] = entry
+            self.evict(index)
+    
+    def touch_entry(self, key):
+        with self.update_index() as index:
+            if key in index:
+                index[key]['last_used'] = time.time()
+    
+    def drop_entry(self, key):
+        with self.update_index() as index:
+            index.pop(key, None)
+    
+    def remove_path(self, name):
+        path = os.path.join(self.cache_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def entry_files(self, entry):
+        return [entry['file']] + entry.get('extra_files', [])
+    
+    def remove_entry(self, entry):
+        for name in self.entry_files(entry):
+            self.remove_path(name)
+    
+    def sweep(self, index):
+        # Files no entry points to (a crash between writing a file and
+        # recording it, or index updates lost by older versions) would
+        # otherwise never count against max_bytes nor be removed
+        keep = {name for entry in index.values() for name in self.entry_files(entry)}
+        keep |= {INDEX_FILENAME, LOCK_FILENAME}
+        cutoff = time.time() - ORPHAN_GRACE_S
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name in keep:
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.cache_dir, name)) < cutoff:
+                    self.remove_path(name)
+            except OSError:
+                pass
+    
+    def evict(self, index):
+        self.sweep(index)
+        total = sum(entry['bytes'] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            self.remove_entry(entry)
+            total -= entry['bytes']
+            del index[key]
+    
+    def clear(self):
+        with self.update_index() as index:
+            for entry in index.values():
+                self.remove_entry(entry)
+            index.clear()
+
+class DataCache(DiskCache):
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir or default_cache_dir(), max_bytes)
+    
+    def key(self, path, variant=None):
+        fp = fingerprint(path)
+        # Keys without a variant stay identical to those of earlier versions
+        if variant is not None:
+            fp['variant'] = variant
+        return hashlib.sha256(json.dumps(fp, sort_keys=True).encode()).hexdigest()
+    
+    # A caller that reads the file on a miss passes the key on to put(), so
+    # the content is hashed once
+    def get(self, path, variant=None, key=None):
+        try:
+            key = key or self.key(path, variant)
+        except OSError:
+            return None
+        
+        entry = self.read_index().get(key)
+        if entry is None:
+            return None
+        
+        try:
+            df = self.read_frame(os.path.join(self.cache_dir, entry['file']), entry['format'])
+        except Exception:
+            self.drop_entry(key)
+            return None
+        
+        self.touch_entry(key)
+        return df
+    
+    def put(self, path, df, variant=None, key=None):
+        try:
+            key = key or self.key(path, variant)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            filename, fmt = self.write_frame(key, df)
+        except Exception:
+            return
+        
+        self.add_entry(key, {
+            'file': filename,
+            'format': fmt,
+            'source': os.path.abspath(path),
+            'bytes': os.path.getsize(os.path.join(self.cache_dir, filename)),
+            'last_used': time.time()
+        })
+    
+    def write_frame(self, key, df):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            if HAS_PYARROW:
+                try:
+                    df.to_parquet(tmp_path, engine='pyarrow', compression=None, index=True)
+                    fmt = 'parquet'
+                except Exception:
+                    fmt = None
+            else:
+                fmt = None
+            
+            # Mixed-type object columns cannot always go to Parquet
+            if fmt is None:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+                fmt = 'pickle'
+            
+            filename = f"{key}.{fmt}"
+            os.replace(tmp_path, os.path.join(self.cache_dir, filename))
+            return filename, fmt
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def read_frame(self, frame_path, fmt):
+        if fmt == 'parquet':
+            import pandas as pd
+            return pd.read_parquet(frame_path, engine='pyarrow')
+        with open(frame_path, 'rb') as f:
+            return pickle.load(f)
\ No newline at end of file
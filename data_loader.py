@@ -1,47 +1,292 @@
-import pandas as pd
-
-class DataLoader:
-    def __init__(self, csv_path):
-        self.csv_path = csv_path
-    
-    def load_data(self):
-        df = pd.read_csv(self.csv_path)
-        df.columns = df.columns.str.strip()
-        
-        column_mapping = {
-            'rmsd/ub': 'rmsd_ub',
-            'rmsd/lb': 'rmsd_lb',
-            'Binding Affinity': 'binding_affinity',
-            'Ligand': 'ligand',
-            'rmsd': 'rmsd_ub'
-        }
-        
-        for old_col, new_col in column_mapping.items():
-            if old_col in df.columns:
-                df.rename(columns={old_col: new_col}, inplace=True)
-        
-        df = df.drop_duplicates()
-        
-        numeric_cols = ['binding_affinity', 'rmsd_ub', 'rmsd_lb']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        return df
-    
-    def get_top_ligands(self, df):
-        if not all(col in df.columns for col in ['ligand', 'binding_affinity', 'rmsd_ub', 'rmsd_lb']):
-            return pd.DataFrame()
-        
-        filtered_df = df[
-            (df['rmsd_ub'] == 0) & 
-            (df['rmsd_lb'] == 0)
-        ].copy()
-        
-        if len(filtered_df) == 0:
-            filtered_df = df.copy()
-        
-        filtered_df = filtered_df.sort_values('binding_affinity')
-        top_ligands = filtered_df.head(10).copy()
-        
-        return top_ligands
\ No newline at end of file
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from aggregates import RunningAggregates, SeenHashes, NUMERIC_COLUMNS
+from data_cache import DataCache
+from ligand_index import LigandIndex, RAW_POSES
+
+COLUMN_MAPPING = {
+    'rmsd/ub': 'rmsd_ub',
+    'rmsd/lb': 'rmsd_lb',
+    'Binding Affinity': 'binding_affinity',
+    'Ligand': 'ligand',
+    'rmsd': 'rmsd_ub'
+}
+
+DEFAULT_CHUNKSIZE = 500_000
+
+KEY_COLUMNS = ['ligand'] + NUMERIC_COLUMNS
+
+# Compact mode stores a numeric column as float32 only if no value moves by
+# more than this. Scores and RMSDs are reported with 3 decimals and float32
+# keeps about 7 significant digits, so this holds for any realistic value;
+# statistics then agree with the float64 load to about 1e-6, though a value
+# lying exactly on a histogram bin edge can land in the neighbouring bin.
+FLOAT32_TOLERANCE = 1e-5
+
+COMPACT_VARIANT = 'compact-1'
+
+SOURCE_PATTERNS = ('*.csv',)
+
+def normalize_columns(columns):
+    columns = [str(col).strip() for col in columns]
+    for old_col, new_col in COLUMN_MAPPING.items():
+        columns = [new_col if col == old_col else col for col in columns]
+    return columns
+
+_default_cache = None
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DataCache()
+    return _default_cache
+
+def coerce_numeric(df):
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def downcast_float32(series, tolerance=FLOAT32_TOLERANCE):
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    compact = values.astype(np.float32)
+    finite = np.isfinite(values)
+    if not np.array_equal(finite, np.isfinite(compact)):
+        return series
+    error = np.abs(compact[finite].astype(np.float64) - values[finite]).max(initial=0.0)
+    return pd.Series(compact, index=series.index, name=series.name) if error <= tolerance else series
+
+def ingest_chunk(aggregates, chunk, seen=None, on_chunk=None):
+    # Scores and RMSDs are parsed before hashing, so "-7.0" and "-7.00" are
+    # one row as they are for load_data; the other columns compare as text
+    chunk = coerce_numeric(chunk)
+    if seen is not None:
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        chunk = chunk[seen.filter_new(hashes)]
+    
+    keep = [col for col in ['ligand'] + NUMERIC_COLUMNS if col in chunk.columns]
+    frame = chunk[keep].copy()
+    aggregates.update(frame)
+    if on_chunk is not None:
+        on_chunk(frame)
+    return len(chunk)
+
+def is_glob(source):
+    # Brackets are common in file names ("screen[1].csv"); an existing path
+    # is always taken literally
+    return glob.has_magic(source) and not os.path.exists(source)
+
+def is_multi_source(sources):
+    if not isinstance(sources, str):
+        return True
+    if os.path.isfile(sources):
+        return False
+    return os.path.isdir(sources) or is_glob(sources)
+
+def expand_sources(sources):
+    # A directory (searched recursively for CSVs), a glob, a file, or a
+    # list of any of these; duplicates are dropped, order is kept
+    if isinstance(sources, str):
+        sources = [sources]
+    paths = []
+    seen = set()
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(path for pattern in SOURCE_PATTERNS
+                             for path in glob.glob(os.path.join(source, '**', pattern), recursive=True))
+        elif is_glob(source):
+            matches = sorted(glob.glob(source, recursive=True))
+        else:
+            matches = [source]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+def source_label(sources):
+    if isinstance(sources, str):
+        return os.path.basename(os.path.normpath(sources))
+    return f"{len(sources)} inputs"
+
+def _load_source(csv_path, cache, compact=False):
+    df = DataLoader(csv_path, cache=cache, compact=compact).load_data()
+    # Categorical ligands pickle as codes plus one copy of each name, which
+    # keeps the transfer from the worker process small
+    if 'ligand' in df.columns:
+        df['ligand'] = df['ligand'].astype('category')
+    return df
+
+class DataLoader:
+    def __init__(self, csv_path, cache=True, compact=False):
+        self.csv_path = csv_path
+        self.cache = default_cache() if cache is True else (cache or None)
+        self.compact = compact
+    
+    def load_data(self):
+        key = self.cache_key()
+        if key is not None:
+            df = self.cache.get(self.csv_path, key=key)
+            if df is not None:
+                return df
+        
+        df = self.parse_csv_compact() if self.compact else self.parse_csv()
+        
+        if key is not None:
+            self.cache.put(self.csv_path, df, key=key)
+        
+        return df
+    
+    def cache_key(self):
+        # Computed once per load; it samples the file's content
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.key(self.csv_path, self.cache_variant())
+        except OSError:
+            return None
+    
+    def parse_csv(self):
+        df = pd.read_csv(self.csv_path)
+        df.columns = normalize_columns(df.columns)
+        
+        df = df.drop_duplicates()
+        
+        return coerce_numeric(df)
+    
+    def cache_variant(self):
+        return COMPACT_VARIANT if self.compact else None
+    
+    def parse_csv_compact(self, chunksize=DEFAULT_CHUNKSIZE):
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        names = normalize_columns(header)
+        # Only the analysed columns are parsed; the first one wins if two
+        # headers map to the same name (e.g. both 'rmsd' and 'rmsd/ub')
+        used = [i for i, name in enumerate(names) if name in KEY_COLUMNS and names.index(name) == i]
+        columns = [names[i] for i in used]
+        dtypes = {header[i]: object for i in used if names[i] == 'ligand'}
+        
+        # Ligand names are mapped chunk by chunk onto one growing category
+        # list, so the full column never exists as Python strings
+        categories = pd.Index([], dtype=object)
+        parts = []
+        hashes = []
+        for chunk in pd.read_csv(self.csv_path, usecols=used, dtype=dtypes, chunksize=chunksize):
+            chunk.columns = columns
+            chunk = coerce_numeric(chunk)
+            if 'ligand' in chunk.columns:
+                codes, uniques = pd.factorize(chunk['ligand'].to_numpy())
+                categories = categories.append(pd.Index(uniques).difference(categories, sort=False))
+                mapping = np.append(categories.get_indexer(uniques), -1).astype(np.int32)
+                chunk['ligand'] = mapping[codes]
+            # Duplicates are found from the key columns only
+            hashes.append(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+            # A chunk that does not fit the tolerance stays float64, and so
+            # does the whole column once the chunks are joined
+            for col in NUMERIC_COLUMNS:
+                if col in chunk.columns:
+                    chunk[col] = downcast_float32(chunk[col])
+            parts.append(chunk)
+        
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        
+        _, first = np.unique(np.concatenate(hashes), return_index=True)
+        keep = np.zeros(sum(len(part) for part in parts), dtype=bool)
+        keep[first] = True
+        bounds = np.cumsum([0] + [len(part) for part in parts])
+        for i, part in enumerate(parts):
+            parts[i] = part[keep[bounds[i]:bounds[i + 1]]]
+        df = pd.concat(parts, ignore_index=True)
+        del parts
+        
+        if 'ligand' in df.columns:
+            ligands = pd.Categorical.from_codes(df['ligand'].to_numpy(), categories=categories.astype(str))
+            df['ligand'] = ligands.remove_unused_categories()
+        
+        df.attrs['dropped_columns'] = [str(header[i]) for i in range(len(header)) if i not in used]
+        return df
+    
+    def stream_data(self, chunksize=DEFAULT_CHUNKSIZE, sample_size=100_000, dedup=True, top_k=10,
+                    on_chunk=None):
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        names = normalize_columns(header)
+        
+        # Every column is read as text so all chunks share one dtype;
+        # ingest_chunk parses the numeric columns before dedup
+        reader = pd.read_csv(self.csv_path, chunksize=chunksize, header=0,
+                             names=names, dtype=str)
+        
+        aggregates = RunningAggregates(top_k=top_k, sample_size=sample_size)
+        seen = SeenHashes() if dedup else None
+        
+        with reader:
+            for chunk in reader:
+                ingest_chunk(aggregates, chunk, seen, on_chunk)
+        
+        return aggregates
+    
+    def get_top_ligands(self, df, k=10, ranking=RAW_POSES):
+        return LigandIndex.for_frame(df).top(k, ranking)
+
+class MultiSourceLoader:
+    def __init__(self, sources, cache=True, max_workers=None, use_processes=True, compact=False):
+        self.sources = sources
+        self.cache = cache
+        self.compact = compact
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+    
+    def load_data(self):
+        paths = expand_sources(self.sources)
+        if not paths:
+            raise FileNotFoundError(f"No CSV files found in {self.sources}")
+        
+        workers = min(self.max_workers or os.cpu_count() or 1, len(paths))
+        if workers > 1:
+            # Process-level cache handles cannot be pickled; workers open their own
+            cache = self.cache if self.cache in (True, False, None) else True
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            with pool(max_workers=workers) as executor:
+                frames = list(executor.map(_load_source, paths, [cache] * len(paths),
+                                           [self.compact] * len(paths),
+                                           chunksize=max(1, len(paths) // (workers * 4))))
+        else:
+            frames = [_load_source(path, self.cache, self.compact) for path in paths]
+        
+        return self.merge(paths, frames)
+    
+    def merge(self, paths, frames):
+        names = self.source_names(paths)
+        lengths = [len(frame) for frame in frames]
+        
+        ligands = None
+        if all('ligand' in frame.columns for frame in frames):
+            # One shared category set, so a ligand has the same code in every source
+            categoricals = [frame['ligand'].astype('category') for frame in frames]
+            if len({str(cat.cat.categories.dtype) for cat in categoricals}) > 1:
+                # e.g. purely numeric IDs in one file and names in another
+                categoricals = [cat.cat.rename_categories(cat.cat.categories.astype(str))
+                                for cat in categoricals]
+            ligands = union_categoricals(categoricals, ignore_order=True)
+            frames = [frame.drop(columns='ligand') for frame in frames]
+        
+        df = pd.concat(frames, ignore_index=True, sort=False)
+        if ligands is not None:
+            df.insert(0, 'ligand', pd.Categorical(ligands))
+        
+        codes = np.repeat(np.arange(len(paths)), lengths)
+        df['source'] = pd.Categorical.from_codes(codes, categories=names)
+        return df
+    
+    def source_names(self, paths):
+        # Paths relative to their common directory; unique by construction
+        if len(paths) == 1:
+            return [os.path.basename(paths[0])]
+        root = os.path.commonpath([os.path.abspath(path) for path in paths])
+        return [os.path.relpath(os.path.abspath(path), root) for path in paths]
\ No newline at end of file
@@ -0,0 +1,19 @@
+import weakref
+
+# Derived structures (indexes, statistics, bins) are memoized per loaded
+# DataFrame object and dropped together with it. A frame is treated as
+# read-only once loaded; callers that modify one in place must call forget().
+_memos = {}
+
+def dataset_memo(df, name, factory):
+    key = id(df)
+    memo = _memos.get(key)
+    if memo is None:
+        memo = _memos[key] = {}
+        weakref.finalize(df, _memos.pop, key, None)
+    if name not in memo:
+        memo[name] = factory()
+    return memo[name]
+
+def forget(df):
+    _memos.pop(id(df), None)
\ No newline at end of file
@@ -0,0 +1,315 @@
+import cProfile
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from data_cache import cache_root
+
+TIMINGS_FILENAME = "timings.json"
+
+# Share of a run spent in each top-level stage, used until a run has been
+# measured on this machine; afterwards the last measured split is used.
+DEFAULT_STAGE_WEIGHTS = {'load': 0.15, 'store': 0.05, 'plots': 0.60, 'pdf': 0.20}
+
+# ETA is not shown until this much of the run is done, it is noise before
+MIN_ETA_FRACTION = 0.03
+
+# Unchanged progress is re-sent at most this often (for the ETA)
+REPORT_INTERVAL_S = 0.5
+
+# The cancel flag may live in another process; between stages and plots it
+# is always checked, on finer progress updates at most this often
+CANCEL_CHECK_INTERVAL_S = 0.2
+
+MB = 1024 * 1024
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+    
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t)
+        ]
+
+class JobCancelled(Exception):
+    pass
+
+def peak_rss():
+    # Peak resident set size of this process in bytes, None if unknown
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if sys.platform == 'win32':
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+def reset_peak_rss():
+    # Only Linux can reset the high-water mark; elsewhere the peak reported
+    # for a stage is the process peak up to the end of that stage.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def start_measure():
+    return (time.perf_counter(), time.process_time(), reset_peak_rss())
+
+def finish_measure(name, started, parent=None):
+    wall_start, cpu_start, peak_reset = started
+    peak = peak_rss()
+    return {
+        'name': name,
+        'parent': parent,
+        'wall_s': time.perf_counter() - wall_start,
+        'cpu_s': time.process_time() - cpu_start,
+        'peak_rss_mb': peak / MB if peak is not None else None,
+        'peak_scope': 'stage' if peak_reset else 'process',
+        'pid': os.getpid()
+    }
+
+def timed_call(name, func, *args):
+    # For work done in other processes; the caller adds the record
+    started = start_measure()
+    result = func(*args)
+    return result, finish_measure(name, started)
+
+def stage_weights_path():
+    return os.path.join(cache_root(), "stage_weights.json")
+
+def load_stage_weights(path=None):
+    try:
+        with open(path or stage_weights_path(), 'r', encoding='utf-8') as f:
+            weights = json.load(f)
+    except (OSError, ValueError):
+        return dict(DEFAULT_STAGE_WEIGHTS)
+    if set(weights) != set(DEFAULT_STAGE_WEIGHTS) or not all(w > 0 for w in weights.values()):
+        return dict(DEFAULT_STAGE_WEIGHTS)
+    return weights
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds // 60 % 60:02d}m"
+
+class RunMonitor:
+    def __init__(self, task_queue=None, weights=None, profile_stages=None, profile_dir=None,
+                 cancel_event=None):
+        self.task_queue = task_queue
+        self.cancel_event = cancel_event
+        self.weights = weights or dict(DEFAULT_STAGE_WEIGHTS)
+        self.profile_stages = set(profile_stages or [])
+        self.profile_dir = profile_dir
+        self.records = []
+        self.started = start_measure()
+        self.start_time = datetime.now()
+        
+        self.completed_weight = 0.0
+        self.stage_name = None
+        self.stage_done = 0
+        self.stage_total = 0
+        self.text = ""
+        self._profiling = False
+        self._last_report = (None, None, 0.0)
+        self._reached = 0.0
+        self._last_cancel_check = 0.0
+    
+    def fraction(self):
+        weight = self.weights.get(self.stage_name, 0.0)
+        within = min(self.stage_done / self.stage_total, 1.0) if self.stage_total else 0.0
+        total = sum(self.weights.values())
+        fraction = min((self.completed_weight + weight * within) / total, 1.0) if total else 0.0
+        # Estimates inside a stage can be revised downwards (e.g. the PDF
+        # flowable count grows as tables split); the bar never goes back
+        self._reached = max(self._reached, fraction)
+        return self._reached
+    
+    def eta(self, fraction):
+        if fraction < MIN_ETA_FRACTION:
+            return None
+        elapsed = time.perf_counter() - self.started[0]
+        return elapsed * (1 - fraction) / fraction
+    
+    def report(self, text=None):
+        if text is not None:
+            self.text = text
+        if not self.task_queue:
+            return
+        fraction = self.fraction()
+        value = int(fraction * 100)
+        now = time.perf_counter()
+        last_value, last_text, last_time = self._last_report
+        if value == last_value and self.text == last_text and now - last_time < REPORT_INTERVAL_S:
+            return
+        self._last_report = (value, self.text, now)
+        
+        message = self.text
+        eta = self.eta(fraction)
+        if eta is not None and value < 100:
+            message = f"{message} (about {format_duration(eta)} left)"
+        self.task_queue.put(('update_progress', value, message))
+    
+    def check_cancelled(self, force=True):
+        if self.cancel_event is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_cancel_check < CANCEL_CHECK_INTERVAL_S:
+            return
+        self._last_cancel_check = now
+        if self.cancel_event.is_set():
+            raise JobCancelled("Cancelled")
+    
+    def set_progress(self, done, total=None, text=None):
+        self.check_cancelled(force=False)
+        if total is not None:
+            self.stage_total = total
+        self.stage_done = done
+        self.report(text)
+    
+    def advance(self, amount=1, text=None):
+        self.check_cancelled()
+        self.set_progress(self.stage_done + amount, text=text)
+    
+    @contextmanager
+    def profiled(self, name):
+        if self._profiling or not (name in self.profile_stages or '*' in self.profile_stages):
+            yield
+            return
+        profiler = cProfile.Profile()
+        self._profiling = True
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._profiling = False
+            profile_dir = self.profile_dir or tempfile.gettempdir()
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, name.replace(':', '_') + ".prof"))
+    
+    @contextmanager
+    def stage(self, name, text=None, total=0):
+        self.check_cancelled()
+        self.stage_name = name
+        self.stage_done = 0
+        self.stage_total = total
+        self.report(text)
+        started = start_measure()
+        # The stage that raised is the one a failed run's timings are read for
+        failed = True
+        try:
+            with self.profiled(name):
+                yield self
+            failed = False
+        finally:
+            record = self.include_nested_peaks(finish_measure(name, started), parent=name)
+            if failed:
+                record['failed'] = True
+            self.records.append(record)
+        self.completed_weight += self.weights.get(name, 0.0)
+        self.stage_name = None
+        self.stage_done = self.stage_total = 0
+    
+    @contextmanager
+    def timed(self, name):
+        # A record nested under the running stage; progress is left alone
+        started = start_measure()
+        failed = True
+        try:
+            with self.profiled(name):
+                yield self
+            failed = False
+        finally:
+            record = finish_measure(name, started, parent=self.stage_name)
+            if failed:
+                record['failed'] = True
+            self.records.append(record)
+    
+    def include_nested_peaks(self, record, parent=None):
+        # A nested record resets the high-water mark, so its peak is folded
+        # back into the enclosing one (same process only)
+        peaks = [r['peak_rss_mb'] for r in self.records
+                 if (parent is None or r['parent'] == parent) and r['pid'] == record['pid']
+                 and r['peak_rss_mb'] is not None]
+        if record['peak_rss_mb'] is not None and peaks:
+            record['peak_rss_mb'] = max([record['peak_rss_mb']] + peaks)
+        return record
+    
+    def add_record(self, record):
+        record = dict(record)
+        record.setdefault('parent', self.stage_name)
+        self.records.append(record)
+    
+    def finish(self, text):
+        self.completed_weight = sum(self.weights.values())
+        self.stage_name = None
+        if self.task_queue:
+            self.task_queue.put(('update_progress', 100, text))
+    
+    def summary(self, **details):
+        total = self.include_nested_peaks(finish_measure('total', self.started))
+        return {
+            'started': self.start_time.isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'details': details,
+            'total': total,
+            'stages': self.records
+        }
+    
+    def write(self, path, **details):
+        # Also called while an error propagates, so it must not raise itself.
+        # Serialized first, so a value json cannot take leaves no half file.
+        try:
+            text = json.dumps(self.summary(**details), indent=2)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        except (OSError, TypeError, ValueError):
+            pass
+    
+    def save_stage_weights(self, path=None):
+        walls = {r['name']: r['wall_s'] for r in self.records if r['parent'] is None}
+        if set(walls) != set(DEFAULT_STAGE_WEIGHTS):
+            return
+        total = sum(walls.values())
+        if total <= 0:
+            return
+        path = path or stage_weights_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({name: max(wall / total, 0.01) for name, wall in walls.items()}, f)
+        except OSError:
+            pass
\ No newline at end of file
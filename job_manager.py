@@ -0,0 +1,175 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# Each job renders and builds a PDF of its own; more than two at once mostly
+# competes for memory and for the plot workers of parallel rendering
+DEFAULT_MAX_JOBS = max(1, min(2, os.cpu_count() or 1))
+
+QUEUED = 'Queued'
+RUNNING = 'Running'
+CANCELLING = 'Cancelling'
+DONE = 'Done'
+FAILED = 'Failed'
+CANCELLED = 'Cancelled'
+
+ACTIVE_STATES = (QUEUED, RUNNING, CANCELLING)
+
+class JobChannel:
+    # Stands in for the task queue of one job's pipeline, tagging its
+    # progress messages with the job id
+    def __init__(self, job_id, events):
+        self.job_id = job_id
+        self.events = events
+    
+    def put(self, message):
+        if message[0] == 'update_progress':
+            self.events.put(('job_progress', self.job_id, message[1], message[2]))
+
+def run_analysis_job(job_id, source, options, events, cancel_event, output_dir=None):
+    # Runs in a pool process; the heavy libraries are imported here
+    from pipeline import AnalysisPipeline, default_output_dir, reserve_output_dir
+    from instrumentation import JobCancelled
+    # The pool hands out a few more jobs than it runs, so a job cancelled
+    # while queued can still get here
+    if cancel_event.is_set():
+        return CANCELLED, None, 0
+    output_dir = reserve_output_dir(output_dir or default_output_dir())
+    events.put(('job_started', job_id, output_dir))
+    pipeline = AnalysisPipeline(source, output_dir, **options)
+    try:
+        pipeline.run(JobChannel(job_id, events), cancel_event=cancel_event)
+    except JobCancelled:
+        return CANCELLED, output_dir, 0
+    return DONE, output_dir, len(pipeline.plot_files)
+
+class Job:
+    def __init__(self, job_id, source, options):
+        self.job_id = job_id
+        self.source = source
+        self.options = options
+        self.state = QUEUED
+        self.progress = 0
+        self.text = ""
+        self.output_dir = None
+        self.plot_count = 0
+        self.error = None
+        self.future = None
+        self.cancel_event = None
+    
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+class JobManager:
+    # Analyses queued from the GUI, run by a bounded pool of processes.
+    # Every change is posted to task_queue as ('job_update', job_id, state,
+    # progress, text) from a relay thread; the GUI polls the queue.
+    def __init__(self, task_queue, max_jobs=DEFAULT_MAX_JOBS):
+        self.task_queue = task_queue
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.manager = None
+        self.events = None
+    
+    def start(self):
+        # The manager process carries progress events and cancel flags
+        # between the job processes and this one
+        with self.lock:
+            if self.executor is not None:
+                return
+            self.manager = multiprocessing.Manager()
+            self.events = self.manager.Queue()
+            self.executor = ProcessPoolExecutor(max_workers=self.max_jobs)
+        threading.Thread(target=self.relay_events, daemon=True).start()
+    
+    def submit(self, source, output_dir=None, **options):
+        # Without an output_dir each job gets a new folder in Downloads
+        self.start()
+        job = Job(next(self.ids), source, options)
+        job.cancel_event = self.manager.Event()
+        self.jobs[job.job_id] = job
+        job.future = self.executor.submit(run_analysis_job, job.job_id, source, options, self.events,
+                                          job.cancel_event, output_dir)
+        job.future.add_done_callback(lambda future, job=job: self.job_finished(job, future))
+        self.post(job)
+        return job
+    
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or not job.active:
+            return
+        # A job still waiting in the pool is dropped; one that has started
+        # stops at its next stage or plot boundary
+        if job.future.cancel():
+            return
+        job.cancel_event.set()
+        job.state = CANCELLING
+        self.post(job)
+    
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+    
+    def forget(self, job_id):
+        # Finished jobs are kept for the GUI's job list until dropped here
+        job = self.jobs.get(job_id)
+        if job is not None and not job.active:
+            del self.jobs[job_id]
+    
+    def active_jobs(self):
+        return [job for job in self.jobs.values() if job.active]
+    
+    def post(self, job):
+        # A snapshot, the Job itself keeps changing on other threads
+        self.task_queue.put(('job_update', job.job_id, job.state, job.progress, job.text))
+    
+    def relay_events(self):
+        while True:
+            try:
+                event = self.events.get()
+            except (EOFError, OSError):
+                return
+            job = self.jobs.get(event[1])
+            if job is None or not job.active:
+                continue
+            if event[0] == 'job_started':
+                job.output_dir = event[2]
+                if job.state == QUEUED:
+                    job.state = RUNNING
+            elif event[0] == 'job_progress':
+                job.progress = event[2]
+                job.text = event[3]
+            self.post(job)
+    
+    def job_finished(self, job, future):
+        if future.cancelled():
+            job.state = CANCELLED
+            job.text = "Cancelled before it started"
+        else:
+            error = future.exception()
+            if error is None:
+                job.state, job.output_dir, job.plot_count = future.result()
+                if job.state == DONE:
+                    job.progress = 100
+                    job.text = "Analysis completed!"
+                else:
+                    job.text = "Cancelled"
+            else:
+                job.state = FAILED
+                job.error = f"{error}\n\n{''.join(traceback.format_exception(error))}"
+                job.text = str(error).splitlines()[0] if str(error) else type(error).__name__
+        self.post(job)
+    
+    def shutdown(self):
+        self.cancel_all()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.manager is not None:
+            self.manager.shutdown()
\ No newline at end of file
@@ -0,0 +1,96 @@
+import weakref
+import numpy as np
+import pandas as pd
+from dataset_memo import dataset_memo
+
+BEST_POSE = 'best_pose'
+RAW_POSES = 'raw_poses'
+
+RANKING_MODES = [BEST_POSE, RAW_POSES]
+
+REQUIRED_COLUMNS = ['ligand', 'binding_affinity', 'rmsd_ub', 'rmsd_lb']
+
+def smallest_k(values, k):
+    # argpartition is O(n); only the k winners are sorted afterwards
+    if k <= 0 or len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(values):
+        candidates = np.argpartition(values, k - 1)[:k]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(values[candidates], kind='stable')]
+
+class LigandIndex:
+    def __init__(self, df):
+        # Weak so the memoized index does not keep its own frame alive
+        self._df = weakref.ref(df)
+        self.valid = all(col in df.columns for col in REQUIRED_COLUMNS)
+        if not self.valid:
+            return
+        
+        affinity = df['binding_affinity'].to_numpy(dtype=np.float64, na_value=np.nan)
+        zero_rmsd = ((df['rmsd_ub'] == 0) & (df['rmsd_lb'] == 0)).to_numpy(dtype=bool, na_value=False)
+        
+        ligands = df['ligand']
+        if isinstance(ligands.dtype, pd.CategoricalDtype):
+            self.categories = ligands.cat.categories
+            codes = ligands.cat.codes.to_numpy()
+        else:
+            codes, self.categories = pd.factorize(ligands)
+        self.codes = codes
+        
+        finite = ~np.isnan(affinity)
+        
+        # Same candidate rule as before: converged poses (RMSD ub/lb = 0) when
+        # there are any, otherwise every pose
+        pool_mask = finite & zero_rmsd
+        if not pool_mask.any():
+            pool_mask = finite
+        self.pool = np.flatnonzero(pool_mask)
+        self.pool_affinity = affinity[self.pool]
+        
+        named = finite & (codes >= 0)
+        per_ligand = pd.DataFrame({'code': codes[named], 'affinity': affinity[named]}) \
+            .groupby('code', sort=False)['affinity'].agg(['min', 'max', 'count'])
+        self.pose_count = np.zeros(len(self.categories), dtype=np.int64)
+        self.spread = np.full(len(self.categories), np.nan)
+        self.pose_count[per_ligand.index] = per_ligand['count'].to_numpy()
+        self.spread[per_ligand.index] = (per_ligand['max'] - per_ligand['min']).to_numpy()
+        
+        pool_named = self.pool[codes[self.pool] >= 0]
+        # Indexed by row position, so idxmin hands back positions directly
+        best = pd.Series(affinity[pool_named], index=pool_named) \
+            .groupby(codes[pool_named], sort=False).idxmin()
+        self.best_codes = best.index.to_numpy()
+        self.best_positions = best.to_numpy()
+        self.best_affinity = affinity[self.best_positions]
+    
+    @property
+    def df(self):
+        return self._df()
+    
+    @classmethod
+    def for_frame(cls, df):
+        return dataset_memo(df, 'ligand_index', lambda: cls(df))
+    
+    @property
+    def ligand_count(self):
+        return len(self.best_codes) if self.valid else 0
+    
+    def top(self, k=10, ranking=BEST_POSE):
+        if not self.valid:
+            return pd.DataFrame()
+        
+        if ranking == RAW_POSES:
+            positions = self.pool[smallest_k(self.pool_affinity, k)]
+            return self.df.iloc[positions].copy()
+        
+        if ranking != BEST_POSE:
+            raise ValueError(f"Unknown ranking mode: {ranking}")
+        
+        selected = smallest_k(self.best_affinity, k)
+        top = self.df.iloc[self.best_positions[selected]].copy()
+        codes = self.best_codes[selected]
+        top['pose_count'] = self.pose_count[codes]
+        top['affinity_spread'] = self.spread[codes]
+        return top
\ No newline at end of file
@@ -1,275 +1,488 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import os
-import threading
-import queue
-from datetime import datetime
-from data_loader import DataLoader
-from plot_generator import PlotGenerator
-from pdf_generator import PDFGenerator
-
-class DockingAnalyzerApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Docking Result Analyzer")
-        self.root.geometry("900x650")
-        
-        try:
-            self.root.iconbitmap("logo.ico")
-        except:
-            pass
-        
-        self.csv_path = None
-        self.df = None
-        self.output_dir = None
-        self.task_queue = queue.Queue()
-        
-        self.setup_ui()
-        self.check_queue()
-    
-    def setup_ui(self):
-        main_frame = ttk.Frame(self.root, padding="15")
-        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        title_label = tk.Label(main_frame, 
-                              text="Docking Result Analyzer",
-                              font=("Arial", 18, "bold"),
-                              fg="#2c3e50")
-        title_label.grid(row=0, column=0, columnspan=2, pady=(0, 15))
-        
-        file_frame = ttk.LabelFrame(main_frame, text="1. Select CSV File", padding="10")
-        file_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
-        
-        self.file_label = tk.Label(file_frame, text="No file selected", 
-                                  font=("Arial", 9), fg="gray", width=40)
-        self.file_label.grid(row=0, column=0, padx=(0, 10))
-        
-        browse_btn = tk.Button(file_frame, text="Browse CSV", 
-                              command=self.browse_file,
-                              bg="#3498db", fg="white",
-                              font=("Arial", 9, "bold"),
-                              padx=15, pady=4)
-        browse_btn.grid(row=0, column=1)
-        
-        preview_frame = ttk.LabelFrame(main_frame, text="Data Preview", padding="8")
-        preview_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), 
-                          pady=(0, 15))
-        
-        self.preview_tree = ttk.Treeview(preview_frame, height=6)
-        self.preview_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", 
-                                 command=self.preview_tree.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.preview_tree.configure(yscrollcommand=scrollbar.set)
-        
-        button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=3, column=0, columnspan=2, pady=(0, 15))
-        
-        self.analyze_btn = tk.Button(button_frame, text="Generate Analysis", 
-                                    command=self.start_analysis,
-                                    bg="#27ae60", fg="white",
-                                    font=("Arial", 12, "bold"),
-                                    padx=25, pady=8, state=tk.DISABLED)
-        self.analyze_btn.pack(side=tk.LEFT, padx=10)
-        
-        self.open_location_btn = tk.Button(button_frame, text="Open Output Location", 
-                                         command=self.open_file_location,
-                                         bg="#9b59b6", fg="white",
-                                         font=("Arial", 12, "bold"),
-                                         padx=25, pady=8, state=tk.DISABLED)
-        self.open_location_btn.pack(side=tk.LEFT, padx=10)
-        
-        info_frame = ttk.LabelFrame(main_frame, text="Output Information", padding="8")
-        info_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
-        
-        self.output_location_label = tk.Label(info_frame, 
-                                             text="Output will be saved to Downloads folder",
-                                             font=("Arial", 9),
-                                             fg="gray",
-                                             wraplength=600,
-                                             justify=tk.LEFT)
-        self.output_location_label.pack(anchor=tk.W)
-        
-        self.generated_files_label = tk.Label(info_frame,
-                                             text="",
-                                             font=("Arial", 9),
-                                             fg="green",
-                                             wraplength=600,
-                                             justify=tk.LEFT)
-        self.generated_files_label.pack(anchor=tk.W, pady=(5, 0))
-        
-        self.progress_label = tk.Label(main_frame, text="", font=("Arial", 9))
-        self.progress_label.grid(row=5, column=0, columnspan=2, pady=(5, 0))
-        
-        self.progress_bar = ttk.Progressbar(main_frame, length=600, mode='determinate')
-        self.progress_bar.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
-        
-        self.progress_text = tk.Label(main_frame, text="0%", font=("Arial", 8))
-        self.progress_text.grid(row=6, column=0, columnspan=2)
-        
-        self.status_bar = tk.Label(main_frame, text="Ready", bd=1, relief=tk.SUNKEN,
-                                  anchor=tk.W, font=("Arial", 8))
-        self.status_bar.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(15, 0))
-        
-        main_frame.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(2, weight=1)
-        preview_frame.columnconfigure(0, weight=1)
-        preview_frame.rowconfigure(0, weight=1)
-    
-    def check_queue(self):
-        try:
-            while True:
-                task = self.task_queue.get_nowait()
-                if task[0] == 'update_progress':
-                    self.update_progress(task[1], task[2])
-                elif task[0] == 'analysis_complete':
-                    self.analysis_complete()
-                elif task[0] == 'analysis_error':
-                    self.analysis_error(task[1])
-        except queue.Empty:
-            pass
-        self.root.after(100, self.check_queue)
-    
-    def browse_file(self):
-        file_path = filedialog.askopenfilename(
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-        )
-        
-        if file_path:
-            self.csv_path = file_path
-            self.file_label.config(text=os.path.basename(file_path), fg="green")
-            self.preview_data(file_path)
-            self.analyze_btn.config(state=tk.NORMAL)
-            self.status_bar.config(text=f"Loaded: {os.path.basename(file_path)}")
-    
-    def preview_data(self, file_path):
-        try:
-            for item in self.preview_tree.get_children():
-                self.preview_tree.delete(item)
-            
-            import pandas as pd
-            df = pd.read_csv(file_path, nrows=6)
-            
-            self.preview_tree["columns"] = list(df.columns)
-            self.preview_tree["show"] = "headings"
-            
-            for col in df.columns:
-                self.preview_tree.heading(col, text=col)
-                self.preview_tree.column(col, width=90)
-            
-            for index, row in df.iterrows():
-                self.preview_tree.insert("", "end", values=list(row))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to preview file: {str(e)}")
-    
-    def start_analysis(self):
-        if not self.csv_path:
-            messagebox.showerror("Error", "Please select a CSV file first")
-            return
-        
-        self.analyze_btn.config(state=tk.DISABLED)
-        self.open_location_btn.config(state=tk.DISABLED)
-        self.progress_bar['value'] = 0
-        self.progress_text.config(text="0%")
-        self.generated_files_label.config(text="")
-        self.status_bar.config(text="Generating analysis report...")
-        
-        thread = threading.Thread(target=self.generate_pdf_only, daemon=True)
-        thread.start()
-    
-    def update_progress(self, value, text):
-        self.progress_bar['value'] = value
-        self.progress_text.config(text=f"{value}%")
-        self.progress_label.config(text=text)
-        self.status_bar.config(text=text)
-    
-    def generate_pdf_only(self):
-        try:
-            self.task_queue.put(('update_progress', 5, "Loading data..."))
-            
-            loader = DataLoader(self.csv_path)
-            self.df = loader.load_data()
-            
-            self.task_queue.put(('update_progress', 10, "Data loaded"))
-            
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            downloads_path = os.path.join(os.path.expanduser("~"), "Downloads")
-            self.output_dir = os.path.join(downloads_path, f"Docking_Analysis_{timestamp}")
-            os.makedirs(self.output_dir, exist_ok=True)
-            
-            self.output_location_label.config(
-                text=f"Output location: {self.output_dir}",
-                fg="blue"
-            )
-            
-            self.plots_dir = os.path.join(self.output_dir, "plots")
-            os.makedirs(self.plots_dir, exist_ok=True)
-            
-            self.task_queue.put(('update_progress', 15, "Preparing analysis..."))
-            
-            self.task_queue.put(('update_progress', 20, "Generating plots..."))
-            plot_generator = PlotGenerator(self.df, self.plots_dir)
-            self.plot_files = plot_generator.generate_all_plots()
-            
-            self.task_queue.put(('update_progress', 85, "Creating PDF report..."))
-            pdf_path = os.path.join(self.output_dir, "Docking_Analysis_Report.pdf")
-            
-            pdf_generator = PDFGenerator(self.df, self.plot_files, self.plots_dir, self.csv_path)
-            pdf_generator.generate_pdf(pdf_path, self.task_queue)
-            
-            self.task_queue.put(('update_progress', 100, "Analysis completed!"))
-            self.task_queue.put(('analysis_complete',))
-            
-        except Exception as e:
-            import traceback
-            error_msg = f"{str(e)}\n\n{traceback.format_exc()}"
-            self.task_queue.put(('analysis_error', error_msg))
-    
-    def analysis_complete(self):
-        self.open_location_btn.config(state=tk.NORMAL)
-        self.status_bar.config(text="Analysis complete! Click 'Open Output Location' to view files.")
-        
-        pdf_path = os.path.join(self.output_dir, "Docking_Analysis_Report.pdf")
-        plot_count = len([f for f in os.listdir(self.plots_dir) if f.endswith('.png')]) if os.path.exists(self.plots_dir) else 0
-        
-        files_info = f"Generated: • 1 PDF report • {plot_count} plot(s)"
-        self.generated_files_label.config(text=files_info, fg="green")
-        
-        messagebox.showinfo("Success", 
-                          f"Analysis complete!\n\n"
-                          f"Files saved to:\n{self.output_dir}\n\n"
-                          f"Generated:\n"
-                          f"• Docking_Analysis_Report.pdf\n"
-                          f"• {plot_count} plot(s) in 'plots' folder")
-    
-    def analysis_error(self, error_msg):
-        self.analyze_btn.config(state=tk.NORMAL)
-        self.open_location_btn.config(state=tk.DISABLED)
-        self.progress_bar['value'] = 0
-        self.progress_text.config(text="0%")
-        self.progress_label.config(text="")
-        self.status_bar.config(text="Analysis failed")
-        
-        lines = error_msg.split('\n')
-        main_error = lines[0] if lines else "Unknown error"
-        messagebox.showerror("Error", f"Failed to generate analysis:\n\n{main_error}")
-    
-    def open_file_location(self):
-        if self.output_dir and os.path.exists(self.output_dir):
-            try:
-                os.startfile(self.output_dir)
-                self.status_bar.config(text=f"Opened: {self.output_dir}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Cannot open file location:\n{str(e)}")
-        else:
-            messagebox.showinfo("Info", "Please generate analysis first")
-
-def main():
-    root = tk.Tk()
-    app = DockingAnalyzerApp(root)
-    root.mainloop()
-
-if __name__ == "__main__":
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import os
+import csv
+import threading
+import multiprocessing
+import queue
+from render_profiles import RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+from virtual_table import VirtualTable, RowListSource
+from job_manager import JobManager, QUEUED, DONE, FAILED, CANCELLED
+
+# pandas, matplotlib and reportlab are only imported by the pipeline; it is
+# loaded on a background thread once the window is up (see warm_up)
+PREVIEW_ROWS = 50
+
+# How often the Tk thread picks up messages from job and worker threads
+QUEUE_POLL_MS = 100
+
+APPENDIX_CHOICES = ["none", "1000", "5000", "all"]
+
+class DockingAnalyzerApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Docking Result Analyzer")
+        self.root.geometry("900x780")
+        
+        try:
+            self.root.iconbitmap("logo.ico")
+        except:
+            pass
+        
+        self.csv_path = None
+        self.sources = []
+        self.output_dir = None
+        # Worker threads only put messages on the queue; Tk is only touched
+        # from its own thread, which drains the queue on a timer
+        self.task_queue = queue.Queue()
+        self.jobs = JobManager(self.task_queue)
+        self.job_states = {}
+        self.parallel_plots = tk.BooleanVar(value=False)
+        self.compact_memory = tk.BooleanVar(value=False)
+        self.store_results = tk.BooleanVar(value=True)
+        self.render_profile = tk.StringVar(value=DEFAULT_RENDER_PROFILE)
+        self.appendix = tk.StringVar(value="none")
+        self.filter_text = tk.StringVar(value="")
+        
+        # The full dataset behind the preview is loaded, sorted and filtered
+        # by a worker thread that exists once the libraries are imported
+        self.browser = None
+        self.browser_source = None
+        self.sort_column = None
+        self.sort_descending = False
+        
+        self.setup_ui()
+        self.check_queue()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after_idle(self.start_warm_up)
+    
+    def setup_ui(self):
+        main_frame = ttk.Frame(self.root, padding="15")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        title_label = tk.Label(main_frame, 
+                              text="Docking Result Analyzer",
+                              font=("Arial", 18, "bold"),
+                              fg="#2c3e50")
+        title_label.grid(row=0, column=0, columnspan=2, pady=(0, 15))
+        
+        file_frame = ttk.LabelFrame(main_frame, text="1. Select CSV File", padding="10")
+        file_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
+        
+        self.file_label = tk.Label(file_frame, text="No file selected", 
+                                  font=("Arial", 9), fg="gray", width=40)
+        self.file_label.grid(row=0, column=0, padx=(0, 10))
+        
+        browse_btn = tk.Button(file_frame, text="Browse CSV", 
+                              command=self.browse_file,
+                              bg="#3498db", fg="white",
+                              font=("Arial", 9, "bold"),
+                              padx=15, pady=4)
+        browse_btn.grid(row=0, column=1)
+        
+        browse_folder_btn = tk.Button(file_frame, text="Browse Folder", 
+                                     command=self.browse_folder,
+                                     bg="#3498db", fg="white",
+                                     font=("Arial", 9, "bold"),
+                                     padx=15, pady=4)
+        browse_folder_btn.grid(row=0, column=2, padx=(5, 0))
+        
+        preview_frame = ttk.LabelFrame(main_frame, text="Data Preview", padding="8")
+        preview_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), 
+                          pady=(0, 15))
+        
+        filter_label = ttk.Label(preview_frame, text="Filter:")
+        filter_label.grid(row=0, column=0, sticky=tk.W)
+        
+        self.filter_entry = ttk.Entry(preview_frame, textvariable=self.filter_text, width=45)
+        self.filter_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 10))
+        self.filter_entry.bind("<Return>", lambda event: self.apply_filter())
+        
+        self.browser_status = tk.Label(preview_frame, text="", font=("Arial", 8), fg="gray")
+        self.browser_status.grid(row=0, column=2, sticky=tk.E)
+        
+        self.preview_table = VirtualTable(preview_frame, on_sort=self.sort_preview, height=6)
+        self.preview_table.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(5, 0))
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=3, column=0, columnspan=2, pady=(0, 15))
+        
+        self.analyze_btn = tk.Button(button_frame, text="Generate Analysis", 
+                                    command=self.start_analysis,
+                                    bg="#27ae60", fg="white",
+                                    font=("Arial", 12, "bold"),
+                                    padx=25, pady=8, state=tk.DISABLED)
+        self.analyze_btn.pack(side=tk.LEFT, padx=10)
+        
+        self.open_location_btn = tk.Button(button_frame, text="Open Output Location", 
+                                         command=self.open_file_location,
+                                         bg="#9b59b6", fg="white",
+                                         font=("Arial", 12, "bold"),
+                                         padx=25, pady=8, state=tk.DISABLED)
+        self.open_location_btn.pack(side=tk.LEFT, padx=10)
+        
+        parallel_check = ttk.Checkbutton(button_frame, text="Parallel plot rendering",
+                                         variable=self.parallel_plots)
+        parallel_check.pack(side=tk.LEFT, padx=10)
+        
+        compact_check = ttk.Checkbutton(button_frame, text="Compact memory mode",
+                                        variable=self.compact_memory)
+        compact_check.pack(side=tk.LEFT, padx=10)
+        
+        store_check = ttk.Checkbutton(button_frame, text="Save to results database",
+                                      variable=self.store_results)
+        store_check.pack(side=tk.LEFT, padx=10)
+        
+        profile_label = ttk.Label(button_frame, text="Render profile:")
+        profile_label.pack(side=tk.LEFT, padx=(10, 2))
+        
+        profile_combo = ttk.Combobox(button_frame, textvariable=self.render_profile,
+                                     values=sorted(RENDER_PROFILES), state="readonly", width=11)
+        profile_combo.pack(side=tk.LEFT)
+        
+        appendix_label = ttk.Label(button_frame, text="Appendix:")
+        appendix_label.pack(side=tk.LEFT, padx=(10, 2))
+        
+        appendix_combo = ttk.Combobox(button_frame, textvariable=self.appendix,
+                                      values=APPENDIX_CHOICES, state="readonly", width=6)
+        appendix_combo.pack(side=tk.LEFT)
+        
+        jobs_frame = ttk.LabelFrame(main_frame, text="Analysis Jobs", padding="8")
+        jobs_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        self.jobs_tree = ttk.Treeview(jobs_frame, columns=("job", "input", "status", "progress", "message"),
+                                      show="headings", height=4, selectmode="browse")
+        for col, title, width in [("job", "#", 40), ("input", "Input", 200), ("status", "Status", 90),
+                                  ("progress", "Progress", 70), ("message", "Message", 330)]:
+            self.jobs_tree.heading(col, text=title)
+            self.jobs_tree.column(col, width=width, stretch=(col == "message"))
+        self.jobs_tree.grid(row=0, column=0, rowspan=2, sticky=(tk.W, tk.E))
+        self.jobs_tree.bind("<<TreeviewSelect>>", lambda event: self.show_focused_job())
+        
+        jobs_scrollbar = ttk.Scrollbar(jobs_frame, orient="vertical", command=self.jobs_tree.yview)
+        jobs_scrollbar.grid(row=0, column=1, rowspan=2, sticky=(tk.N, tk.S))
+        self.jobs_tree.configure(yscrollcommand=jobs_scrollbar.set)
+        
+        cancel_btn = tk.Button(jobs_frame, text="Cancel Job", command=self.cancel_selected_job,
+                               bg="#e74c3c", fg="white", font=("Arial", 9, "bold"), padx=10)
+        cancel_btn.grid(row=0, column=2, sticky=(tk.W, tk.E), padx=(10, 0))
+        
+        cancel_all_btn = tk.Button(jobs_frame, text="Cancel All", command=self.jobs.cancel_all,
+                                   bg="#c0392b", fg="white", font=("Arial", 9, "bold"), padx=10)
+        cancel_all_btn.grid(row=1, column=2, sticky=(tk.W, tk.E), padx=(10, 0), pady=(5, 0))
+        jobs_frame.columnconfigure(0, weight=1)
+        
+        info_frame = ttk.LabelFrame(main_frame, text="Output Information", padding="8")
+        info_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        self.output_location_label = tk.Label(info_frame, 
+                                             text="Output will be saved to Downloads folder",
+                                             font=("Arial", 9),
+                                             fg="gray",
+                                             wraplength=600,
+                                             justify=tk.LEFT)
+        self.output_location_label.pack(anchor=tk.W)
+        
+        self.generated_files_label = tk.Label(info_frame,
+                                             text="",
+                                             font=("Arial", 9),
+                                             fg="green",
+                                             wraplength=600,
+                                             justify=tk.LEFT)
+        self.generated_files_label.pack(anchor=tk.W, pady=(5, 0))
+        
+        self.progress_label = tk.Label(main_frame, text="", font=("Arial", 9))
+        self.progress_label.grid(row=6, column=0, columnspan=2, pady=(5, 0))
+        
+        self.progress_bar = ttk.Progressbar(main_frame, length=600, mode='determinate')
+        self.progress_bar.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        
+        self.progress_text = tk.Label(main_frame, text="0%", font=("Arial", 8))
+        self.progress_text.grid(row=7, column=0, columnspan=2)
+        
+        self.status_bar = tk.Label(main_frame, text="Ready", bd=1, relief=tk.SUNKEN,
+                                  anchor=tk.W, font=("Arial", 8))
+        self.status_bar.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(15, 0))
+        
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(2, weight=1)
+        preview_frame.columnconfigure(1, weight=1)
+        preview_frame.rowconfigure(1, weight=1)
+    
+    def check_queue(self):
+        # A failing handler is reported by Tk and polling goes on
+        self.root.after(QUEUE_POLL_MS, self.check_queue)
+        try:
+            while True:
+                task = self.task_queue.get_nowait()
+                if task[0] == 'job_update':
+                    self.job_updated(*task[1:])
+                elif task[0] == 'warm_up_complete':
+                    self.warm_up_complete(task[1])
+                elif task[0] == 'browser_ready':
+                    self.browser_ready(task[1], task[2])
+                elif task[0] == 'browser_error':
+                    self.browser_error(task[1], task[2])
+        except queue.Empty:
+            pass
+    
+    def start_warm_up(self):
+        self.status_bar.config(text="Ready (loading analysis libraries in the background...)")
+        thread = threading.Thread(target=self.warm_up, daemon=True)
+        thread.start()
+    
+    def warm_up(self):
+        try:
+            import pipeline
+            import data_browser
+            self.jobs.start()
+            self.task_queue.put(('warm_up_complete', None))
+        except Exception as e:
+            self.task_queue.put(('warm_up_complete', str(e)))
+    
+    def warm_up_complete(self, error):
+        # Only touch the status bar if nothing else has written to it since
+        if self.status_bar.cget("text").startswith("Ready"):
+            self.status_bar.config(text="Ready" if error is None else f"Ready (library import failed: {error})")
+        if error is None:
+            from data_browser import BrowserWorker
+            self.browser = BrowserWorker(self.task_queue)
+            if self.browser_source is not None:
+                self.load_browser(self.browser_source)
+    
+    def load_browser(self, source):
+        self.browser_source = source
+        self.sort_column = None
+        self.sort_descending = False
+        self.preview_table.set_sort_marker(None, False)
+        self.filter_text.set("")
+        if self.browser is None:
+            self.browser_status.config(text="Waiting for the analysis libraries...")
+            return
+        self.browser_status.config(text="Loading dataset...")
+        self.browser.load(source)
+    
+    def query_browser(self, text):
+        if self.browser is None or self.browser_source is None:
+            return
+        self.browser_status.config(text=text)
+        self.browser.query(self.sort_column, self.sort_descending, self.filter_text.get())
+    
+    def sort_preview(self, column, descending):
+        self.sort_column = column
+        self.sort_descending = descending
+        self.query_browser(f"Sorting by {column}...")
+    
+    def apply_filter(self):
+        self.query_browser("Filtering...")
+    
+    def browser_ready(self, generation, view):
+        # Results of requests that were overtaken by newer ones are dropped
+        if self.browser is None or generation != self.browser.generation:
+            return
+        self.preview_table.set_sort_marker(view.sort_column, view.descending)
+        self.preview_table.set_source(view)
+        total = len(view.df)
+        text = f"{total:,} rows" if len(view) == total else f"{len(view):,} of {total:,} rows"
+        if view.note:
+            text += f" ({view.note})"
+        self.browser_status.config(text=text)
+    
+    def browser_error(self, generation, message):
+        if self.browser is None or generation != self.browser.generation:
+            return
+        self.browser_status.config(text=message.splitlines()[0])
+    
+    def browse_file(self):
+        # Several files can be picked; each becomes its own analysis job
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if file_paths:
+            file_path = file_paths[0]
+            self.csv_path = file_path
+            self.sources = list(file_paths)
+            if len(file_paths) == 1:
+                self.file_label.config(text=os.path.basename(file_path), fg="green")
+            else:
+                self.file_label.config(text=f"{os.path.basename(file_path)} (+{len(file_paths) - 1} more)", fg="green")
+            self.preview_data(file_path)
+            self.load_browser(file_path)
+            self.analyze_btn.config(state=tk.NORMAL)
+            self.status_bar.config(text=f"Loaded: {', '.join(os.path.basename(path) for path in file_paths)}")
+    
+    def browse_folder(self):
+        folder_path = filedialog.askdirectory()
+        
+        if folder_path:
+            from data_loader import expand_sources
+            from vina_parser import is_vina_directory
+            if is_vina_directory(folder_path):
+                self.csv_path = folder_path
+                self.sources = [folder_path]
+                self.file_label.config(text=f"{os.path.basename(folder_path)} (Vina results)", fg="green")
+                self.preview_table.set_source(RowListSource([], []))
+                self.load_browser(folder_path)
+                self.analyze_btn.config(state=tk.NORMAL)
+                self.status_bar.config(text=f"Loaded folder: {folder_path} (AutoDock Vina output)")
+                return
+            
+            csv_files = expand_sources(folder_path)
+            if not csv_files:
+                messagebox.showerror("Error", "No CSV or AutoDock Vina result files found in the selected folder")
+                return
+            
+            self.csv_path = folder_path
+            self.sources = [folder_path]
+            self.file_label.config(text=f"{os.path.basename(folder_path)} ({len(csv_files)} CSV files)", fg="green")
+            self.preview_data(csv_files[0])
+            self.load_browser(folder_path)
+            self.analyze_btn.config(state=tk.NORMAL)
+            self.status_bar.config(text=f"Loaded folder: {folder_path} ({len(csv_files)} CSV files, merged for analysis)")
+    
+    def preview_data(self, file_path):
+        # The first rows straight from the file, shown until the full dataset
+        # has been loaded in the background
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig', errors='replace') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                rows = [row for _, row in zip(range(PREVIEW_ROWS), reader)]
+            
+            self.preview_table.set_source(RowListSource(header, rows))
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to preview file: {str(e)}")
+    
+    def start_analysis(self):
+        if not self.sources:
+            messagebox.showerror("Error", "Please select a CSV file first")
+            return
+        
+        options = {
+            'parallel_plots': self.parallel_plots.get(),
+            'render_profile': self.render_profile.get(),
+            'compact': self.compact_memory.get(),
+            'appendix': self.appendix_size(),
+            'store_results': self.store_results.get()
+        }
+        for source in self.sources:
+            self.jobs.submit(source, **options)
+        
+        count = len(self.sources)
+        self.status_bar.config(text=f"Queued {count} analys{'is' if count == 1 else 'es'}")
+    
+    def appendix_size(self):
+        choice = self.appendix.get()
+        if choice == "none":
+            return None
+        return choice if choice == "all" else int(choice)
+    
+    def job_label(self, source):
+        return os.path.basename(os.path.normpath(source))
+    
+    def job_updated(self, job_id, state, progress, text):
+        iid = str(job_id)
+        values = (job_id, self.job_label(self.jobs.jobs[job_id].source), state, f"{progress}%", text)
+        if self.jobs_tree.exists(iid):
+            self.jobs_tree.item(iid, values=values)
+        else:
+            self.jobs_tree.insert("", "end", iid=iid, values=values)
+            self.jobs_tree.see(iid)
+        
+        if job_id == self.focused_job_id():
+            self.update_progress(progress, text)
+        
+        # The final state can arrive more than once
+        if self.job_states.get(job_id) == state:
+            return
+        self.job_states[job_id] = state
+        if state == DONE:
+            self.analysis_complete(self.jobs.jobs[job_id])
+        elif state == FAILED:
+            self.analysis_error(self.jobs.jobs[job_id])
+        elif state == CANCELLED:
+            self.status_bar.config(text=f"Job {job_id} cancelled")
+    
+    def focused_job_id(self):
+        # The selected job, otherwise the oldest one that is running
+        selection = self.jobs_tree.selection()
+        if selection:
+            return int(selection[0])
+        running = [job.job_id for job in self.jobs.active_jobs() if job.state != QUEUED]
+        return min(running) if running else None
+    
+    def show_focused_job(self):
+        job = self.jobs.jobs.get(self.focused_job_id())
+        if job is not None:
+            self.update_progress(job.progress, job.text)
+    
+    def cancel_selected_job(self):
+        job_id = self.focused_job_id()
+        if job_id is None:
+            messagebox.showinfo("Info", "Select a job to cancel")
+            return
+        self.jobs.cancel(job_id)
+    
+    def update_progress(self, value, text):
+        self.progress_bar['value'] = value
+        self.progress_text.config(text=f"{value}%")
+        self.progress_label.config(text=text)
+        self.status_bar.config(text=text)
+    
+    def analysis_complete(self, job):
+        self.output_dir = job.output_dir
+        self.open_location_btn.config(state=tk.NORMAL)
+        self.output_location_label.config(text=f"Output location: {self.output_dir}", fg="blue")
+        self.status_bar.config(text="Analysis complete! Click 'Open Output Location' to view files.")
+        
+        files_info = f"Generated: • 1 PDF report • {job.plot_count} plot(s)"
+        self.generated_files_label.config(text=files_info, fg="green")
+        
+        # One message when the queue has drained, not one per job
+        if self.jobs.active_jobs():
+            return
+        messagebox.showinfo("Success", 
+                          f"Analysis complete!\n\n"
+                          f"Files saved to:\n{self.output_dir}\n\n"
+                          f"Generated:\n"
+                          f"• Docking_Analysis_Report.pdf\n"
+                          f"• {job.plot_count} plot(s) in 'plots' folder")
+    
+    def analysis_error(self, job):
+        self.status_bar.config(text=f"Analysis of {self.job_label(job.source)} failed")
+        
+        lines = job.error.split('\n')
+        main_error = lines[0] if lines else "Unknown error"
+        messagebox.showerror("Error", f"Failed to generate analysis of {self.job_label(job.source)}:\n\n{main_error}")
+    
+    def open_file_location(self):
+        job = self.jobs.jobs.get(self.focused_job_id())
+        output_dir = job.output_dir if job is not None and job.output_dir else self.output_dir
+        if output_dir and os.path.exists(output_dir):
+            try:
+                os.startfile(output_dir)
+                self.status_bar.config(text=f"Opened: {output_dir}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Cannot open file location:\n{str(e)}")
+        else:
+            messagebox.showinfo("Info", "Please generate analysis first")
+    
+    def on_close(self):
+        active = self.jobs.active_jobs()
+        if active and not messagebox.askyesno(
+                "Quit", f"{len(active)} analys{'is is' if len(active) == 1 else 'es are'} still queued or running. "
+                        f"Cancel and quit?"):
+            return
+        self.jobs.shutdown()
+        self.root.destroy()
+
+def main():
+    root = tk.Tk()
+    app = DockingAnalyzerApp(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import sys
+import numpy as np
+import pandas as pd
+
+MEMORY_REPORT_FILENAME = "memory_report.json"
+
+POINTER_BYTES = 8
+NAN_OBJECT_BYTES = sys.getsizeof(float('nan'))
+
+def object_column_bytes(series):
+    # Deep size of the same values held as Python strings (one object per
+    # row, as read_csv produces), without building that column
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        sizes = np.array([sys.getsizeof(value) for value in series.cat.categories], dtype=np.int64)
+        counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+        return int(POINTER_BYTES * len(series) + counts @ sizes + NAN_OBJECT_BYTES * np.count_nonzero(codes < 0))
+    return int(series.memory_usage(index=False, deep=True))
+
+def default_column_bytes(series):
+    if pd.api.types.is_float_dtype(series.dtype):
+        return 8 * len(series)
+    return object_column_bytes(series)
+
+def memory_report(df):
+    # 'default_bytes' is what the standard load holds for the same rows:
+    # object strings, float64 numbers and an int64 index
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        columns.append({
+            'column': str(col),
+            'dtype': str(series.dtype),
+            'bytes': int(series.memory_usage(index=False, deep=True)),
+            'default_bytes': default_column_bytes(series)
+        })
+    index_bytes = int(df.index.memory_usage(deep=True))
+    total = index_bytes + sum(c['bytes'] for c in columns)
+    default_total = 8 * len(df) + sum(c['default_bytes'] for c in columns)
+    return {
+        'rows': len(df),
+        'columns': columns,
+        'index_bytes': index_bytes,
+        'total_bytes': total,
+        'default_total_bytes': default_total,
+        'dropped_columns': list(df.attrs.get('dropped_columns', []))
+    }
+
+def format_bytes(count):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if count < 1024 or unit == 'GB':
+            return f"{count:,.0f} {unit}" if unit == 'B' else f"{count:,.1f} {unit}"
+        count /= 1024
\ No newline at end of file
@@ -1,310 +1,563 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from datetime import datetime
-import os
-from data_loader import DataLoader
-
-class PDFGenerator:
-    def __init__(self, df, plot_files, plots_dir, csv_path):
-        self.df = df
-        self.plot_files = plot_files
-        self.plots_dir = plots_dir
-        self.csv_path = csv_path
-        
-        self.styles = getSampleStyleSheet()
-        self.setup_styles()
-    
-    def setup_styles(self):
-        self.styles.add(ParagraphStyle(
-            name='CompactTitle',
-            parent=self.styles['Title'],
-            fontSize=14,
-            spaceAfter=5,
-            textColor=colors.HexColor('#2c3e50'),
-            alignment=1
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CompactHeading1',
-            parent=self.styles['Heading1'],
-            fontSize=11,
-            spaceAfter=2,
-            spaceBefore=2,
-            textColor=colors.HexColor('#3498db')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CompactHeading2',
-            parent=self.styles['Heading2'],
-            fontSize=9,
-            spaceAfter=1,
-            spaceBefore=1,
-            textColor=colors.HexColor('#2c3e50')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CompactBody',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            leading=9,
-            spaceAfter=1
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='NoSpace',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            leading=9,
-            spaceAfter=0
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SmallText',
-            parent=self.styles['Normal'],
-            fontSize=7,
-            leading=8,
-            spaceAfter=0
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='TinyText',
-            parent=self.styles['Normal'],
-            fontSize=6,
-            leading=7,
-            spaceAfter=0
-        ))
-    
-    def get_top_ligands(self):
-        loader = DataLoader(self.csv_path)
-        return loader.get_top_ligands(self.df)
-    
-    def truncate_ligand_name(self, name, max_length=40):
-        if len(name) <= max_length:
-            return name
-        
-        if '_' in name:
-            parts = name.split('_')
-            if len(parts) > 3:
-                truncated = '_'.join(parts[:2]) + '...' + parts[-1]
-                if len(truncated) <= max_length:
-                    return truncated
-        
-        return name[:max_length-3] + "..."
-    
-    def generate_pdf(self, pdf_path, task_queue=None):
-        try:
-            if task_queue:
-                task_queue.put(('update_progress', 90, "Creating PDF structure..."))
-            
-            doc = SimpleDocTemplate(pdf_path, pagesize=A4,
-                                  rightMargin=15, leftMargin=15,
-                                  topMargin=15, bottomMargin=15)
-            story = []
-                        
-            if task_queue:
-                task_queue.put(('update_progress', 92, "Creating cover page..."))
-            
-            story.append(Paragraph("DOCKING RESULTS ANALYSIS", self.styles['CompactTitle']))
-            story.append(Spacer(1, 5))
-            
-            cover_info = [
-                ["Analysis Date:", datetime.now().strftime("%Y-%m-%d")],
-                ["Input File:", os.path.basename(self.csv_path)],
-                ["Total Records:", f"{len(self.df):,}"],
-                ["Generated By:", "Docking Analyzer"]
-            ]
-            
-            cover_table = Table(cover_info, colWidths=[0.8*inch, 4*inch])
-            cover_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                ('TOPPADDING', (0, 0), (-1, -1), 1),
-            ]))
-            
-            story.append(cover_table)
-            story.append(Spacer(1, 8))
-            
-            if 'binding_affinity' in self.df.columns:
-                stats_text = f"""<b>QUICK STATISTICS:</b>
-                • Best Binding: {self.df['binding_affinity'].min():.2f} kcal/mol
-                • Worst Binding: {self.df['binding_affinity'].max():.2f} kcal/mol
-                • Average: {self.df['binding_affinity'].mean():.2f} ± {self.df['binding_affinity'].std():.2f} kcal/mol
-                • Visualizations: {len(self.plot_files)} plots analyzed"""
-                story.append(Paragraph(stats_text, self.styles['SmallText']))
-            
-            story.append(Spacer(1, 10))
-            
-            story.append(Paragraph("1. EXECUTIVE SUMMARY", self.styles['CompactHeading1']))
-            
-            summary = f"""This report analyzes {len(self.df):,} docking poses. Key metrics show binding affinities ranging from {self.df['binding_affinity'].min():.2f} to {self.df['binding_affinity'].max():.2f} kcal/mol with a mean of {self.df['binding_affinity'].mean():.3f} ± {self.df['binding_affinity'].std():.3f} kcal/mol."""
-            
-            story.append(Paragraph(summary, self.styles['CompactBody']))
-            story.append(Spacer(1, 5))
-                        
-            if task_queue:
-                task_queue.put(('update_progress', 94, "Adding top ligands analysis..."))
-            
-            story.append(Paragraph("2. TOP LIGANDS ANALYSIS", self.styles['CompactHeading1']))
-            
-            top_ligands = self.get_top_ligands()
-            
-            if not top_ligands.empty:
-                story.append(Paragraph("Top 10 Ligands (Minimum Binding Affinity)", self.styles['CompactHeading2']))
-                
-                zero_rmsd_count = len(top_ligands[(top_ligands['rmsd_ub'] == 0) & (top_ligands['rmsd_lb'] == 0)])
-                
-                selection_note = f"<b>Selection:</b> Minimum binding affinity, RMSD ub/lb = 0 ({zero_rmsd_count} ligands)"
-                story.append(Paragraph(selection_note, self.styles['SmallText']))
-                story.append(Spacer(1, 2))
-                
-                top_data = [["#", "Ligand Name", "Binding", "RMSD ub", "RMSD lb"]]
-                
-                for i, (_, row) in enumerate(top_ligands.head(10).iterrows(), 1):
-                    ligand_name = str(row['ligand'])
-                    
-                    top_data.append([
-                        str(i),
-                        ligand_name,  
-                        f"{row['binding_affinity']:.3f}",
-                        f"{row['rmsd_ub']:.2f}",
-                        f"{row['rmsd_lb']:.2f}"
-                    ])
-                
-                top_table = Table(top_data, colWidths=[0.25*inch, 3.5*inch, 0.6*inch, 0.6*inch, 0.6*inch])
-                top_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('ALIGN', (1, 0), (1, -1), 'LEFT'), 
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 6),
-                    ('FONTSIZE', (1, 0), (1, -1), 5),  
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-                    ('TOPPADDING', (0, 0), (-1, -1), 1),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('WORDWRAP', (1, 0), (1, -1), True),  
-                ]))
-                
-                story.append(top_table)
-                story.append(Spacer(1, 8))
-                        
-            from reportlab.platypus import PageBreak
-            story.append(PageBreak())
-            
-            if task_queue:
-                task_queue.put(('update_progress', 95, "Adding recommended ligands..."))
-            
-            if not top_ligands.empty and len(top_ligands) >= 3:
-                top3 = top_ligands.head(3)
-                
-                story.append(Paragraph("3. TOP 3 RECOMMENDED LIGANDS", self.styles['CompactHeading1']))
-                
-                rec_text = "These ligands show the most promise for further study:"
-                story.append(Paragraph(rec_text, self.styles['CompactBody']))
-                story.append(Spacer(1, 3))
-                
-                top3_data = [["Rank", "Ligand Name", "Binding Affinity", "RMSD ub", "RMSD lb"]]
-                
-                for i, (_, row) in enumerate(top3.iterrows(), 1):
-                    ligand_name = str(row['ligand'])
-                    
-                    top3_data.append([
-                        str(i),
-                        ligand_name,  
-                        f"{row['binding_affinity']:.4f}",
-                        f"{row['rmsd_ub']:.3f}",
-                        f"{row['rmsd_lb']:.3f}"
-                    ])
-                
-                top3_table = Table(top3_data, colWidths=[0.3*inch, 3.7*inch, 0.7*inch, 0.6*inch, 0.6*inch])
-                top3_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('ALIGN', (1, 0), (1, -1), 'LEFT'),  
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('FONTSIZE', (1, 0), (1, -1), 6),  
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('WORDWRAP', (1, 0), (1, -1), True),  
-                ]))
-                
-                story.append(top3_table)
-                story.append(Spacer(1, 8))
-                
-                story.append(Paragraph("<b>Additional Details:</b>", self.styles['CompactBody']))
-                
-                details_text = ""
-                for i, (_, row) in enumerate(top3.iterrows(), 1):
-                    ligand_name = str(row['ligand'])
-                    details_text += f"{i}. <b>{ligand_name}</b>: Binding = {row['binding_affinity']:.4f} kcal/mol, RMSD ub/lb = {row['rmsd_ub']:.3f}/{row['rmsd_lb']:.3f}<br/>"
-                
-                story.append(Paragraph(details_text, self.styles['TinyText']))
-                story.append(Spacer(1, 5))
-                        
-            if task_queue:
-                task_queue.put(('update_progress', 97, "Adding statistics..."))
-            
-            story.append(Paragraph("4. STATISTICAL ANALYSIS", self.styles['CompactHeading1']))
-            
-            if 'binding_affinity' in self.df.columns:
-                story.append(Paragraph("Binding Affinity Statistics", self.styles['CompactHeading2']))
-                
-                stats = self.df['binding_affinity'].describe()
-                stats_data = [
-                    ["Metric", "Value (kcal/mol)"],
-                    ["Mean", f"{stats['mean']:.4f}"],
-                    ["Std Deviation", f"{stats['std']:.4f}"],
-                    ["Minimum (Best)", f"{stats['min']:.4f}"],
-                    ["Maximum", f"{stats['max']:.4f}"],
-                    ["25th Percentile", f"{stats['25%']:.4f}"],
-                    ["50th Percentile", f"{stats['50%']:.4f}"],
-                    ["75th Percentile", f"{stats['75%']:.4f}"],
-                    ["Count", f"{int(stats['count']):,}"]
-                ]
-                
-                stats_table = Table(stats_data, colWidths=[1.5*inch, 1.2*inch])
-                stats_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-                ]))
-                
-                story.append(stats_table)
-                story.append(Spacer(1, 8))
-                                    
-            top_ligand_names = []
-            if not top_ligands.empty:
-                for i, (_, row) in enumerate(top_ligands.head(3).iterrows(), 1):
-                    ligand_name = str(row['ligand'])
-                    if len(ligand_name) > 30:
-                        ligand_name = self.truncate_ligand_name(ligand_name, 30)
-                    top_ligand_names.append(f"{i}. {ligand_name}")
-                        
-            story.append(Spacer(1, 10))
-            story.append(Paragraph(f"Report generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-                                  ParagraphStyle(name='Footer', fontSize=6, alignment=1, textColor=colors.gray)))
-            
-            if task_queue:
-                task_queue.put(('update_progress', 98, "Finalizing PDF..."))
-            
-            doc.build(story)
-            
-            if task_queue:
-                task_queue.put(('update_progress', 99, "PDF completed!"))
-            
-        except Exception as e:
-            import traceback
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle, Image, KeepTogether, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from datetime import datetime
+from PIL import Image as PILImage
+import numpy as np
+import hashlib
+import shutil
+import tempfile
+import os
+from xml.sax.saxutils import escape
+from data_loader import source_label
+from ligand_index import LigandIndex, BEST_POSE, RAW_POSES
+from kde import column_kde, find_modes
+from stats_engine import dataset_stats
+from instrumentation import JobCancelled
+from render_profiles import preview_filename, PREVIEW_DPI
+from bootstrap import bootstrap_ranking, DEFAULT_ITERATIONS, DEFAULT_SEED, CONFIDENCE
+
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Share of the PDF stage's progress given to image preparation; the rest
+# follows the flowables laid out by doc.build()
+IMAGE_PROGRESS_SHARE = 0.5
+
+# Embedded plots are resampled to this print resolution and stored as JPEG
+DEFAULT_IMAGE_DPI = 150
+IMAGE_QUALITY = 90
+IMAGE_MAX_WIDTH = 6.5 * inch
+IMAGE_MAX_HEIGHT = 4.4 * inch
+
+TOP_TABLE_ROWS = 10
+
+# Files named on the cover page when some Vina results could not be parsed;
+# timings.json lists all of them
+UNPARSED_NAMES_SHOWN = 5
+
+# Appendix size: None for no appendix, a number of ligands, or every ligand
+APPENDIX_ALL = 'all'
+
+# The appendix is laid out as one LongTable per page with fixed row heights
+# and column widths, so reportlab never measures cells or splits a huge table
+APPENDIX_ROW_HEIGHT = 8
+APPENDIX_ROWS_PER_TABLE = 95
+APPENDIX_NAME_CHARS = 60
+
+def parse_appendix(value):
+    if value is None or str(value).strip().lower() in ('', '0', 'none'):
+        return None
+    if str(value).strip().lower() == APPENDIX_ALL:
+        return APPENDIX_ALL
+    count = int(value)
+    if count < 0:
+        raise ValueError(f"Appendix size must be positive: {value}")
+    return count
+
+def format_fixed(values, decimals):
+    # Scores and RMSDs repeat a lot once rounded, so each distinct value is
+    # formatted once and the strings are gathered by index
+    values = np.round(np.asarray(values, dtype=np.float64), decimals)
+    unique, inverse = np.unique(values, return_inverse=True)
+    formatted = np.array([f"{value:.{decimals}f}" for value in unique], dtype=object)
+    return formatted[inverse.reshape(-1)].tolist()
+
+def format_names(names, max_length=None):
+    names = names.astype(str)
+    if max_length is not None:
+        long_names = names.str.len() > max_length
+        if long_names.any():
+            names = names.where(~long_names, names.str.slice(0, max_length - 3) + "...")
+    return names.tolist()
+
+class PDFGenerator:
+    def __init__(self, df, plot_files, plots_dir, csv_path, summary=None, ranking=BEST_POSE,
+                 image_dpi=DEFAULT_IMAGE_DPI, appendix=None, bootstrap_iterations=DEFAULT_ITERATIONS,
+                 bootstrap_seed=DEFAULT_SEED, unparsed_files=None):
+        self.df = df
+        self.plot_files = plot_files
+        self.plots_dir = plots_dir
+        self.csv_path = csv_path
+        self.summary = summary
+        self.ranking = ranking
+        self.image_dpi = image_dpi
+        self.appendix = appendix
+        self.bootstrap_iterations = bootstrap_iterations
+        self.bootstrap_seed = bootstrap_seed
+        self.unparsed_files = unparsed_files or {}
+        self.flowable_estimate = 1
+        
+        self.styles = getSampleStyleSheet()
+        self.setup_styles()
+    
+    def setup_styles(self):
+        self.styles.add(ParagraphStyle(
+            name='CompactTitle',
+            parent=self.styles['Title'],
+            fontSize=14,
+            spaceAfter=5,
+            textColor=colors.HexColor('#2c3e50'),
+            alignment=1
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='CompactHeading1',
+            parent=self.styles['Heading1'],
+            fontSize=11,
+            spaceAfter=2,
+            spaceBefore=2,
+            textColor=colors.HexColor('#3498db')
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='CompactHeading2',
+            parent=self.styles['Heading2'],
+            fontSize=9,
+            spaceAfter=1,
+            spaceBefore=1,
+            textColor=colors.HexColor('#2c3e50')
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='CompactBody',
+            parent=self.styles['Normal'],
+            fontSize=8,
+            leading=9,
+            spaceAfter=1
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='NoSpace',
+            parent=self.styles['Normal'],
+            fontSize=8,
+            leading=9,
+            spaceAfter=0
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='SmallText',
+            parent=self.styles['Normal'],
+            fontSize=7,
+            leading=8,
+            spaceAfter=0
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='TinyText',
+            parent=self.styles['Normal'],
+            fontSize=6,
+            leading=7,
+            spaceAfter=0
+        ))
+    
+    def ranked_count(self):
+        if self.appendix is None:
+            return TOP_TABLE_ROWS
+        if self.appendix == APPENDIX_ALL:
+            return len(self.df) if self.summary is None else self.summary.top_k
+        return max(TOP_TABLE_ROWS, self.appendix)
+    
+    def get_top_ligands(self, k=TOP_TABLE_ROWS):
+        if self.summary is not None:
+            return self.summary.top_ligands(self.ranking)
+        return LigandIndex.for_frame(self.df).top(k, self.ranking)
+    
+    def format_ranked_rows(self, ranked, binding_decimals, rmsd_decimals, name_length=None):
+        # Column by column; rows are only assembled by zip at the end
+        columns = [
+            [str(i) for i in range(1, len(ranked) + 1)],
+            format_names(ranked['ligand'], name_length),
+            format_fixed(ranked['binding_affinity'], binding_decimals),
+            format_fixed(ranked['rmsd_ub'], rmsd_decimals),
+            format_fixed(ranked['rmsd_lb'], rmsd_decimals)
+        ]
+        if 'pose_count' in ranked.columns:
+            columns.append([str(count) for count in ranked['pose_count'].tolist()])
+        return [list(row) for row in zip(*columns)]
+    
+    def ranking_confidence(self, monitor=None):
+        # Needs every pose in memory and one row per ligand
+        if self.summary is not None or self.ranking != BEST_POSE or not self.bootstrap_iterations:
+            return None
+        if monitor is None:
+            return bootstrap_ranking(self.df, TOP_TABLE_ROWS, self.bootstrap_iterations, self.bootstrap_seed)
+        monitor.report("Bootstrapping the ligand ranking...")
+        with monitor.timed('bootstrap'):
+            return bootstrap_ranking(self.df, TOP_TABLE_ROWS, self.bootstrap_iterations, self.bootstrap_seed,
+                                     monitor=monitor)
+    
+    def format_confidence(self, ranked, confidence, threshold):
+        # "[low, high]" and the share of resamples within the top threshold,
+        # per ranked row
+        column = f'p_top{threshold}'
+        rows = []
+        for name in ranked['ligand'].astype(str).tolist():
+            if confidence is None or name not in confidence.index or column not in confidence.columns:
+                rows.append(["-", "-"])
+                continue
+            entry = confidence.loc[name]
+            rows.append([f"[{entry['ci_low']:.2f}, {entry['ci_high']:.2f}]", f"{entry[column]:.0%}"])
+        return rows
+    
+    @property
+    def stats(self):
+        return dataset_stats(self.df, self.summary)
+    
+    def record_count(self):
+        return self.stats.rows
+    
+    def has_affinity(self):
+        return self.stats.has_column('binding_affinity')
+    
+    def affinity_stats(self):
+        if not self.has_affinity():
+            raise KeyError('binding_affinity')
+        return self.stats.describe('binding_affinity')
+    
+    def unparsed_note(self):
+        names = sorted(self.unparsed_files)
+        shown = ", ".join(escape(name) for name in names[:UNPARSED_NAMES_SHOWN])
+        if len(names) > UNPARSED_NAMES_SHOWN:
+            shown += f" and {len(names) - UNPARSED_NAMES_SHOWN:,} more"
+        return f"<b>NOT ANALYZED:</b> {len(names):,} result file(s) could not be parsed: {shown}"
+    
+    def prepare_plot_image(self, plot_path, image_dir, prepared):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(plot_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        key = digest.hexdigest()
+        if key in prepared:
+            return prepared[key]
+        
+        # Only one full-resolution bitmap is decoded at a time; what reaches
+        # the story is a small JPEG on disk that reportlab reads when drawing.
+        with PILImage.open(plot_path) as img:
+            width, height = img.size
+            scale = min(IMAGE_MAX_WIDTH / width, IMAGE_MAX_HEIGHT / height)
+            draw_width, draw_height = width * scale, height * scale
+            target = (max(1, int(draw_width / 72 * self.image_dpi)),
+                      max(1, int(draw_height / 72 * self.image_dpi)))
+            img.draft('RGB', target)
+            img = img.convert('RGB')
+            if target[0] < img.size[0]:
+                img = img.resize(target, PILImage.LANCZOS)
+            prepared_path = os.path.join(image_dir, f"{key}.jpg")
+            img.save(prepared_path, 'JPEG', quality=IMAGE_QUALITY, optimize=True)
+        
+        prepared[key] = (prepared_path, draw_width, draw_height)
+        return prepared[key]
+    
+    def build_progress(self, monitor, kind, value):
+        if kind == 'SIZE_EST':
+            self.flowable_estimate = max(value, 1)
+        elif kind == 'PROGRESS':
+            share = 1 - IMAGE_PROGRESS_SHARE
+            monitor.set_progress(IMAGE_PROGRESS_SHARE + share * min(value / self.flowable_estimate, 1.0))
+    
+    def add_visualizations(self, story, image_dir, monitor=None):
+        story.append(PageBreak())
+        story.append(Paragraph("5. VISUALIZATIONS", self.styles['CompactHeading1']))
+        
+        prepared = {}
+        previews = []
+        skipped = []
+        for filename, title in self.plot_files:
+            plot_path = os.path.join(self.plots_dir, filename)
+            if not filename.lower().endswith(RASTER_EXTENSIONS):
+                # Vector plots come with a raster preview for the report
+                previews.append(filename)
+                plot_path = os.path.join(self.plots_dir, preview_filename(filename))
+            if not os.path.exists(plot_path):
+                skipped.append(filename)
+                continue
+            
+            image_path, width, height = self.prepare_plot_image(plot_path, image_dir, prepared)
+            if monitor:
+                monitor.advance(IMAGE_PROGRESS_SHARE / len(self.plot_files), "Adding visualizations...")
+            story.append(KeepTogether([
+                Paragraph(title, self.styles['CompactHeading2']),
+                Image(image_path, width=width, height=height, lazy=2),
+                Spacer(1, 6)
+            ]))
+        
+        if previews:
+            note = (f"Vector plots are shown as {PREVIEW_DPI} dpi previews; the vector files are in the "
+                    f"plots folder")
+            story.append(Paragraph(note, self.styles['SmallText']))
+        if skipped:
+            note = f"Not embedded, see the plots folder: {', '.join(skipped)}"
+            story.append(Paragraph(note, self.styles['SmallText']))
+    
+    def add_appendix(self, story, ranked):
+        section = 6 if self.plot_files else 5
+        story.append(PageBreak())
+        story.append(Paragraph(f"{section}. APPENDIX: RANKED LIGANDS", self.styles['CompactHeading1']))
+        
+        if self.ranking == RAW_POSES:
+            note = f"{len(ranked):,} poses, minimum binding affinity first"
+        else:
+            note = f"{len(ranked):,} ligands by best pose, minimum binding affinity first"
+        if self.summary is not None and (self.appendix == APPENDIX_ALL or len(ranked) < self.appendix):
+            note += f" (streamed input: limited to the best {self.summary.top_k:,} kept while reading)"
+        story.append(Paragraph(note, self.styles['SmallText']))
+        story.append(Spacer(1, 3))
+        
+        header = ["#", "Ligand Name", "Binding", "RMSD ub", "RMSD lb"]
+        col_widths = [0.5*inch, 3.9*inch, 0.7*inch, 0.6*inch, 0.6*inch]
+        if 'pose_count' in ranked.columns:
+            header.append("Poses")
+            col_widths.append(0.5*inch)
+        
+        style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 6),
+            # Left-aligned cells are drawn without measuring the text first
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
+            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.grey),
+        ])
+        
+        rows = self.format_ranked_rows(ranked, 3, 3, APPENDIX_NAME_CHARS)
+        for start in range(0, len(rows), APPENDIX_ROWS_PER_TABLE):
+            chunk = [header] + rows[start:start + APPENDIX_ROWS_PER_TABLE]
+            table = LongTable(chunk, colWidths=col_widths, rowHeights=APPENDIX_ROW_HEIGHT, repeatRows=1)
+            table.setStyle(style)
+            story.append(table)
+    
+    def generate_pdf(self, pdf_path, monitor=None):
+        try:
+            if monitor:
+                monitor.report("Creating PDF structure...")
+            
+            doc = SimpleDocTemplate(pdf_path, pagesize=A4,
+                                  rightMargin=15, leftMargin=15,
+                                  topMargin=15, bottomMargin=15)
+            story = []
+            
+            if monitor:
+                monitor.report("Creating cover page...")
+            
+            story.append(Paragraph("DOCKING RESULTS ANALYSIS", self.styles['CompactTitle']))
+            story.append(Spacer(1, 5))
+            
+            cover_info = [
+                ["Analysis Date:", datetime.now().strftime("%Y-%m-%d")],
+                ["Input File:", source_label(self.csv_path)],
+                ["Total Records:", f"{self.record_count():,}"],
+                ["Generated By:", "Docking Analyzer"]
+            ]
+            if 'source' in self.df.columns:
+                cover_info.insert(2, ["Source Files:", f"{self.df['source'].nunique():,}"])
+            
+            cover_table = Table(cover_info, colWidths=[0.8*inch, 4*inch])
+            cover_table.setStyle(TableStyle([
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 7),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+                ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ]))
+            
+            story.append(cover_table)
+            story.append(Spacer(1, 8))
+            
+            if self.has_affinity():
+                stats = self.affinity_stats()
+                stats_text = f"""<b>QUICK STATISTICS:</b>
+                • Best Binding: {stats['min']:.2f} kcal/mol
+                • Worst Binding: {stats['max']:.2f} kcal/mol
+                • Average: {stats['mean']:.2f} ± {stats['std']:.2f} kcal/mol
+                • Visualizations: {len(self.plot_files)} plots analyzed"""
+                story.append(Paragraph(stats_text, self.styles['SmallText']))
+            
+            if self.unparsed_files:
+                story.append(Paragraph(self.unparsed_note(), self.styles['SmallText']))
+            
+            story.append(Spacer(1, 10))
+            
+            story.append(Paragraph("1. EXECUTIVE SUMMARY", self.styles['CompactHeading1']))
+            
+            stats = self.affinity_stats()
+            summary = f"""This report analyzes {self.record_count():,} docking poses. Key metrics show binding affinities ranging from {stats['min']:.2f} to {stats['max']:.2f} kcal/mol with a mean of {stats['mean']:.3f} ± {stats['std']:.3f} kcal/mol."""
+            
+            story.append(Paragraph(summary, self.styles['CompactBody']))
+            story.append(Spacer(1, 5))
+            
+            if monitor:
+                monitor.report("Adding top ligands analysis...")
+            
+            story.append(Paragraph("2. TOP LIGANDS ANALYSIS", self.styles['CompactHeading1']))
+            
+            ranked = self.get_top_ligands(self.ranked_count())
+            top_ligands = ranked.head(TOP_TABLE_ROWS)
+            confidence = self.ranking_confidence(monitor)
+            ci_label = f"{CONFIDENCE:.0%} CI"
+            
+            if not top_ligands.empty:
+                story.append(Paragraph("Top 10 Ligands (Minimum Binding Affinity)", self.styles['CompactHeading2']))
+                
+                zero_rmsd_count = len(top_ligands[(top_ligands['rmsd_ub'] == 0) & (top_ligands['rmsd_lb'] == 0)])
+                
+                selection_note = f"<b>Selection:</b> Minimum binding affinity, RMSD ub/lb = 0 ({zero_rmsd_count} ligands)"
+                if self.ranking == BEST_POSE:
+                    selection_note += ", best pose per ligand"
+                else:
+                    selection_note += ", all poses"
+                story.append(Paragraph(selection_note, self.styles['SmallText']))
+                if confidence is not None:
+                    story.append(Paragraph(
+                        f"<b>Stability:</b> {ci_label} of each ligand's best affinity and the share of "
+                        f"{confidence.attrs['iterations']:,} bootstrap resamples of its poses (seed "
+                        f"{confidence.attrs['seed']}) in which it stays in the top {TOP_TABLE_ROWS}; "
+                        f"tied ligands share a rank", self.styles['SmallText']))
+                story.append(Spacer(1, 2))
+                
+                top_data = [["#", "Ligand Name", "Binding", ci_label, f"P(top {TOP_TABLE_ROWS})", "RMSD ub", "RMSD lb"]]
+                top_rows = self.format_ranked_rows(top_ligands, 3, 2)
+                top_confidence = self.format_confidence(top_ligands, confidence, TOP_TABLE_ROWS)
+                top_data += [row[:3] + extra + row[3:5] for row, extra in zip(top_rows, top_confidence)]
+                
+                top_table = Table(top_data, colWidths=[0.25*inch, 3.3*inch, 0.6*inch, 1.0*inch, 0.6*inch,
+                                                       0.6*inch, 0.6*inch])
+                top_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('ALIGN', (1, 0), (1, -1), 'LEFT'), 
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 6),
+                    ('FONTSIZE', (1, 0), (1, -1), 5),  
+                    ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+                    ('TOPPADDING', (0, 0), (-1, -1), 1),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                    ('WORDWRAP', (1, 0), (1, -1), True),  
+                ]))
+                
+                story.append(top_table)
+                story.append(Spacer(1, 8))
+            
+            story.append(PageBreak())
+            
+            if monitor:
+                monitor.report("Adding recommended ligands...")
+            
+            if not top_ligands.empty and len(top_ligands) >= 3:
+                top3 = top_ligands.head(3)
+                
+                story.append(Paragraph("3. TOP 3 RECOMMENDED LIGANDS", self.styles['CompactHeading1']))
+                
+                rec_text = "These ligands show the most promise for further study:"
+                story.append(Paragraph(rec_text, self.styles['CompactBody']))
+                story.append(Spacer(1, 3))
+                
+                # Formatted once, for the table and for the details below it
+                top3_rows = [row[:5] for row in self.format_ranked_rows(top3, 4, 3)]
+                top3_confidence = self.format_confidence(top3, confidence, 3)
+                top3_data = [["Rank", "Ligand Name", "Binding Affinity", ci_label, "P(top 3)", "RMSD ub", "RMSD lb"]]
+                top3_data += [row[:3] + extra + row[3:] for row, extra in zip(top3_rows, top3_confidence)]
+                
+                top3_table = Table(top3_data, colWidths=[0.3*inch, 3.3*inch, 0.8*inch, 1.0*inch, 0.6*inch,
+                                                         0.6*inch, 0.6*inch])
+                top3_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('ALIGN', (1, 0), (1, -1), 'LEFT'),  
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('FONTSIZE', (1, 0), (1, -1), 6),  
+                    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                    ('WORDWRAP', (1, 0), (1, -1), True),  
+                ]))
+                
+                story.append(top3_table)
+                story.append(Spacer(1, 8))
+                
+                story.append(Paragraph("<b>Additional Details:</b>", self.styles['CompactBody']))
+                
+                details_text = "".join(f"{rank}. <b>{name}</b>: Binding = {binding} kcal/mol, RMSD ub/lb = {ub}/{lb}"
+                                       + (f", {ci_label} {ci}, top 3 in {share} of resamples" if ci != "-" else "")
+                                       + "<br/>"
+                                       for (rank, name, binding, ub, lb), (ci, share) in zip(top3_rows, top3_confidence))
+                
+                story.append(Paragraph(details_text, self.styles['TinyText']))
+                story.append(Spacer(1, 5))
+            
+            if monitor:
+                monitor.report("Adding statistics...")
+            
+            story.append(Paragraph("4. STATISTICAL ANALYSIS", self.styles['CompactHeading1']))
+            
+            if self.has_affinity():
+                story.append(Paragraph("Binding Affinity Statistics", self.styles['CompactHeading2']))
+                
+                stats = self.affinity_stats()
+                stats_data = [
+                    ["Metric", "Value (kcal/mol)"],
+                    ["Mean", f"{stats['mean']:.4f}"],
+                    ["Std Deviation", f"{stats['std']:.4f}"],
+                    ["Minimum (Best)", f"{stats['min']:.4f}"],
+                    ["Maximum", f"{stats['max']:.4f}"],
+                    ["25th Percentile", f"{stats['25%']:.4f}"],
+                    ["50th Percentile", f"{stats['50%']:.4f}"],
+                    ["75th Percentile", f"{stats['75%']:.4f}"],
+                    ["Count", f"{int(stats['count']):,}"]
+                ]
+                
+                modes = find_modes(column_kde(self.df, 'binding_affinity', self.summary))
+                if modes:
+                    stats_data.append(["Density Mode(s)", ", ".join(f"{mode:.2f}" for mode in modes)])
+                
+                stats_table = Table(stats_data, colWidths=[1.5*inch, 1.2*inch])
+                stats_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+                ]))
+                
+                story.append(stats_table)
+                story.append(Spacer(1, 8))
+            
+            # The story refers to JPEGs in here until doc.build() has drawn them
+            image_dir = tempfile.mkdtemp(prefix='docking_report_')
+            try:
+                if self.plot_files:
+                    self.add_visualizations(story, image_dir, monitor)
+                
+                if self.appendix is not None and not ranked.empty:
+                    if monitor:
+                        monitor.report("Adding ranked ligand appendix...")
+                    self.add_appendix(story, ranked)
+                
+                story.append(Spacer(1, 10))
+                story.append(Paragraph(f"Report generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
+                                      ParagraphStyle(name='Footer', fontSize=6, alignment=1, textColor=colors.gray)))
+                
+                if monitor:
+                    monitor.set_progress(IMAGE_PROGRESS_SHARE, text="Finalizing PDF...")
+                    doc.setProgressCallBack(lambda kind, value: self.build_progress(monitor, kind, value))
+                
+                doc.build(story)
+            finally:
+                shutil.rmtree(image_dir, ignore_errors=True)
+        
+        except JobCancelled:
+            raise
+        except Exception as e:
+            import traceback
             raise Exception(f"PDF creation failed: {str(e)}\n{traceback.format_exc()}")
\ No newline at end of file
@@ -0,0 +1,248 @@
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+from data_cache import fingerprint
+from data_loader import DataLoader, MultiSourceLoader, is_multi_source, expand_sources, source_label
+from plot_generator import PlotGenerator, PLOT_METHODS, DEFAULT_RENDER_PROFILE
+from pdf_generator import PDFGenerator, TOP_TABLE_ROWS, APPENDIX_ALL
+from ligand_index import BEST_POSE
+from plot_cache import PlotCache
+from vina_parser import VinaLoader, is_vina_directory, scan_vina_files
+from instrumentation import RunMonitor, load_stage_weights, TIMINGS_FILENAME
+from memory_report import memory_report, MEMORY_REPORT_FILENAME
+from results_store import ResultsStore
+from bootstrap import DEFAULT_ITERATIONS, DEFAULT_SEED
+
+STREAMING_THRESHOLD_BYTES = 512 * 1024 * 1024
+
+# A streamed load keeps only this many ranked ligands for an "all" appendix
+STREAMED_APPENDIX_LIMIT = 10_000
+
+REPORT_FILENAME = "Docking_Analysis_Report.pdf"
+
+# The results database is a by-product of the report: these are recorded in
+# timings.json and the analysis goes on without the database
+STORE_ERRORS = (sqlite3.Error, OSError)
+
+def default_output_dir():
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    downloads_path = os.path.join(os.path.expanduser("~"), "Downloads")
+    return os.path.join(downloads_path, f"Docking_Analysis_{timestamp}")
+
+def reserve_output_dir(path):
+    # Creating the directory claims the name, so runs started in the same
+    # second (e.g. queued jobs in parallel processes) get their own folder
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    candidate = path
+    suffix = 1
+    while True:
+        try:
+            os.mkdir(candidate)
+            return candidate
+        except FileExistsError:
+            suffix += 1
+            candidate = f"{path}_{suffix}"
+
+def input_fingerprint(source):
+    # Unchanged inputs give the same fingerprint, so a re-analysis is not
+    # stored twice. Vina folders are described by their scan (mtime and size
+    # per result file), CSVs by the data cache's fingerprint.
+    if is_vina_directory(source):
+        files = {os.path.abspath(source): scan_vina_files(source)}
+    else:
+        files = [fingerprint(path) for path in expand_sources(source)]
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+
+class AnalysisPipeline:
+    def __init__(self, csv_path, output_dir, parallel_plots=False,
+                 streaming_threshold=STREAMING_THRESHOLD_BYTES, use_cache=True,
+                 ranking=BEST_POSE, render_profile=DEFAULT_RENDER_PROFILE, profile_stages=None,
+                 compact=False, appendix=None, store_results=True, results_db=None,
+                 bootstrap_iterations=DEFAULT_ITERATIONS, bootstrap_seed=DEFAULT_SEED):
+        self.csv_path = csv_path
+        self.output_dir = output_dir
+        self.plots_dir = os.path.join(output_dir, "plots")
+        self.pdf_path = os.path.join(output_dir, REPORT_FILENAME)
+        self.parallel_plots = parallel_plots
+        self.streaming_threshold = streaming_threshold
+        self.use_cache = use_cache
+        self.ranking = ranking
+        self.render_profile = render_profile
+        self.profile_stages = profile_stages
+        self.compact = compact
+        self.appendix = appendix
+        self.store_results = store_results
+        self.results_db = results_db
+        self.bootstrap_iterations = bootstrap_iterations
+        self.bootstrap_seed = bootstrap_seed
+        self.timings_path = os.path.join(output_dir, TIMINGS_FILENAME)
+        
+        self.df = None
+        self.summary = None
+        self.plot_files = []
+        self.monitor = None
+        self.run_id = None
+        self.store = None
+        self.writer = None
+        self.store_status = None
+        self.unparsed_files = {}
+    
+    def load(self, on_chunk=None):
+        if is_vina_directory(self.csv_path):
+            self.summary = None
+            loader = VinaLoader(self.csv_path, cache=self.use_cache)
+            self.df = loader.load_data()
+            self.unparsed_files = loader.failed
+            return self.df
+        
+        if is_multi_source(self.csv_path):
+            self.summary = None
+            self.df = MultiSourceLoader(self.csv_path, cache=self.use_cache,
+                                        compact=self.compact).load_data()
+            return self.df
+        
+        loader = DataLoader(self.csv_path, cache=self.use_cache, compact=self.compact)
+        if self.streaming_threshold is not None and os.path.getsize(self.csv_path) > self.streaming_threshold:
+            self.summary = loader.stream_data(top_k=self.streamed_top_k(), on_chunk=on_chunk)
+            self.df = self.summary.sample
+        else:
+            self.summary = None
+            self.df = loader.load_data()
+        return self.df
+    
+    def streamed_top_k(self):
+        if self.appendix is None:
+            return TOP_TABLE_ROWS
+        if self.appendix == APPENDIX_ALL:
+            return STREAMED_APPENDIX_LIMIT
+        return max(TOP_TABLE_ROWS, self.appendix)
+    
+    def row_count(self):
+        if self.summary is not None:
+            return self.summary.count
+        return len(self.df) if self.df is not None else None
+    
+    def write_memory_report(self):
+        # A streamed load only keeps the sample, there is nothing to report
+        if self.summary is not None or self.df is None:
+            return
+        try:
+            with open(os.path.join(self.output_dir, MEMORY_REPORT_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(memory_report(self.df), f, indent=2)
+        except OSError:
+            pass
+    
+    def open_store(self):
+        try:
+            self.store = ResultsStore(self.results_db)
+            input_id = input_fingerprint(self.csv_path)
+            self.run_id = self.store.find_run(input_id)
+            if self.run_id is not None:
+                self.store_status = "already stored"
+                return
+            self.writer = self.store.begin_run(self.source_path(), source_label(self.csv_path),
+                                               ranking=self.ranking, output_dir=os.path.abspath(self.output_dir),
+                                               fingerprint=input_id)
+        except STORE_ERRORS as e:
+            self.store_failed(e)
+    
+    def store_poses(self, frame):
+        if self.writer is None:
+            return
+        try:
+            self.writer.add_poses(frame)
+        except STORE_ERRORS as e:
+            self.store_failed(e)
+    
+    def finish_store(self):
+        if self.writer is None:
+            return
+        try:
+            if self.summary is None:
+                self.writer.add_poses(self.df)
+            self.run_id = self.writer.finish()
+            self.writer = None
+            self.store_status = "stored"
+        except STORE_ERRORS as e:
+            self.store_failed(e)
+            return
+        try:
+            self.store.prune()
+        except STORE_ERRORS as e:
+            # The run is in; pruning is tried again after the next one
+            self.store_status = f"stored, pruning failed: {type(e).__name__}: {e}"
+    
+    def store_failed(self, error):
+        self.store_status = f"failed: {type(error).__name__}: {error}"
+        if self.monitor is not None:
+            self.monitor.report(f"Results not saved to the database: {error}")
+        self.close_store()
+    
+    def close_store(self):
+        # A run that was not finished (failed, cancelled or the store broke)
+        # is removed again
+        writer, store = self.writer, self.store
+        self.writer = self.store = None
+        try:
+            if writer is not None:
+                writer.abort()
+        except STORE_ERRORS:
+            pass
+        finally:
+            if store is not None:
+                store.close()
+    
+    def source_path(self):
+        if isinstance(self.csv_path, str):
+            return os.path.abspath(self.csv_path)
+        return [os.path.abspath(path) for path in self.csv_path]
+    
+    def run(self, task_queue=None, cancel_event=None):
+        monitor = RunMonitor(task_queue, weights=load_stage_weights(), profile_stages=self.profile_stages,
+                             profile_dir=os.path.join(self.output_dir, "profiles"), cancel_event=cancel_event)
+        self.monitor = monitor
+        try:
+            if self.store_results:
+                self.open_store()
+            
+            # A streamed load hands its deduplicated chunks to the store as
+            # they are read, the file is not read twice
+            with monitor.stage('load', "Loading data..."):
+                self.load(on_chunk=self.store_poses if self.writer is not None else None)
+            if self.compact:
+                self.write_memory_report()
+            
+            os.makedirs(self.plots_dir, exist_ok=True)
+            
+            with monitor.stage('plots', "Generating plots...", total=len(PLOT_METHODS)):
+                plot_cache = PlotCache() if self.use_cache else None
+                plot_generator = PlotGenerator(self.df, self.plots_dir, summary=self.summary, cache=plot_cache,
+                                               profile=self.render_profile)
+                self.plot_files = plot_generator.generate_all_plots(parallel=self.parallel_plots,
+                                                                    monitor=monitor)
+            
+            with monitor.stage('pdf', "Creating PDF report...", total=1):
+                pdf_generator = PDFGenerator(self.df, self.plot_files, self.plots_dir, self.csv_path,
+                                             summary=self.summary, ranking=self.ranking, appendix=self.appendix,
+                                             bootstrap_iterations=self.bootstrap_iterations,
+                                             bootstrap_seed=self.bootstrap_seed,
+                                             unparsed_files=self.unparsed_files)
+                pdf_generator.generate_pdf(self.pdf_path, monitor)
+            
+            # Finished last, so a run whose report failed is not left behind
+            with monitor.stage('store', "Saving results..."):
+                self.finish_store()
+        finally:
+            self.close_store()
+            monitor.write(self.timings_path, csv_path=os.path.abspath(self.csv_path) if isinstance(self.csv_path, str) else self.csv_path, rows=self.row_count(),
+                          streamed=self.summary is not None, parallel_plots=self.parallel_plots,
+                          render_profile=self.render_profile, compact=self.compact,
+                          appendix=self.appendix, run_id=self.run_id,
+                          bootstrap_iterations=self.bootstrap_iterations, bootstrap_seed=self.bootstrap_seed,
+                          unparsed_files=self.unparsed_files, results_store=self.store_status)
+        
+        monitor.save_stage_weights()
+        monitor.finish("Analysis completed!")
+        return self.pdf_path
\ No newline at end of file
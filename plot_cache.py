@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+import matplotlib
+from data_cache import DiskCache, cache_root
+from dataset_memo import dataset_memo
+from render_profiles import preview_filename
+
+# Bump whenever a plot method's drawing code changes
+PLOT_CACHE_VERSION = 4
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+def default_plot_cache_dir():
+    return os.path.join(cache_root(), "plots")
+
+def column_fingerprint(df, col):
+    if col not in df.columns:
+        return 'missing'
+    
+    def compute():
+        series = df[col]
+        digest = hashlib.blake2b(digest_size=16)
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            digest.update(np.ascontiguousarray(series.to_numpy(dtype=np.float64, na_value=np.nan)).tobytes())
+        else:
+            digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+    
+    return dataset_memo(df, f'fingerprint:{col}', compute)
+
+def stats_fingerprint(stats, col):
+    if not stats.has_column(col):
+        return 'missing'
+    column = stats.column(col)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([column.count, column.nan_count, column.mean, column.m2,
+                            column.min, column.max, column.histogram.width,
+                            column.histogram.origin], dtype=np.float64).tobytes())
+    digest.update(column.histogram.counts.tobytes())
+    return digest.hexdigest()
+
+def link_or_copy(src, dst):
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+class PlotCache(DiskCache):
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir or default_plot_cache_dir(), max_bytes)
+    
+    def key(self, method_name, inputs, params):
+        payload = {
+            'method': method_name,
+            'inputs': inputs,
+            'params': params,
+            'version': PLOT_CACHE_VERSION,
+            'matplotlib': matplotlib.__version__
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    def fetch(self, key, plots_dir):
+        entry = self.read_index().get(key)
+        if entry is None:
+            return None
+        
+        try:
+            link_or_copy(os.path.join(self.cache_dir, entry['file']), os.path.join(plots_dir, entry['filename']))
+            for cached_name in entry.get('extra_files', []):
+                # The raster preview of a vector plot
+                link_or_copy(os.path.join(self.cache_dir, cached_name),
+                             os.path.join(plots_dir, preview_filename(entry['filename'])))
+        except OSError:
+            self.drop_entry(key)
+            return None
+        
+        self.touch_entry(key)
+        return (entry['filename'], entry['title'])
+    
+    def store(self, key, plots_dir, result):
+        filename, title = result
+        src = os.path.join(plots_dir, filename)
+        preview = os.path.join(plots_dir, preview_filename(filename))
+        cached_name = key + os.path.splitext(filename)[1]
+        extra_files = [preview_filename(key)] if os.path.exists(preview) else []
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            link_or_copy(src, os.path.join(self.cache_dir, cached_name))
+            for cached_preview in extra_files:
+                link_or_copy(preview, os.path.join(self.cache_dir, cached_preview))
+        except OSError:
+            return
+        
+        self.add_entry(key, {
+            'file': cached_name,
+            'extra_files': extra_files,
+            'filename': filename,
+            'title': title,
+            'bytes': sum(os.path.getsize(path) for path in [src] + ([preview] if extra_files else [])),
+            'last_used': time.time()
+        })
\ No newline at end of file
@@ -1,213 +1,490 @@
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-from mpl_toolkits.mplot3d import Axes3D
-import os
-
-class PlotGenerator:
-    def __init__(self, df, plots_dir):
-        self.df = df
-        self.plots_dir = plots_dir
-    
-    def generate_all_plots(self):
-        plot_files = []
-        
-        plot_files.append(self.generate_binding_distribution())
-        
-        plot_files.append(self.generate_density_plot())
-        
-        plot_files.append(self.generate_box_plot())
-        
-        plot_files.append(self.generate_rmsd_distribution())
-        
-        plot_files.append(self.generate_3d_scatter())
-        
-        plot_files.append(self.generate_affinity_vs_rmsd_ub())
-        
-        plot_files.append(self.generate_affinity_vs_rmsd_lb())
-        
-        plot_files.append(self.generate_pairwise_plot())
-        
-        return [p for p in plot_files if p is not None]
-    
-    def generate_binding_distribution(self):
-        if 'binding_affinity' not in self.df.columns:
-            return None
-        
-        fig = plt.figure(figsize=(10, 6))
-        plt.hist(self.df['binding_affinity'], bins=30, edgecolor='black', alpha=0.7, color='skyblue')
-        plt.xlabel('Binding Affinity (kcal/mol)')
-        plt.ylabel('Frequency')
-        plt.title('Distribution of Binding Affinity')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '1_binding_affinity_distribution.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('1_binding_affinity_distribution.png', 'Distribution of Binding Affinity')
-    
-    def generate_density_plot(self):
-        if 'binding_affinity' not in self.df.columns:
-            return None
-        
-        fig = plt.figure(figsize=(10, 6))
-        sns.kdeplot(data=self.df['binding_affinity'], fill=True, color='green', alpha=0.5)
-        plt.xlabel('Binding Affinity (kcal/mol)')
-        plt.ylabel('Density')
-        plt.title('Density Plot of Binding Affinity')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '2_density_plot_binding_affinity.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('2_density_plot_binding_affinity.png', 'Density Plot of Binding Affinity')
-    
-    def generate_box_plot(self):
-        if 'binding_affinity' not in self.df.columns:
-            return None
-        
-        fig = plt.figure(figsize=(8, 6))
-        plt.boxplot(self.df['binding_affinity'].dropna(), patch_artist=True, 
-                   boxprops=dict(facecolor='lightblue'))
-        plt.ylabel('Binding Affinity (kcal/mol)')
-        plt.title('Box Plot of Binding Affinity')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '3_box_plot_binding_affinity.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('3_box_plot_binding_affinity.png', 'Box Plot of Binding Affinity')
-    
-    def generate_rmsd_distribution(self):
-        if not all(col in self.df.columns for col in ['rmsd_ub', 'rmsd_lb']):
-            return None
-        
-        fig = plt.figure(figsize=(10, 6))
-        plt.hist(self.df['rmsd_ub'].dropna(), bins=30, alpha=0.7, label='RMSD ub', color='blue')
-        plt.hist(self.df['rmsd_lb'].dropna(), bins=30, alpha=0.7, label='RMSD lb', color='red')
-        plt.xlabel('RMSD (Å)')
-        plt.ylabel('Frequency')
-        plt.title('Distribution of RMSD')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '4_distribution_rmsd.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('4_distribution_rmsd.png', 'Distribution of RMSD')
-    
-    def generate_3d_scatter(self):
-        if not all(col in self.df.columns for col in ['binding_affinity', 'rmsd_ub', 'rmsd_lb']):
-            return None
-        
-        fig = plt.figure(figsize=(12, 10))
-        ax = fig.add_subplot(111, projection='3d')
-        
-        sc = ax.scatter(self.df['rmsd_ub'], self.df['rmsd_lb'], 
-                      self.df['binding_affinity'],
-                      c=self.df['binding_affinity'], cmap='viridis',
-                      s=50, alpha=0.7)
-        
-        ax.set_xlabel('RMSD ub (Å)')
-        ax.set_ylabel('RMSD lb (Å)')
-        ax.set_zlabel('Binding Affinity (kcal/mol)')
-        ax.set_title('3D Scatter: Binding Affinity vs RMSD')
-        
-        plt.colorbar(sc, ax=ax, label='Binding Affinity', shrink=0.5)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '5_3d_scatter_affinity_vs_rmsd.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('5_3d_scatter_affinity_vs_rmsd.png', '3D Scatter Plot')
-    
-    def generate_affinity_vs_rmsd_ub(self):
-        if 'rmsd_ub' not in self.df.columns or 'binding_affinity' not in self.df.columns:
-            return None
-        
-        fig = plt.figure(figsize=(10, 6))
-        plt.scatter(self.df['rmsd_ub'], self.df['binding_affinity'], 
-                   alpha=0.6, s=50, c=self.df['binding_affinity'], cmap='coolwarm')
-        plt.xlabel('RMSD ub (Å)')
-        plt.ylabel('Binding Affinity (kcal/mol)')
-        plt.title('Binding Affinity vs RMSD ub')
-        plt.colorbar(label='Binding Affinity')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '6_affinity_vs_rmsd_ub.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('6_affinity_vs_rmsd_ub.png', 'Binding Affinity vs RMSD ub')
-    
-    def generate_affinity_vs_rmsd_lb(self):
-        if 'rmsd_lb' not in self.df.columns or 'binding_affinity' not in self.df.columns:
-            return None
-        
-        fig = plt.figure(figsize=(10, 6))
-        plt.scatter(self.df['rmsd_lb'], self.df['binding_affinity'], 
-                   alpha=0.6, s=50, c=self.df['binding_affinity'], cmap='plasma')
-        plt.xlabel('RMSD lb (Å)')
-        plt.ylabel('Binding Affinity (kcal/mol)')
-        plt.title('Binding Affinity vs RMSD lb')
-        plt.colorbar(label='Binding Affinity')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plot_path = os.path.join(self.plots_dir, '7_affinity_vs_rmsd_lb.png')
-        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        
-        return ('7_affinity_vs_rmsd_lb.png', 'Binding Affinity vs RMSD lb')
-    
-    def generate_pairwise_plot(self):
-        if not all(col in self.df.columns for col in ['binding_affinity', 'rmsd_ub', 'rmsd_lb']):
-            return None
-        
-        try:
-            plot_data = self.df[['binding_affinity', 'rmsd_ub', 'rmsd_lb']].dropna()
-            
-            fig, axes = plt.subplots(3, 3, figsize=(12, 12))
-            fig.suptitle('Pairwise Relationships', fontsize=16, y=1.02)
-            
-            variables = ['binding_affinity', 'rmsd_ub', 'rmsd_lb']
-            names = ['Binding Affinity', 'RMSD ub', 'RMSD lb']
-            
-            for i in range(3):
-                for j in range(3):
-                    ax = axes[i, j]
-                    
-                    if i == j:
-                        ax.hist(plot_data[variables[i]], bins=20, alpha=0.7, edgecolor='black')
-                        ax.set_xlabel(names[i])
-                        ax.set_ylabel('Frequency')
-                        if i == 0:
-                            ax.set_title('Distribution')
-                    else:
-                        ax.scatter(plot_data[variables[j]], plot_data[variables[i]], 
-                                 alpha=0.6, s=20)
-                        ax.set_xlabel(names[j])
-                        ax.set_ylabel(names[i])
-                    
-                    ax.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            plot_path = os.path.join(self.plots_dir, '8_pairwise_relationships.png')
-            plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-            plt.close(fig)
-            
-            return ('8_pairwise_relationships.png', 'Pairwise Relationships')
-        except:
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+from matplotlib.collections import Collection
+from mpl_toolkits.mplot3d import Axes3D
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+import tempfile
+import os
+from ligand_index import LigandIndex, BEST_POSE
+from kde import column_kde
+from stats_engine import dataset_stats
+from binning import DatasetBins
+from dataset_memo import dataset_memo
+from plot_cache import column_fingerprint, stats_fingerprint
+from instrumentation import timed_call
+from render_profiles import RENDER_PROFILES, DEFAULT_RENDER_PROFILE, VECTOR_FORMATS, PREVIEW_DPI, preview_filename
+
+PLOT_METHODS = [
+    'generate_binding_distribution',
+    'generate_density_plot',
+    'generate_box_plot',
+    'generate_rmsd_distribution',
+    'generate_3d_scatter',
+    'generate_affinity_vs_rmsd_ub',
+    'generate_affinity_vs_rmsd_lb',
+    'generate_pairwise_plot'
+]
+
+# Submitted first so the slowest renders do not end up as the tail of the pool
+HEAVY_PLOT_METHODS = ['generate_pairwise_plot', 'generate_3d_scatter']
+
+SHARED_COLUMNS = ['binding_affinity', 'rmsd_ub', 'rmsd_lb']
+
+# Columns each plot reads; they key the plot artifact cache. The ligand
+# column feeds the top-ligand overlay of the density renderings.
+PLOT_INPUTS = {
+    'generate_binding_distribution': ['binding_affinity'],
+    'generate_density_plot': ['binding_affinity'],
+    'generate_box_plot': ['binding_affinity'],
+    'generate_rmsd_distribution': ['rmsd_ub', 'rmsd_lb'],
+    'generate_3d_scatter': ['binding_affinity', 'rmsd_ub', 'rmsd_lb', 'ligand'],
+    'generate_affinity_vs_rmsd_ub': ['binding_affinity', 'rmsd_ub', 'ligand'],
+    'generate_affinity_vs_rmsd_lb': ['binding_affinity', 'rmsd_lb', 'ligand'],
+    'generate_pairwise_plot': ['binding_affinity', 'rmsd_ub', 'rmsd_lb', 'ligand']
+}
+
+# Above this many rows the scatter-style plots switch to density rendering.
+# Bin counts must divide binning.FINE_BINS.
+DEFAULT_LOD_THRESHOLD = 200_000
+LOD_BINS = 300
+LOD_BINS_3D = 40
+# Points in bins this sparse are drawn individually on top of the density
+LOD_OUTLIER_BIN_COUNT = 2
+LOD_MAX_OUTLIERS = 5000
+LOD_HIGHLIGHT_COUNT = 10
+
+# Collections with more elements than this are embedded as images in vector
+# output; thousands of individual paths make PDF/SVG files huge and slow.
+VECTOR_RASTERIZE_THRESHOLD = 2000
+
+_worker_generator = None
+
+def _init_plot_worker(columns_path, shape, columns, plots_dir, summary, stats, bins, options, highlights):
+    global _worker_generator
+    if 0 in shape:
+        matrix = np.empty(shape)
+    else:
+        matrix = np.memmap(columns_path, dtype=np.float64, mode='r', shape=shape)
+    df = pd.DataFrame({col: matrix[i] for i, col in enumerate(columns)}, copy=False)
+    # Reuse the parent's single statistics pass instead of rescanning
+    dataset_memo(df, 'stats', lambda: stats)
+    dataset_memo(df, 'bins', lambda: bins)
+    _worker_generator = PlotGenerator(df, plots_dir, summary=summary, **options)
+    _worker_generator.highlights = highlights
+
+def _render_plot(method_name):
+    return timed_call(f'plot:{method_name}', getattr(_worker_generator, method_name))
+
+class PlotGenerator:
+    def __init__(self, df, plots_dir, summary=None, lod_threshold=DEFAULT_LOD_THRESHOLD, cache=None,
+                 profile=DEFAULT_RENDER_PROFILE):
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {profile}")
+        self.df = df
+        self.plots_dir = plots_dir
+        self.summary = summary
+        self.lod_threshold = lod_threshold
+        self.cache = cache
+        self.profile = profile
+        self.highlights = None
+    
+    def options(self):
+        return {'lod_threshold': self.lod_threshold, 'profile': self.profile}
+    
+    def save_figure(self, fig, name):
+        settings = RENDER_PROFILES[self.profile]
+        filename = f"{name}.{settings['format']}"
+        kwargs = {'dpi': settings['dpi'], 'format': settings['format']}
+        if settings['tight_bbox']:
+            kwargs['bbox_inches'] = 'tight'
+        if settings['format'] in VECTOR_FORMATS:
+            for collection in fig.findobj(Collection):
+                # 3D collections ignore per-artist rasterization
+                if collection.axes is None or collection.axes.name == '3d':
+                    continue
+                if max(len(collection.get_offsets()), len(collection.get_paths())) > VECTOR_RASTERIZE_THRESHOLD:
+                    collection.set_rasterized(True)
+        if settings['format'] == 'png' and settings['png_compression'] is not None:
+            kwargs['pil_kwargs'] = {'compress_level': settings['png_compression']}
+        fig.savefig(os.path.join(self.plots_dir, filename), **kwargs)
+        if settings['format'] in VECTOR_FORMATS:
+            fig.savefig(os.path.join(self.plots_dir, preview_filename(filename)), dpi=PREVIEW_DPI, format='png',
+                        bbox_inches=kwargs.get('bbox_inches'))
+        return filename
+    
+    def use_lod(self):
+        return self.lod_threshold is not None and len(self.df) > self.lod_threshold
+    
+    def get_highlights(self):
+        if self.highlights is None:
+            if 'ligand' in self.df.columns:
+                self.highlights = LigandIndex.for_frame(self.df).top(LOD_HIGHLIGHT_COUNT, BEST_POSE)
+            else:
+                self.highlights = pd.DataFrame()
+        return self.highlights
+    
+    def draw_density(self, ax, xcol, ycol, cmap):
+        grid = self.bins.pair_grid(xcol, ycol, LOD_BINS, LOD_OUTLIER_BIN_COUNT)
+        if grid is None:
+            return None
+        
+        counts = grid.counts
+        mesh = ax.pcolormesh(grid.xedges, grid.yedges, np.ma.masked_equal(counts.T, 0),
+                             cmap=cmap, norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)))
+        
+        sparse = grid.sparse[:LOD_MAX_OUTLIERS]
+        if len(sparse):
+            x = self.df[xcol].to_numpy(dtype=np.float64, na_value=np.nan)[sparse]
+            y = self.df[ycol].to_numpy(dtype=np.float64, na_value=np.nan)[sparse]
+            ax.scatter(x, y, s=4, c='black', alpha=0.6, linewidths=0)
+        
+        highlights = self.get_highlights()
+        if len(highlights) and xcol in highlights.columns and ycol in highlights.columns:
+            ax.scatter(highlights[xcol], highlights[ycol], s=60, facecolors='none',
+                       edgecolors='red', linewidths=1.2, label='Top ligands')
+            ax.legend(loc='best', fontsize=8)
+        return mesh
+    
+    def draw_density_3d(self, ax):
+        cols = ['rmsd_ub', 'rmsd_lb', 'binding_affinity']
+        voxels = self.bins.voxels(cols, LOD_BINS_3D)
+        if voxels is None:
+            return None
+        
+        # Occupied voxels stand in for the points they contain
+        counts, centers = voxels
+        occupied = np.flatnonzero(counts)
+        ix, iy, iz = np.unravel_index(occupied, (LOD_BINS_3D,) * 3)
+        sizes = 10 + 40 * np.log1p(counts[occupied]) / np.log1p(counts.max())
+        
+        sc = ax.scatter(centers[0][ix], centers[1][iy], centers[2][iz],
+                        c=centers[2][iz], cmap='viridis', s=sizes, alpha=0.7)
+        
+        highlights = self.get_highlights()
+        if len(highlights) and all(col in highlights.columns for col in cols):
+            ax.scatter(highlights['rmsd_ub'], highlights['rmsd_lb'], highlights['binding_affinity'],
+                       s=80, facecolors='none', edgecolors='red', linewidths=1.2, label='Top ligands')
+            ax.legend(loc='upper left', fontsize=8)
+        return sc
+    
+    @property
+    def stats(self):
+        return dataset_stats(self.df, self.summary)
+    
+    @property
+    def bins(self):
+        return DatasetBins.for_frame(self.df, self.stats)
+    
+    def has_summary(self, col):
+        return self.summary is not None and self.summary.has_column(col)
+    
+    def draw_histogram(self, ax, col, bins=30, rows=None, **kwargs):
+        if not self.stats.has_column(col) or self.stats.column(col).count == 0:
+            return
+        # A streamed load only has the sample in memory; its histograms come
+        # from the sketch over every row
+        if self.summary is not None:
+            counts, edges = self.stats.histogram(col, bins)
+        else:
+            counts, edges = self.bins.histogram(col, bins, rows)
+        if 'edgecolor' in kwargs:
+            # Filled stairs have no outline unless given a line width
+            kwargs.setdefault('linewidth', 0.8)
+        ax.stairs(counts, edges, fill=True, **kwargs)
+    
+    def generate_all_plots(self, parallel=False, max_workers=None, monitor=None):
+        keys = self.cache_keys()
+        plot_files = {}
+        for name, key in keys.items():
+            plot_files[name] = self.cache.fetch(key, self.plots_dir)
+        
+        missing = [name for name in PLOT_METHODS if plot_files.get(name) is None]
+        workers = min(max_workers or os.cpu_count() or 1, len(missing)) if parallel else 1
+        if monitor and len(missing) < len(PLOT_METHODS):
+            monitor.advance(len(PLOT_METHODS) - len(missing), "Reusing cached plots...")
+        
+        if workers > 1:
+            plot_files.update(self.render_parallel(missing, workers, monitor))
+        else:
+            for name in missing:
+                with monitor.timed(f'plot:{name}') if monitor else nullcontext():
+                    plot_files[name] = getattr(self, name)()
+                if monitor:
+                    monitor.advance(text=f"Generating plots ({monitor.stage_done + 1}/{len(PLOT_METHODS)})...")
+        
+        for name in missing:
+            if name in keys and plot_files[name] is not None:
+                self.cache.store(keys[name], self.plots_dir, plot_files[name])
+        
+        return [plot_files[name] for name in PLOT_METHODS if plot_files[name] is not None]
+    
+    def cache_keys(self):
+        if self.cache is None:
+            return {}
+        keys = {}
+        for name in PLOT_METHODS:
+            inputs = {col: column_fingerprint(self.df, col) for col in PLOT_INPUTS[name]}
+            if self.summary is not None:
+                for col in PLOT_INPUTS[name]:
+                    if col in SHARED_COLUMNS:
+                        inputs[f'summary:{col}'] = stats_fingerprint(self.summary.stats, col)
+            keys[name] = self.cache.key(name, inputs, self.options())
+        return keys
+    
+    def render_parallel(self, method_names, max_workers, monitor=None):
+        columns = [col for col in SHARED_COLUMNS if col in self.df.columns]
+        shape = (len(columns), len(self.df))
+        
+        # The numeric columns are written once to a memory-mapped file; every
+        # worker maps the same pages instead of unpickling its own DataFrame.
+        fd, columns_path = tempfile.mkstemp(suffix='.columns')
+        os.close(fd)
+        try:
+            if 0 not in shape:
+                matrix = np.memmap(columns_path, dtype=np.float64, mode='w+', shape=shape)
+                for i, col in enumerate(columns):
+                    matrix[i] = self.df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                matrix.flush()
+                del matrix
+            
+            summary = self.summary.without_sample() if self.summary is not None else None
+            highlights = self.get_highlights() if self.use_lod() else None
+            order = [m for m in HEAVY_PLOT_METHODS if m in method_names] + \
+                [m for m in method_names if m not in HEAVY_PLOT_METHODS]
+            
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_plot_worker,
+                                     initargs=(columns_path, shape, columns, self.plots_dir, summary, self.stats,
+                                               self.bins, self.options(), highlights)) as executor:
+                futures = {executor.submit(_render_plot, name): name for name in order}
+                results = {}
+                try:
+                    for future in as_completed(futures):
+                        results[futures[future]], record = future.result()
+                        if monitor:
+                            monitor.add_record(record)
+                            monitor.advance(text=f"Generating plots ({monitor.stage_done + 1}/{len(PLOT_METHODS)})...")
+                except BaseException:
+                    # On cancellation or error only the plots already running are waited for
+                    executor.shutdown(cancel_futures=True)
+                    raise
+                return results
+        finally:
+            os.remove(columns_path)
+    
+    def generate_binding_distribution(self):
+        if 'binding_affinity' not in self.df.columns:
+            return None
+        
+        fig = plt.figure(figsize=(10, 6))
+        self.draw_histogram(plt.gca(), 'binding_affinity', bins=30, edgecolor='black', alpha=0.7, color='skyblue')
+        plt.xlabel('Binding Affinity (kcal/mol)')
+        plt.ylabel('Frequency')
+        plt.title('Distribution of Binding Affinity')
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '1_binding_affinity_distribution')
+        plt.close(fig)
+        
+        return (filename, 'Distribution of Binding Affinity')
+    
+    def generate_density_plot(self):
+        if 'binding_affinity' not in self.df.columns:
+            return None
+        
+        fig = plt.figure(figsize=(10, 6))
+        kde = column_kde(self.df, 'binding_affinity', self.summary)
+        if kde is not None:
+            plt.fill_between(kde.grid, kde.density, color='green', alpha=0.5, linewidth=0)
+            plt.plot(kde.grid, kde.density, color='green')
+        plt.xlabel('Binding Affinity (kcal/mol)')
+        plt.ylabel('Density')
+        plt.title('Density Plot of Binding Affinity')
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '2_density_plot_binding_affinity')
+        plt.close(fig)
+        
+        return (filename, 'Density Plot of Binding Affinity')
+    
+    def generate_box_plot(self):
+        if 'binding_affinity' not in self.df.columns:
+            return None
+        
+        fig = plt.figure(figsize=(8, 6))
+        if self.has_summary('binding_affinity'):
+            plt.gca().bxp([self.summary.box_stats('binding_affinity')], patch_artist=True,
+                          boxprops=dict(facecolor='lightblue'))
+        else:
+            plt.boxplot(self.df['binding_affinity'].dropna(), patch_artist=True, 
+                       boxprops=dict(facecolor='lightblue'))
+        plt.ylabel('Binding Affinity (kcal/mol)')
+        plt.title('Box Plot of Binding Affinity')
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '3_box_plot_binding_affinity')
+        plt.close(fig)
+        
+        return (filename, 'Box Plot of Binding Affinity')
+    
+    def generate_rmsd_distribution(self):
+        if not all(col in self.df.columns for col in ['rmsd_ub', 'rmsd_lb']):
+            return None
+        
+        fig = plt.figure(figsize=(10, 6))
+        self.draw_histogram(plt.gca(), 'rmsd_ub', bins=30, alpha=0.7, label='RMSD ub', color='blue')
+        self.draw_histogram(plt.gca(), 'rmsd_lb', bins=30, alpha=0.7, label='RMSD lb', color='red')
+        plt.xlabel('RMSD (Å)')
+        plt.ylabel('Frequency')
+        plt.title('Distribution of RMSD')
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '4_distribution_rmsd')
+        plt.close(fig)
+        
+        return (filename, 'Distribution of RMSD')
+    
+    def generate_3d_scatter(self):
+        if not all(col in self.df.columns for col in ['binding_affinity', 'rmsd_ub', 'rmsd_lb']):
+            return None
+        
+        fig = plt.figure(figsize=(12, 10))
+        ax = fig.add_subplot(111, projection='3d')
+        
+        if self.use_lod():
+            sc = self.draw_density_3d(ax)
+        else:
+            sc = ax.scatter(self.df['rmsd_ub'], self.df['rmsd_lb'], 
+                          self.df['binding_affinity'],
+                          c=self.df['binding_affinity'], cmap='viridis',
+                          s=50, alpha=0.7)
+        
+        ax.set_xlabel('RMSD ub (Å)')
+        ax.set_ylabel('RMSD lb (Å)')
+        ax.set_zlabel('Binding Affinity (kcal/mol)')
+        ax.set_title('3D Scatter: Binding Affinity vs RMSD')
+        
+        # No row with all three values leaves an empty panel without a colorbar
+        if sc is not None:
+            plt.colorbar(sc, ax=ax, label='Binding Affinity', shrink=0.5)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '5_3d_scatter_affinity_vs_rmsd')
+        plt.close(fig)
+        
+        return (filename, '3D Scatter Plot')
+    
+    def generate_affinity_vs_rmsd_ub(self):
+        if 'rmsd_ub' not in self.df.columns or 'binding_affinity' not in self.df.columns:
+            return None
+        
+        fig = plt.figure(figsize=(10, 6))
+        if self.use_lod():
+            mesh = self.draw_density(plt.gca(), 'rmsd_ub', 'binding_affinity', 'coolwarm')
+            if mesh is not None:
+                plt.colorbar(mesh, label='Poses per bin')
+        else:
+            plt.scatter(self.df['rmsd_ub'], self.df['binding_affinity'], 
+                       alpha=0.6, s=50, c=self.df['binding_affinity'], cmap='coolwarm')
+            plt.colorbar(label='Binding Affinity')
+        plt.xlabel('RMSD ub (Å)')
+        plt.ylabel('Binding Affinity (kcal/mol)')
+        plt.title('Binding Affinity vs RMSD ub')
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '6_affinity_vs_rmsd_ub')
+        plt.close(fig)
+        
+        return (filename, 'Binding Affinity vs RMSD ub')
+    
+    def generate_affinity_vs_rmsd_lb(self):
+        if 'rmsd_lb' not in self.df.columns or 'binding_affinity' not in self.df.columns:
+            return None
+        
+        fig = plt.figure(figsize=(10, 6))
+        if self.use_lod():
+            mesh = self.draw_density(plt.gca(), 'rmsd_lb', 'binding_affinity', 'plasma')
+            if mesh is not None:
+                plt.colorbar(mesh, label='Poses per bin')
+        else:
+            plt.scatter(self.df['rmsd_lb'], self.df['binding_affinity'], 
+                       alpha=0.6, s=50, c=self.df['binding_affinity'], cmap='plasma')
+            plt.colorbar(label='Binding Affinity')
+        plt.xlabel('RMSD lb (Å)')
+        plt.ylabel('Binding Affinity (kcal/mol)')
+        plt.title('Binding Affinity vs RMSD lb')
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        filename = self.save_figure(fig, '7_affinity_vs_rmsd_lb')
+        plt.close(fig)
+        
+        return (filename, 'Binding Affinity vs RMSD lb')
+    
+    def generate_pairwise_plot(self):
+        if not all(col in self.df.columns for col in ['binding_affinity', 'rmsd_ub', 'rmsd_lb']):
+            return None
+        
+        try:
+            if not self.use_lod():
+                plot_data = self.df[['binding_affinity', 'rmsd_ub', 'rmsd_lb']].dropna()
+            
+            fig, axes = plt.subplots(3, 3, figsize=(12, 12))
+            fig.suptitle('Pairwise Relationships', fontsize=16, y=1.02)
+            
+            variables = ['binding_affinity', 'rmsd_ub', 'rmsd_lb']
+            names = ['Binding Affinity', 'RMSD ub', 'RMSD lb']
+            # The diagonal counts the rows the other panels show: those with
+            # all three values. A streamed summary only has whole-column sketches.
+            complete = None
+            if self.summary is None:
+                complete = self.bins.complete_rows(variables)
+                if complete is None:
+                    complete = np.zeros(len(self.df), dtype=bool)
+            
+            for i in range(3):
+                for j in range(3):
+                    ax = axes[i, j]
+                    
+                    # The upper triangle would mirror the lower one
+                    if j > i:
+                        ax.set_visible(False)
+                        continue
+                    if i == j:
+                        self.draw_histogram(ax, variables[i], bins=20, rows=complete, alpha=0.7,
+                                            edgecolor='black')
+                        ax.set_xlabel(names[i])
+                        ax.set_ylabel('Frequency')
+                        if i == 0:
+                            ax.set_title('Distribution')
+                    elif self.use_lod():
+                        self.draw_density(ax, variables[j], variables[i], 'Blues')
+                        ax.set_xlabel(names[j])
+                        ax.set_ylabel(names[i])
+                    else:
+                        ax.scatter(plot_data[variables[j]], plot_data[variables[i]], 
+                                 alpha=0.6, s=20)
+                        ax.set_xlabel(names[j])
+                        ax.set_ylabel(names[i])
+                    
+                    ax.grid(True, alpha=0.3)
+            
+            plt.tight_layout()
+            
+            filename = self.save_figure(fig, '8_pairwise_relationships')
+            plt.close(fig)
+            
+            return (filename, 'Pairwise Relationships')
+        except:
             return None
\ No newline at end of file
@@ -0,0 +1,22 @@
+# Kept free of matplotlib so the GUI can list the profiles before the
+# plotting stack has been imported
+
+# 'publication' reproduces the historical output (300 dpi PNG, tight bbox).
+# 'draft' skips the tight-bbox draw pass and uses light PNG compression.
+RENDER_PROFILES = {
+    'draft': {'format': 'png', 'dpi': 100, 'tight_bbox': False, 'png_compression': 1},
+    'publication': {'format': 'png', 'dpi': 300, 'tight_bbox': True, 'png_compression': 6},
+    'vector': {'format': 'pdf', 'dpi': 300, 'tight_bbox': True, 'png_compression': None},
+    'svg': {'format': 'svg', 'dpi': 300, 'tight_bbox': True, 'png_compression': None}
+}
+
+DEFAULT_RENDER_PROFILE = 'publication'
+
+VECTOR_FORMATS = ('pdf', 'svg')
+
+# Vector plots are also saved as a PNG at this resolution, which is what the
+# PDF report embeds
+PREVIEW_DPI = 150
+
+def preview_filename(filename):
+    return f"{filename.rsplit('.', 1)[0]}.preview.png"
\ No newline at end of file
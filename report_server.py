@@ -0,0 +1,418 @@
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from data_cache import DiskCache, cache_root
+from job_manager import JobManager, DEFAULT_MAX_JOBS, DONE, FAILED, RUNNING, ACTIVE_STATES
+from pipeline import REPORT_FILENAME
+from ligand_index import BEST_POSE, RANKING_MODES
+from plot_generator import RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+from pdf_generator import parse_appendix
+from bootstrap import DEFAULT_ITERATIONS, DEFAULT_SEED
+
+# Bump whenever the report layout changes so stale reports are not served
+REPORT_CACHE_VERSION = 1
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Status checks and downloads are short; uploads hold a thread only while
+# their bytes arrive, the analysis itself runs in the job pool
+DEFAULT_REQUEST_THREADS = 16
+REQUEST_TIMEOUT_S = 60
+
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+DEFAULT_MAX_UPLOAD_BYTES = 4 * 1024 * 1024 * 1024
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+def default_report_cache_dir():
+    return os.path.join(cache_root(), "reports")
+
+def default_work_dir():
+    return os.path.join(cache_root(), "server")
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+def upload_filename(name):
+    # Only the base name, so it can neither escape the job folder nor
+    # collide with the report
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', os.path.basename((name or '').replace('\\', '/')))
+    return name.lstrip('.') or "upload.csv"
+
+def parse_options(query):
+    # Query parameters mirror the batch_cli options
+    def value(name, default=None):
+        return query.get(name, [default])[-1]
+    
+    ranking = value('ranking', BEST_POSE)
+    if ranking not in RANKING_MODES:
+        raise ValueError(f"Unknown ranking: {ranking}")
+    profile = value('profile', DEFAULT_RENDER_PROFILE)
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile: {profile}")
+    iterations = int(value('bootstrap', DEFAULT_ITERATIONS))
+    if iterations < 0:
+        raise ValueError(f"Bootstrap resamples must not be negative: {iterations}")
+    return {
+        'ranking': ranking,
+        'render_profile': profile,
+        'compact': str(value('compact', '0')).lower() in ('1', 'true', 'yes'),
+        'appendix': parse_appendix(value('appendix')),
+        'bootstrap_iterations': iterations,
+        'bootstrap_seed': int(value('seed', DEFAULT_SEED))
+    }
+
+class ReportCache(DiskCache):
+    # Finished report folders, keyed by the uploaded bytes and the options
+    # they were analysed with
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir or default_report_cache_dir(), max_bytes)
+    
+    def key(self, content_hash, options):
+        payload = {
+            'content': content_hash,
+            'options': options,
+            'version': REPORT_CACHE_VERSION
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    def lookup(self, key, touch=True):
+        entry = self.read_index().get(key)
+        if entry is None:
+            return None
+        
+        path = os.path.join(self.cache_dir, entry['file'])
+        if not os.path.exists(os.path.join(path, REPORT_FILENAME)):
+            self.drop_entry(key)
+            return None
+        if touch:
+            self.touch_entry(key)
+        return path
+    
+    def store(self, key, output_dir):
+        path = os.path.join(self.cache_dir, key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(output_dir, path)
+        
+        self.add_entry(key, {
+            'file': key,
+            'bytes': directory_size(path),
+            'last_used': time.time()
+        })
+
+class ReportService:
+    # Uploads in, reports out. There is one job per distinct upload and
+    # options: a repeat of a finished one is answered from the report cache
+    # and a repeat of a queued or running one joins it.
+    def __init__(self, cache=None, work_dir=None, max_jobs=DEFAULT_MAX_JOBS, store_results=True, log=print):
+        self.cache = cache or ReportCache()
+        self.work_dir = work_dir or default_work_dir()
+        self.store_results = store_results
+        self.log = log
+        # Reentrant: cancelling a queued job reports it from inside cancel()
+        self.lock = threading.RLock()
+        self.pending = {}
+        self.keys = {}
+        self.jobs = JobManager(self, max_jobs)
+    
+    def start(self):
+        # Uploads and half-written reports of an earlier server are useless
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.jobs.start()
+    
+    def shutdown(self):
+        self.jobs.shutdown()
+    
+    def put(self, message):
+        # JobManager's task queue: ('job_update', job_id, state, progress, text)
+        _, job_id, state, _, text = message
+        if state not in ACTIVE_STATES:
+            self.job_finished(job_id, state, text)
+    
+    def job_finished(self, job_id, state, text):
+        with self.lock:
+            key = self.keys.get(job_id)
+            job = self.jobs.jobs.get(job_id)
+            if key is None or job is None or self.pending.get(key) is not job:
+                return
+            if state == DONE:
+                try:
+                    self.cache.store(key, job.output_dir)
+                except OSError as e:
+                    job.state = FAILED
+                    job.text = f"Could not keep the report: {e}"
+                    text = job.text
+                else:
+                    del self.pending[key]
+                    del self.keys[job_id]
+                    self.jobs.forget(job_id)
+            shutil.rmtree(os.path.join(self.work_dir, key), ignore_errors=True)
+        self.log(f"{key[:12]} {job.state.lower()}: {text}")
+    
+    def receive(self, stream, length, name, options):
+        # The upload goes to disk block by block and is hashed on the way
+        digest = hashlib.sha256()
+        fd, upload = tempfile.mkstemp(dir=self.work_dir, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                remaining = length
+                while remaining:
+                    block = stream.read(min(UPLOAD_BLOCK_SIZE, remaining))
+                    if not block:
+                        raise ValueError(f"Upload ended after {length - remaining:,} of {length:,} bytes")
+                    digest.update(block)
+                    f.write(block)
+                    remaining -= len(block)
+            return self.submit(digest.hexdigest(), upload, upload_filename(name), options)
+        finally:
+            if os.path.exists(upload):
+                os.remove(upload)
+    
+    def submit(self, content_hash, upload, name, options):
+        key = self.cache.key(content_hash, options)
+        with self.lock:
+            if self.cache.lookup(key) is not None:
+                return key
+            previous = self.pending.get(key)
+            if previous is not None:
+                if previous.active:
+                    return key
+                # A failed or cancelled attempt is retried
+                self.keys.pop(previous.job_id, None)
+                self.jobs.forget(previous.job_id)
+            
+            job_dir = os.path.join(self.work_dir, key)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            os.makedirs(os.path.join(job_dir, "upload"))
+            source = os.path.join(job_dir, "upload", name)
+            os.replace(upload, source)
+            job = self.jobs.submit(source, output_dir=os.path.join(job_dir, "report"),
+                                   store_results=self.store_results, **options)
+            self.pending[key] = job
+            self.keys[job.job_id] = key
+        self.log(f"{key[:12]} queued: {name}")
+        return key
+    
+    def cancel(self, key):
+        with self.lock:
+            job = self.pending.get(key)
+            if job is None:
+                return False
+            self.jobs.cancel(job.job_id)
+            return True
+    
+    def report_dir(self, key, touch=True):
+        with self.lock:
+            return self.cache.lookup(key, touch)
+    
+    def status(self, key):
+        with self.lock:
+            job = self.pending.get(key)
+            if job is not None:
+                state = job.state
+                status = {'job': key, 'state': state, 'progress': job.progress, 'text': job.text}
+                if state == DONE:
+                    # Finished, the report is being moved into the cache
+                    status.update(state=RUNNING, text="Saving report...")
+                elif state == FAILED:
+                    status['error'] = job.error
+                return status
+        
+        report_dir = self.report_dir(key, touch=False)
+        if report_dir is None:
+            return None
+        plots_dir = os.path.join(report_dir, "plots")
+        plots = sorted(os.listdir(plots_dir)) if os.path.isdir(plots_dir) else []
+        return {
+            'job': key,
+            'state': DONE,
+            'progress': 100,
+            'text': "Analysis completed!",
+            'report': f"/jobs/{key}/report",
+            'plots': [f"/jobs/{key}/plots/{urllib.parse.quote(name)}" for name in plots]
+        }
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    # POST /jobs (CSV as the request body), GET /jobs/<id>, GET
+    # /jobs/<id>/report, GET /jobs/<id>/plots/<file>, DELETE /jobs/<id>
+    server_version = "DockingReportServer/1.0"
+    timeout = REQUEST_TIMEOUT_S
+    
+    @property
+    def service(self):
+        return self.server.service
+    
+    def route(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part) for part in parsed.path.split('/') if part]
+        if len(parts) > 1 and not KEY_PATTERN.match(parts[1]):
+            parts = []
+        return parts, urllib.parse.parse_qs(parsed.query)
+    
+    def do_POST(self):
+        parts, query = self.route()
+        if parts != ['jobs']:
+            return self.send_json_error(HTTPStatus.NOT_FOUND, "Not found")
+        try:
+            options = parse_options(query)
+        except ValueError as e:
+            return self.send_json_error(HTTPStatus.BAD_REQUEST, str(e))
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            return self.send_json_error(HTTPStatus.LENGTH_REQUIRED, "Send the CSV with a Content-Length")
+        if int(length) > self.server.max_upload_bytes:
+            return self.send_json_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        f"Uploads are limited to {self.server.max_upload_bytes:,} bytes")
+        
+        try:
+            key = self.service.receive(self.rfile, int(length), query.get('name', [None])[-1], options)
+        except ValueError as e:
+            return self.send_json_error(HTTPStatus.BAD_REQUEST, str(e))
+        status = self.service.status(key)
+        self.send_json(HTTPStatus.OK if status['state'] == DONE else HTTPStatus.ACCEPTED, status,
+                       location=f"/jobs/{key}")
+    
+    def do_GET(self):
+        parts, _ = self.route()
+        if len(parts) == 2 and parts[0] == 'jobs':
+            status = self.service.status(parts[1])
+            if status is None:
+                return self.send_json_error(HTTPStatus.NOT_FOUND, "Unknown job")
+            return self.send_json(HTTPStatus.OK, status)
+        
+        report_dir = self.service.report_dir(parts[1]) if len(parts) > 2 and parts[0] == 'jobs' else None
+        if report_dir is None:
+            return self.send_json_error(HTTPStatus.NOT_FOUND, "No finished report")
+        if parts[2:] == ['report']:
+            return self.send_file(os.path.join(report_dir, REPORT_FILENAME), 'application/pdf',
+                                  attachment=REPORT_FILENAME)
+        plots_dir = os.path.join(report_dir, "plots")
+        # Only names that are actually in the folder, never a path
+        if len(parts) == 4 and parts[2] == 'plots' and os.path.isdir(plots_dir) and parts[3] in os.listdir(plots_dir):
+            content_type = mimetypes.guess_type(parts[3])[0] or 'application/octet-stream'
+            return self.send_file(os.path.join(plots_dir, parts[3]), content_type)
+        self.send_json_error(HTTPStatus.NOT_FOUND, "Not found")
+    
+    def do_DELETE(self):
+        parts, _ = self.route()
+        if len(parts) == 2 and parts[0] == 'jobs' and self.service.cancel(parts[1]):
+            return self.send_json(HTTPStatus.ACCEPTED, self.service.status(parts[1]))
+        self.send_json_error(HTTPStatus.NOT_FOUND, "No queued or running job")
+    
+    def send_json(self, status, payload, location=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if location:
+            self.send_header('Location', location)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_json_error(self, status, message):
+        # The request body is not read on errors, so the connection is not reused
+        self.close_connection = True
+        self.send_json(status, {'error': message})
+    
+    def send_file(self, path, content_type, attachment=None):
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return self.send_json_error(HTTPStatus.NOT_FOUND, "Not found")
+        with f:
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            if attachment:
+                self.send_header('Content-Disposition', f'attachment; filename="{attachment}"')
+            self.end_headers()
+            self.wfile.flush()
+            self.connection.sendfile(f)
+
+class PooledHTTPServer(HTTPServer):
+    # Like ThreadingHTTPServer, but requests are handed to a fixed pool of
+    # threads instead of a new thread each; the rest wait in the pool's queue
+    request_queue_size = 128
+    
+    def __init__(self, address, service, threads=DEFAULT_REQUEST_THREADS, max_upload_bytes=DEFAULT_MAX_UPLOAD_BYTES):
+        super().__init__(address, ReportRequestHandler)
+        self.service = service
+        self.max_upload_bytes = max_upload_bytes
+        self.request_pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="request")
+    
+    def process_request(self, request, client_address):
+        self.request_pool.submit(self.process_request_thread, request, client_address)
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except ConnectionError:
+            # The client went away, e.g. a download aborted half way
+            pass
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        self.request_pool.shutdown(wait=False, cancel_futures=True)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Serve docking reports over HTTP: POST a CSV to /jobs, poll /jobs/<id>, download "
+                    "/jobs/<id>/report and /jobs/<id>/plots/<file>.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on (default: 8765)")
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_MAX_JOBS,
+                        help=f"Analyses run at once in worker processes (default: {DEFAULT_MAX_JOBS})")
+    parser.add_argument('--threads', type=int, default=DEFAULT_REQUEST_THREADS,
+                        help="Threads serving HTTP requests (default: 16)")
+    parser.add_argument('--max-upload-mb', type=float, default=DEFAULT_MAX_UPLOAD_BYTES / (1024 * 1024),
+                        help="Largest accepted upload (default: 4096)")
+    parser.add_argument('--cache-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Finished reports kept for repeated uploads (default: 2048)")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Do not add analysed uploads to the results database")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log = lambda message: print(message, flush=True)
+    service = ReportService(cache=ReportCache(max_bytes=int(args.cache_mb * 1024 * 1024)),
+                            max_jobs=max(1, args.jobs), store_results=not args.no_store, log=log)
+    # The job processes are started before any request thread exists
+    service.start()
+    server = PooledHTTPServer((args.host, args.port), service, threads=max(1, args.threads),
+                              max_upload_bytes=int(args.max_upload_mb * 1024 * 1024))
+    log(f"Serving reports on http://{args.host}:{server.server_address[1]}/")
+    # A service manager stops it with SIGTERM; the pool is shut down either way
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
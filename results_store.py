@@ -0,0 +1,403 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice, repeat
+import numpy as np
+import pandas as pd
+from data_cache import cache_root
+
+RESULTS_DB_FILENAME = "results.sqlite"
+
+SCHEMA_VERSION = 2
+
+# Rows per executemany; every batch is its own transaction, so parallel
+# batch workers writing to the same database take turns between batches
+# instead of waiting for a whole run
+INSERT_BATCH_ROWS = 50_000
+
+# Seconds a writer waits for another process's batch to commit
+BUSY_TIMEOUT_S = 120
+
+# Page cache of a connection; index pages stay in memory during bulk inserts
+CACHE_SIZE_KB = 64 * 1024
+
+LOADING = 'loading'
+COMPLETE = 'complete'
+
+# Retention: once the stored poses pass this, the oldest runs are deleted.
+# A pose takes about 100 bytes with its indexes and ligand name, so this
+# is about 2 GB; the newest run is always kept.
+DEFAULT_MAX_POSES = 20_000_000
+
+# A run still loading after this long belongs to a process that died
+STALE_RUN_HOURS = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    label TEXT NOT NULL,
+    created TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ranking TEXT,
+    output_dir TEXT,
+    rows INTEGER,
+    ligands INTEGER,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_fingerprint ON runs (fingerprint);
+CREATE TABLE IF NOT EXISTS ligands (
+    ligand_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS poses (
+    run_id INTEGER NOT NULL,
+    ligand_id INTEGER NOT NULL,
+    binding_affinity REAL,
+    rmsd_ub REAL,
+    rmsd_lb REAL,
+    pose INTEGER,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS poses_run ON poses (run_id, ligand_id);
+CREATE INDEX IF NOT EXISTS poses_ligand ON poses (ligand_id, binding_affinity);
+CREATE TABLE IF NOT EXISTS ligand_summary (
+    run_id INTEGER NOT NULL,
+    ligand_id INTEGER NOT NULL,
+    best_affinity REAL,
+    converged_affinity REAL,
+    mean_affinity REAL,
+    pose_count INTEGER NOT NULL,
+    PRIMARY KEY (ligand_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS summary_run_affinity ON ligand_summary (run_id, best_affinity);
+CREATE TABLE IF NOT EXISTS ligand_best (
+    ligand_id INTEGER PRIMARY KEY,
+    best_affinity REAL NOT NULL,
+    run_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS best_affinity ON ligand_best (best_affinity);
+CREATE INDEX IF NOT EXISTS best_run ON ligand_best (run_id);
+"""
+
+def default_db_path():
+    override = os.environ.get('DOCKING_RESULTS_DB')
+    if override:
+        return override
+    return os.path.join(cache_root(), RESULTS_DB_FILENAME)
+
+def column_values(frame, col, order, numeric=True):
+    # Plain Python values for executemany; NaN is bound as NULL by sqlite3
+    if col not in frame.columns:
+        return repeat(None)
+    series = frame[col]
+    if numeric:
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        values = series.astype(object).where(series.notna(), None).to_numpy()
+    return values[order].tolist()
+
+class RunWriter:
+    # Adds the poses of one analysis run. Summaries are computed in SQL by
+    # finish(); until then the run is 'loading' and queries leave it out.
+    def __init__(self, store, run_id):
+        self.store = store
+        self.run_id = run_id
+        self.rows = 0
+    
+    def add_poses(self, frame):
+        if 'ligand' not in frame.columns or frame.empty:
+            return
+        ligands = frame['ligand']
+        if isinstance(ligands.dtype, pd.CategoricalDtype):
+            codes = ligands.cat.codes.to_numpy()
+            names = ligands.cat.categories
+        else:
+            codes, names = pd.factorize(ligands)
+        # Rows without a ligand name cannot be looked up; they are left out
+        named = codes >= 0
+        ligand_ids = self.store.ligand_ids([str(name) for name in names])[codes[named]]
+        frame = frame[named] if not named.all() else frame
+        # Inserting in ligand order touches far fewer index pages
+        order = np.argsort(ligand_ids, kind='stable')
+        
+        pose = frame['pose'] if 'pose' in frame.columns else None
+        if pose is not None:
+            pose = pd.to_numeric(pose, errors='coerce').astype('Int64').astype(object)
+            pose = pose.where(pose.notna(), None).to_numpy()[order].tolist()
+        rows = zip(repeat(self.run_id), ligand_ids[order].tolist(),
+                   column_values(frame, 'binding_affinity', order), column_values(frame, 'rmsd_ub', order),
+                   column_values(frame, 'rmsd_lb', order), repeat(None) if pose is None else pose,
+                   column_values(frame, 'source', order, numeric=False))
+        
+        while True:
+            batch = list(islice(rows, INSERT_BATCH_ROWS))
+            if not batch:
+                break
+            with self.store.transaction() as conn:
+                conn.executemany("INSERT INTO poses VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            self.rows += len(batch)
+    
+    def finish(self):
+        with self.store.transaction() as conn:
+            conn.execute("""
+                INSERT INTO ligand_summary
+                SELECT run_id, ligand_id, MIN(binding_affinity),
+                       MIN(CASE WHEN rmsd_ub = 0 AND rmsd_lb = 0 THEN binding_affinity END),
+                       AVG(binding_affinity), COUNT(binding_affinity)
+                FROM poses WHERE run_id = ? GROUP BY ligand_id""", (self.run_id,))
+            ligand_count = conn.execute("SELECT COUNT(*) FROM ligand_summary WHERE run_id = ?",
+                                        (self.run_id,)).fetchone()[0]
+            # The cross-run best only moves when this run beats it, so top-k
+            # over every run stays an index scan of k rows
+            conn.execute("""
+                INSERT INTO ligand_best (ligand_id, best_affinity, run_id)
+                SELECT ligand_id, best_affinity, run_id FROM ligand_summary
+                WHERE run_id = ? AND best_affinity IS NOT NULL
+                ON CONFLICT (ligand_id) DO UPDATE
+                SET best_affinity = excluded.best_affinity, run_id = excluded.run_id
+                WHERE excluded.best_affinity < ligand_best.best_affinity""", (self.run_id,))
+            conn.execute("UPDATE runs SET status = ?, rows = ?, ligands = ? WHERE run_id = ?",
+                         (COMPLETE, self.rows, ligand_count, self.run_id))
+        return self.run_id
+    
+    def abort(self):
+        self.store.delete_run(self.run_id)
+
+class ResultsStore:
+    def __init__(self, path=None, max_poses=DEFAULT_MAX_POSES):
+        self.path = path or default_db_path()
+        self.max_poses = max_poses
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Autocommit; transactions are opened explicitly per batch
+        self.conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            with self.transaction() as conn:
+                # Read again under the write lock: another process opening
+                # the same database may have upgraded it in the meantime
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    if version == 1:
+                        conn.execute("ALTER TABLE runs ADD COLUMN fingerprint TEXT")
+                    for statement in SCHEMA.split(';'):
+                        if statement.strip():
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def close(self):
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    @contextmanager
+    def transaction(self):
+        # IMMEDIATE takes the write lock up front, so a busy database is
+        # waited for here instead of failing halfway through a batch
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+    
+    def ligand_ids(self, names):
+        # One id per name, in order; unknown names are added
+        with self.transaction() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_names (position INTEGER PRIMARY KEY, name TEXT)")
+            conn.execute("DELETE FROM batch_names")
+            conn.executemany("INSERT INTO batch_names VALUES (?, ?)", enumerate(names))
+            conn.execute("INSERT OR IGNORE INTO ligands (name) SELECT name FROM batch_names")
+            found = conn.execute("SELECT b.position, l.ligand_id FROM batch_names b "
+                                 "JOIN ligands l ON l.name = b.name").fetchall()
+            conn.execute("DELETE FROM batch_names")
+        ids = np.zeros(len(names), dtype=np.int64)
+        if found:
+            positions, values = zip(*found)
+            ids[list(positions)] = values
+        return ids
+    
+    def begin_run(self, source, label=None, ranking=None, output_dir=None, fingerprint=None):
+        if not isinstance(source, str):
+            source = os.pathsep.join(str(path) for path in source)
+        label = label or os.path.basename(os.path.normpath(source.split(os.pathsep)[0]))
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (source, label, created, status, ranking, output_dir, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, label, datetime.now().isoformat(timespec='seconds'), LOADING, ranking, output_dir,
+                 fingerprint))
+        return RunWriter(self, cursor.lastrowid)
+    
+    def find_run(self, fingerprint):
+        # The newest complete run of the same input, or None
+        row = self.conn.execute("SELECT MAX(run_id) FROM runs WHERE fingerprint = ? AND status = ?",
+                                (fingerprint, COMPLETE)).fetchone()
+        return row[0]
+    
+    def add_run(self, df, source, label=None, ranking=None, output_dir=None, fingerprint=None):
+        writer = self.begin_run(source, label, ranking, output_dir, fingerprint)
+        try:
+            writer.add_poses(df)
+            return writer.finish()
+        except BaseException:
+            writer.abort()
+            raise
+    
+    def delete_run(self, run_id):
+        with self.transaction() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS stale (ligand_id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM stale")
+            conn.execute("INSERT INTO stale SELECT ligand_id FROM ligand_best WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM ligand_best WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM ligand_summary WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM poses WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            # The best of the remaining runs for ligands whose best was in
+            # the deleted one (SQLite takes run_id from the MIN row)
+            conn.execute("""
+                INSERT INTO ligand_best (ligand_id, best_affinity, run_id)
+                SELECT ligand_id, MIN(best_affinity), run_id FROM ligand_summary
+                WHERE ligand_id IN (SELECT ligand_id FROM stale) AND best_affinity IS NOT NULL
+                GROUP BY ligand_id""")
+            conn.execute("DELETE FROM stale")
+    
+    def prune(self):
+        # Oldest first; returns the ids of the deleted runs
+        cutoff = (datetime.now() - timedelta(hours=STALE_RUN_HOURS)).isoformat(timespec='seconds')
+        deleted = [run_id for (run_id,) in self.conn.execute(
+            "SELECT run_id FROM runs WHERE status = ? AND created < ? ORDER BY run_id", (LOADING, cutoff))]
+        if self.max_poses is not None:
+            runs = self.conn.execute("SELECT run_id, rows FROM runs WHERE status = ? ORDER BY run_id DESC",
+                                     (COMPLETE,)).fetchall()
+            total = 0
+            for i, (run_id, rows) in enumerate(runs):
+                total += rows or 0
+                if i > 0 and total > self.max_poses:
+                    deleted.append(run_id)
+        for run_id in sorted(deleted):
+            self.delete_run(run_id)
+        return sorted(deleted)
+    
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.conn, params=params)
+    
+    def runs(self, limit=None):
+        sql = "SELECT run_id, label, created, status, rows, ligands, ranking, source FROM runs ORDER BY run_id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql)
+    
+    def top(self, k=10, run_id=None):
+        if run_id is None:
+            return self.query("""
+                SELECT l.name AS ligand, b.best_affinity, b.run_id, r.label
+                FROM ligand_best b JOIN ligands l USING (ligand_id) JOIN runs r USING (run_id)
+                ORDER BY b.best_affinity LIMIT ?""", (k,))
+        return self.query("""
+            SELECT l.name AS ligand, s.best_affinity, s.converged_affinity, s.mean_affinity, s.pose_count
+            FROM ligand_summary s JOIN ligands l USING (ligand_id)
+            WHERE s.run_id = ? AND s.best_affinity IS NOT NULL
+            ORDER BY s.best_affinity LIMIT ?""", (run_id, k))
+    
+    def history(self, ligand):
+        return self.query("""
+            SELECT s.run_id, r.label, r.created, s.best_affinity, s.converged_affinity, s.mean_affinity,
+                   s.pose_count
+            FROM ligands l JOIN ligand_summary s USING (ligand_id) JOIN runs r USING (run_id)
+            WHERE l.name = ?
+            ORDER BY s.run_id""", (ligand,))
+    
+    def poses(self, ligand, run_id=None):
+        sql = """
+            SELECT p.run_id, p.binding_affinity, p.rmsd_ub, p.rmsd_lb, p.pose, p.source
+            FROM ligands l JOIN poses p USING (ligand_id) JOIN runs r USING (run_id)
+            WHERE l.name = ? AND r.status = ?"""
+        params = [ligand, COMPLETE]
+        if run_id is not None:
+            sql += " AND p.run_id = ?"
+            params.append(run_id)
+        return self.query(sql + " ORDER BY p.binding_affinity", params)
+    
+    def diff(self, run_a, run_b, k=10):
+        # Ligands in both runs, largest change in best affinity first
+        # (negative delta = better in run_b), plus the ligands only one has
+        changed = self.query("""
+            SELECT l.name AS ligand, a.best_affinity AS affinity_a, b.best_affinity AS affinity_b,
+                   b.best_affinity - a.best_affinity AS delta
+            FROM ligand_summary a
+            JOIN ligand_summary b ON b.ligand_id = a.ligand_id AND b.run_id = ?
+            JOIN ligands l ON l.ligand_id = a.ligand_id
+            WHERE a.run_id = ? AND delta <> 0
+            ORDER BY ABS(delta) DESC LIMIT ?""", (run_b, run_a, k))
+        # The overlap comes from key lookups, the totals are kept with each run
+        common = self.conn.execute("""
+            SELECT COUNT(*) FROM ligand_summary a
+            JOIN ligand_summary b ON b.ligand_id = a.ligand_id AND b.run_id = ?
+            WHERE a.run_id = ?""", (run_b, run_a)).fetchone()[0]
+        sizes = dict(self.conn.execute("SELECT run_id, ligands FROM runs WHERE run_id IN (?, ?)", (run_a, run_b)))
+        return changed, {'only_in_a': (sizes.get(run_a) or 0) - common,
+                         'only_in_b': (sizes.get(run_b) or 0) - common}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Query docking results kept from earlier analysis runs.")
+    parser.add_argument('--db', default=None, help="Results database (default: results.sqlite in the cache "
+                                                   "directory, or $DOCKING_RESULTS_DB)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    runs = commands.add_parser('runs', help="List stored runs, newest first")
+    runs.add_argument('-n', '--limit', type=int, default=None)
+    
+    top = commands.add_parser('top', help="Best ligands over every run, or within one run")
+    top.add_argument('-k', type=int, default=10)
+    top.add_argument('--run', type=int, default=None, help="Only this run id")
+    
+    history = commands.add_parser('history', help="One ligand's results in every run")
+    history.add_argument('ligand')
+    history.add_argument('--poses', action='store_true', help="List every stored pose instead")
+    
+    diff = commands.add_parser('diff', help="Compare the per-ligand best affinity of two runs")
+    diff.add_argument('run_a', type=int)
+    diff.add_argument('run_b', type=int)
+    diff.add_argument('-k', type=int, default=20)
+    
+    delete = commands.add_parser('delete', help="Remove a run and its poses")
+    delete.add_argument('run_id', type=int)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    with ResultsStore(args.db) as store:
+        if args.command == 'runs':
+            result = store.runs(args.limit)
+        elif args.command == 'top':
+            result = store.top(args.k, args.run)
+        elif args.command == 'history':
+            result = store.poses(args.ligand) if args.poses else store.history(args.ligand)
+        elif args.command == 'diff':
+            result, counts = store.diff(args.run_a, args.run_b, args.k)
+            print(f"Only in run {args.run_a}: {counts['only_in_a']:,} ligands, "
+                  f"only in run {args.run_b}: {counts['only_in_b']:,} ligands")
+        else:
+            store.delete_run(args.run_id)
+            print(f"Deleted run {args.run_id}")
+            return 0
+    
+    print(result.to_string(index=False) if len(result) else "No results.")
+    print(f"({len(result)} rows, {(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
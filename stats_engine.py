@@ -0,0 +1,294 @@
+import numpy as np
+from dataset_memo import dataset_memo
+
+NUMERIC_COLUMNS = ['binding_affinity', 'rmsd_ub', 'rmsd_lb']
+
+HISTOGRAM_WIDTHS = {
+    'binding_affinity': 0.01,
+    'rmsd_ub': 0.01,
+    'rmsd_lb': 0.01
+}
+
+QUANTILES = (0.25, 0.50, 0.75)
+
+# Bin numbers are int64; values further out than this many bins from zero
+# cannot be placed and are left out of the histogram
+MAX_BIN_INDEX = 2 ** 62
+
+class FineHistogram:
+    # Fixed-width histogram that grows with the data range. When the range
+    # would need more than max_bins bins the width is doubled, so memory stays
+    # bounded while quantiles remain accurate to within one bin width.
+    def __init__(self, width=0.01, max_bins=1 << 16):
+        self.width = width
+        self.max_bins = max_bins
+        self.origin = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+    
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.abs(values) < self.width * MAX_BIN_INDEX]
+        if len(values) == 0:
+            return
+        
+        lo = int(np.floor(values.min() / self.width))
+        hi = int(np.floor(values.max() / self.width))
+        if len(self.counts):
+            lo = min(lo, self.origin)
+            hi = max(hi, self.origin + len(self.counts) - 1)
+        
+        while hi - lo + 1 > self.max_bins:
+            self._coarsen()
+            lo //= 2
+            hi //= 2
+        
+        self._extend(lo, hi)
+        idx = np.floor(values / self.width).astype(np.int64) - self.origin
+        np.clip(idx, 0, len(self.counts) - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+    
+    def _coarsen(self):
+        if self.origin % 2:
+            self.counts = np.concatenate(([0], self.counts))
+            self.origin -= 1
+        if len(self.counts) % 2:
+            self.counts = np.concatenate((self.counts, [0]))
+        self.counts = self.counts.reshape(-1, 2).sum(axis=1)
+        self.origin //= 2
+        self.width *= 2
+    
+    def _extend(self, lo, hi):
+        if not len(self.counts):
+            self.origin = lo
+            self.counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            return
+        
+        end = self.origin + len(self.counts) - 1
+        if lo < self.origin or hi > end:
+            grown = np.zeros(hi - lo + 1, dtype=np.int64)
+            grown[self.origin - lo:self.origin - lo + len(self.counts)] = self.counts
+            self.origin = lo
+            self.counts = grown
+    
+    def merge(self, other):
+        if not len(other.counts):
+            return
+        while other.width > self.width:
+            self._coarsen()
+        other = other.copy()
+        while other.width < self.width:
+            other._coarsen()
+        lo = other.origin
+        hi = other.origin + len(other.counts) - 1
+        self.add_counts(lo, hi, other.counts)
+    
+    def add_counts(self, lo, hi, counts):
+        if len(self.counts):
+            lo_all = min(lo, self.origin)
+            hi_all = max(hi, self.origin + len(self.counts) - 1)
+        else:
+            lo_all, hi_all = lo, hi
+        self._extend(lo_all, hi_all)
+        self.counts[lo - self.origin:hi - self.origin + 1] += counts
+    
+    def copy(self):
+        clone = FineHistogram(self.width, self.max_bins)
+        clone.origin = self.origin
+        clone.counts = self.counts.copy()
+        return clone
+    
+    @property
+    def total(self):
+        return int(self.counts.sum())
+    
+    def edges(self):
+        return (self.origin + np.arange(len(self.counts) + 1)) * self.width
+    
+    def quantile(self, q):
+        total = self.total
+        if total == 0:
+            return float('nan')
+        
+        cumulative = np.cumsum(self.counts)
+        target = q * total
+        i = int(np.searchsorted(cumulative, target, side='left'))
+        i = min(i, len(self.counts) - 1)
+        before = cumulative[i - 1] if i > 0 else 0
+        inside = self.counts[i]
+        fraction = (target - before) / inside if inside else 0.0
+        return float((self.origin + i + fraction) * self.width)
+    
+    def rebin(self, bins, value_range):
+        lo, hi = value_range
+        if hi <= lo:
+            hi = lo + self.width
+        coarse_edges = np.linspace(lo, hi, bins + 1)
+        if not len(self.counts):
+            return np.zeros(bins, dtype=np.int64), coarse_edges
+        
+        centers = (self.origin + np.arange(len(self.counts)) + 0.5) * self.width
+        idx = np.searchsorted(coarse_edges, centers, side='right') - 1
+        np.clip(idx, 0, bins - 1, out=idx)
+        counts = np.bincount(idx, weights=self.counts, minlength=bins)
+        return counts.astype(np.int64), coarse_edges
+
+class ColumnStats:
+    def __init__(self, width):
+        self.count = 0
+        self.nan_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.histogram = FineHistogram(width)
+        # Only filled for a single in-memory pass; merged results use the sketch.
+        # Exact histograms of in-memory frames come from binning.DatasetBins.
+        self.exact_quantiles = None
+    
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        # Infinities count with the missing values; they would make the
+        # mean, spread and range meaningless
+        finite = values[np.isfinite(values)]
+        self.nan_count += len(values) - len(finite)
+        if len(finite) == 0:
+            return
+        
+        chunk = ColumnStats(self.histogram.width)
+        chunk.count = len(finite)
+        chunk.mean = float(finite.mean())
+        chunk.m2 = float(((finite - chunk.mean) ** 2).sum())
+        chunk.min = float(finite.min())
+        chunk.max = float(finite.max())
+        self.merge_moments(chunk)
+        self.histogram.add(finite)
+        self.exact_quantiles = None
+    
+    @classmethod
+    def from_values(cls, values, width):
+        stats = cls(width)
+        values = np.asarray(values, dtype=np.float64)
+        stats.update(values)
+        finite = values[np.isfinite(values)]
+        if len(finite):
+            stats.exact_quantiles = dict(zip(QUANTILES, np.quantile(finite, QUANTILES).tolist()))
+        return stats
+    
+    def merge_moments(self, other):
+        # Chan et al. pairwise combination of (count, mean, M2)
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def merge(self, other):
+        self.merge_moments(other)
+        self.nan_count += other.nan_count
+        self.histogram.merge(other.histogram)
+        self.exact_quantiles = None
+    
+    @property
+    def std(self):
+        if self.count < 2:
+            return float('nan')
+        return (self.m2 / (self.count - 1)) ** 0.5
+    
+    def quantile(self, q):
+        if self.exact_quantiles is not None and q in self.exact_quantiles:
+            return self.exact_quantiles[q]
+        return min(max(self.histogram.quantile(q), self.min), self.max)
+    
+    def describe(self):
+        if self.count == 0:
+            nan = float('nan')
+            return {'count': 0, 'mean': nan, 'std': nan, 'min': nan,
+                    '25%': nan, '50%': nan, '75%': nan, 'max': nan}
+        
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            '25%': self.quantile(0.25),
+            '50%': self.quantile(0.50),
+            '75%': self.quantile(0.75),
+            'max': self.max
+        }
+    
+    def binned(self, bins=30):
+        return self.histogram.rebin(bins, (self.min, self.max))
+    
+    def box_stats(self):
+        stats = self.describe()
+        q1, q3 = stats['25%'], stats['75%']
+        iqr = q3 - q1
+        hist = self.histogram
+        edges = hist.edges()
+        occupied = np.nonzero(hist.counts)[0]
+        inside = occupied[(edges[occupied] >= q1 - 1.5 * iqr) & (edges[occupied + 1] <= q3 + 1.5 * iqr)]
+        whislo = max(float(edges[inside[0]]), self.min) if len(inside) else q1
+        whishi = min(float(edges[inside[-1] + 1]), self.max) if len(inside) else q3
+        return {
+            'med': stats['50%'],
+            'q1': q1,
+            'q3': q3,
+            'whislo': whislo,
+            'whishi': whishi,
+            'fliers': []
+        }
+
+class DatasetStats:
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+    
+    @classmethod
+    def from_frame(cls, df):
+        stats = cls()
+        stats.rows = len(df)
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                stats.columns[col] = ColumnStats.from_values(values, HISTOGRAM_WIDTHS[col])
+        return stats
+    
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col in NUMERIC_COLUMNS:
+            if col in chunk.columns:
+                if col not in self.columns:
+                    self.columns[col] = ColumnStats(HISTOGRAM_WIDTHS[col])
+                self.columns[col].update(chunk[col].to_numpy(dtype=np.float64, na_value=np.nan))
+    
+    def merge(self, other):
+        self.rows += other.rows
+        for col, column in other.columns.items():
+            if col not in self.columns:
+                self.columns[col] = ColumnStats(HISTOGRAM_WIDTHS[col])
+            self.columns[col].merge(column)
+        return self
+    
+    def has_column(self, col):
+        return col in self.columns
+    
+    def column(self, col):
+        return self.columns[col]
+    
+    def describe(self, col):
+        return self.columns[col].describe()
+    
+    def histogram(self, col, bins=30):
+        return self.columns[col].binned(bins)
+    
+    def box_stats(self, col):
+        return self.columns[col].box_stats()
+
+def dataset_stats(df, summary=None):
+    if summary is not None:
+        return summary.stats
+    return dataset_memo(df, 'stats', lambda: DatasetStats.from_frame(df))
\ No newline at end of file
@@ -0,0 +1,52 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_loader
+
+# Column names as written by the usual Vina post-processing scripts
+CSV_HEADER = ['Ligand', 'Binding Affinity', 'rmsd/ub', 'rmsd/lb']
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    # Caches, stage weights and the results database of a test stay in its
+    # own temporary directory
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv('DOCKING_CACHE_DIR', str(cache_dir))
+    monkeypatch.setenv('DOCKING_RESULTS_DB', str(cache_dir / "results.sqlite"))
+    monkeypatch.setattr(data_loader, '_default_cache', None)
+    return cache_dir
+
+def docking_frame(ligands=40, poses=3, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = ligands * poses
+    return pd.DataFrame({
+        'Ligand': np.repeat([f"lig_{i}" for i in range(ligands)], poses),
+        'Binding Affinity': np.round(rng.uniform(-12, -4, rows), 1),
+        'rmsd/ub': np.round(rng.uniform(0, 8, rows), 3),
+        'rmsd/lb': np.round(rng.uniform(0, 4, rows), 3)
+    })
+
+def write_csv(path, df=None, **frame_args):
+    (docking_frame(**frame_args) if df is None else df).to_csv(path, index=False)
+    return str(path)
+
+# An AutoDock Vina log result table
+VINA_LOG_TABLE = """mode |   affinity | dist from best mode
+     | (kcal/mol) | rmsd l.b.| rmsd u.b.
+-----+------------+----------+----------
+   1        {best:.1f}      0.000      0.000
+   2        -6.1      1.250      2.480
+   3        -5.8      2.011      3.900
+"""
+
+def write_vina_logs(directory, count=6, suffix='.txt'):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(directory, f"lig_{i}_log{suffix}"), 'w') as f:
+            f.write(VINA_LOG_TABLE.format(best=-7.0 - i / 10))
+    return str(directory)
\ No newline at end of file
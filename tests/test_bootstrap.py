@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import bootstrap
+from bootstrap import bootstrap_ranking, resample_best
+from conftest import docking_frame
+
+DRAWS = 200_000
+
+def test_resample_best_matches_drawing_with_replacement():
+    # Two ligands as runs of sorted poses, one with ties
+    values = np.array([-9.0, -8.5, -8.0, -7.0, -6.0, -7.5, -7.5, -7.0])
+    starts, counts = np.array([0, 5]), np.array([5, 3])
+    sampled = resample_best(np.random.default_rng(1), values, starts, counts, DRAWS)
+    
+    rng = np.random.default_rng(2)
+    for ligand, (start, count) in enumerate(zip(starts, counts)):
+        poses = values[start:start + count]
+        brute = rng.choice(poses, size=(DRAWS, count), replace=True).min(axis=1)
+        for value in np.unique(poses):
+            expected = np.mean(brute == value)
+            assert abs(np.mean(sampled[:, ligand] == value) - expected) < 0.005
+
+def test_single_pose_is_always_its_own_best():
+    values = np.array([-6.0])
+    best = resample_best(np.random.default_rng(0), values, np.array([0]), np.array([1]), 1000)
+    assert (best == -6.0).all()
+
+def test_pool_gives_the_same_result_as_one_worker(monkeypatch):
+    frame = docking_frame(ligands=300, poses=4)
+    frame.columns = ['ligand', 'binding_affinity', 'rmsd_ub', 'rmsd_lb']
+    serial = bootstrap_ranking(frame, iterations=350, seed=7, max_workers=1)
+    monkeypatch.setattr(bootstrap, 'POOL_MIN_DRAWS', 0)
+    pooled = bootstrap_ranking(frame, iterations=350, seed=7, max_workers=3)
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert serial.attrs == pooled.attrs == {'iterations': 350, 'seed': 7}
+    # A different seed draws differently
+    assert not bootstrap_ranking(frame, iterations=350, seed=8, max_workers=1).equals(serial)
\ No newline at end of file
@@ -0,0 +1,31 @@
+import os
+from conftest import write_csv
+import data_browser
+from data_browser import DatasetIndex, load_dataset, load_window
+
+def test_loads_compact_by_default(tmp_path):
+    df = load_dataset(write_csv(tmp_path / "screen.csv"))
+    assert str(df['ligand'].dtype) == 'category'
+    assert len(df) == 120
+
+def test_large_file_is_browsed_through_a_window(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "screen.csv")
+    calls = []
+    monkeypatch.setattr(data_browser, 'load_window', lambda source: calls.append(source))
+    load_dataset(path, streaming_threshold=os.path.getsize(path) - 1)
+    assert calls == [path]
+
+def test_window_notes_the_rows_left_out(tmp_path):
+    path = write_csv(tmp_path / "screen.csv")
+    df = load_window(path, rows=50)
+    assert len(df) == 50
+    assert str(df['binding_affinity'].dtype) == 'float32'
+    
+    view = DatasetIndex(df).query('binding_affinity')
+    assert "first 50 rows" in view.note
+    assert view.rows(0, 1)[0][1] == f"{df['binding_affinity'].min():g}"
+    assert load_window(path, rows=120).attrs == {}
+
+def test_small_file_has_no_note(tmp_path):
+    view = DatasetIndex(load_dataset(write_csv(tmp_path / "screen.csv"))).query()
+    assert view.note is None
\ No newline at end of file
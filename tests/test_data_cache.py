@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+from conftest import write_csv
+import data_cache
+from data_cache import DataCache, INDEX_FILENAME, LOCK_FILENAME, ORPHAN_GRACE_S
+from data_loader import DataLoader, MultiSourceLoader
+
+def _put_frame(cache_dir, path):
+    cache = DataCache(cache_dir)
+    cache.put(path, pd.DataFrame({'value': range(100)}))
+
+def cache_files(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name not in (INDEX_FILENAME, LOCK_FILENAME))
+
+def test_round_trip(tmp_path):
+    path = write_csv(tmp_path / "a.csv")
+    cache = DataCache(str(tmp_path / "data"))
+    df = pd.DataFrame({'value': [1, 2, 3]})
+    cache.put(path, df)
+    assert cache.get(path).equals(df)
+    
+    # An edit changes the fingerprint
+    time.sleep(0.01)
+    write_csv(tmp_path / "a.csv", seed=1)
+    assert cache.get(path) is None
+
+def test_concurrent_writers_keep_every_entry(tmp_path):
+    cache_dir = str(tmp_path / "data")
+    paths = [write_csv(tmp_path / f"{i}.csv", ligands=2, seed=i) for i in range(24)]
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_put_frame, [cache_dir] * len(paths), paths))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_put_frame, [cache_dir] * len(paths), paths))
+    
+    index = DataCache(cache_dir).read_index()
+    assert len(index) == len(paths)
+    assert sorted(entry['file'] for entry in index.values()) == cache_files(cache_dir)
+
+def test_multi_source_loader_records_every_file(tmp_path):
+    sources = tmp_path / "campaign"
+    sources.mkdir()
+    for i in range(16):
+        write_csv(sources / f"part_{i}.csv", ligands=5, seed=i)
+    df = MultiSourceLoader(str(sources), max_workers=4).load_data()
+    assert len(df) == 16 * 5 * 3
+    
+    cache = DataLoader(str(sources / "part_0.csv")).cache
+    assert len(cache.read_index()) == 16
+    assert len(cache_files(cache.cache_dir)) == 16
+
+def test_eviction_sweeps_files_without_an_entry(tmp_path):
+    cache_dir = str(tmp_path / "data")
+    os.makedirs(cache_dir)
+    stale = os.path.join(cache_dir, "lost.pickle")
+    fresh = os.path.join(cache_dir, "being_recorded.pickle")
+    for path in (stale, fresh):
+        with open(path, 'wb') as f:
+            f.write(b'x' * 1000)
+    old = time.time() - ORPHAN_GRACE_S - 60
+    os.utime(stale, (old, old))
+    
+    _put_frame(cache_dir, write_csv(tmp_path / "a.csv"))
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+
+def test_eviction_respects_max_bytes(tmp_path):
+    cache = DataCache(str(tmp_path / "data"))
+    paths = [write_csv(tmp_path / f"{i}.csv", seed=i) for i in range(3)]
+    cache.put(paths[0], pd.DataFrame({'value': range(1000)}))
+    # Room for one frame
+    cache.max_bytes = list(cache.read_index().values())[0]['bytes'] * 3 // 2
+    for path in paths[1:]:
+        cache.put(path, pd.DataFrame({'value': range(1000)}))
+    # Only the newest entry is left, and nothing else on disk
+    assert list(cache.read_index().values())[0]['source'] == os.path.abspath(paths[-1])
+    assert len(cache_files(cache.cache_dir)) == 1
+
+def test_a_miss_hashes_the_file_once(tmp_path, monkeypatch):
+    calls = []
+    content_hash = data_cache.content_hash
+    def counted(*args):
+        calls.append(args)
+        return content_hash(*args)
+    monkeypatch.setattr(data_cache, 'content_hash', counted)
+    path = write_csv(tmp_path / "a.csv")
+    loader = DataLoader(path, cache=DataCache(str(tmp_path / "data")))
+    loader.load_data()
+    assert len(calls) == 1
+    assert len(loader.cache.read_index()) == 1
+    # A hit reads only the cached frame
+    loader.load_data()
+    assert len(calls) == 2
+
+def test_importing_the_cache_does_not_load_pyarrow():
+    code = "import sys, data_cache; print('pyarrow' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(data_cache.__file__)))
+    assert result.stdout.strip() == "False"
\ No newline at end of file
@@ -0,0 +1,43 @@
+import os
+import numpy as np
+import pandas as pd
+from conftest import docking_frame, write_csv
+from batch_cli import expand_inputs
+from data_loader import DataLoader, is_multi_source, expand_sources, MultiSourceLoader
+from pipeline import AnalysisPipeline
+
+def test_brackets_in_a_file_name_are_not_a_glob(tmp_path):
+    path = write_csv(tmp_path / "screen[1].csv")
+    assert not is_multi_source(path)
+    assert expand_sources(path) == [path]
+    assert expand_inputs([path]) == [path]
+    
+    pipeline = AnalysisPipeline(path, str(tmp_path / "out"), store_results=False)
+    assert len(pipeline.load()) == 120
+
+def test_globs_and_directories_are_multi_source(tmp_path):
+    for i in range(3):
+        write_csv(tmp_path / f"part_{i}.csv", ligands=4, seed=i)
+    pattern = os.path.join(str(tmp_path), "part_*.csv")
+    assert is_multi_source(pattern)
+    assert is_multi_source(str(tmp_path))
+    assert len(expand_sources(pattern)) == 3
+    assert len(expand_inputs([pattern])) == 3
+    
+    df = MultiSourceLoader(pattern, max_workers=1).load_data()
+    assert len(df) == 3 * 4 * 3
+    assert sorted(df['source'].unique()) == ['part_0.csv', 'part_1.csv', 'part_2.csv']
+
+def test_compact_load_matches_the_standard_load(tmp_path):
+    df = docking_frame(ligands=200)
+    df['Receptor'] = 'receptor_a'
+    # Duplicates within and across chunks
+    path = write_csv(tmp_path / "screen.csv", pd.concat([df, df.iloc[::3], df.iloc[:40]], ignore_index=True))
+    full = DataLoader(path, cache=False).load_data()
+    compact = DataLoader(path, cache=False, compact=True).parse_csv_compact(chunksize=97)
+    assert len(compact) == len(full) == 600
+    assert str(compact['ligand'].dtype) == 'category'
+    assert compact['binding_affinity'].dtype == np.float32
+    assert compact.attrs['dropped_columns'] == ['Receptor']
+    assert compact['ligand'].astype(str).tolist() == full['ligand'].tolist()
+    np.testing.assert_allclose(compact['rmsd_ub'], full['rmsd_ub'], atol=1e-5)
\ No newline at end of file
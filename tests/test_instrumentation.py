@@ -0,0 +1,50 @@
+import json
+import os
+import threading
+import pytest
+from conftest import write_csv
+from instrumentation import RunMonitor, JobCancelled, TIMINGS_FILENAME
+from pipeline import AnalysisPipeline
+
+def test_failed_stage_is_recorded():
+    monitor = RunMonitor()
+    with monitor.stage('load'):
+        pass
+    with pytest.raises(RuntimeError):
+        with monitor.stage('plots'):
+            with monitor.timed('density'):
+                raise RuntimeError("drawing failed")
+    assert [(r['name'], r['parent'], r.get('failed', False)) for r in monitor.records] == \
+        [('load', None, False), ('density', 'plots', True), ('plots', None, True)]
+
+def test_write_does_not_raise(tmp_path):
+    monitor = RunMonitor()
+    path = tmp_path / TIMINGS_FILENAME
+    monitor.write(str(path), source=object())
+    assert not path.exists()
+    monitor.write(str(tmp_path / "missing" / TIMINGS_FILENAME))
+    monitor.write(str(path), rows=3)
+    assert json.loads(path.read_text())['details'] == {'rows': 3}
+
+def test_cancel_is_checked_between_stages():
+    cancel_event = threading.Event()
+    monitor = RunMonitor(cancel_event=cancel_event)
+    with monitor.stage('load'):
+        cancel_event.set()
+    with pytest.raises(JobCancelled):
+        with monitor.stage('plots'):
+            pass
+    assert [r['name'] for r in monitor.records] == ['load']
+
+def test_timings_of_a_failed_run_name_the_stage(tmp_path, monkeypatch):
+    import pipeline as pipeline_module
+    def fail(self, *args):
+        raise RuntimeError("drawing failed")
+    monkeypatch.setattr(pipeline_module.PDFGenerator, 'generate_pdf', fail)
+    pipeline = AnalysisPipeline(write_csv(tmp_path / "screen.csv"), str(tmp_path / "out"), store_results=False,
+                                render_profile='draft')
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    with open(os.path.join(pipeline.output_dir, TIMINGS_FILENAME), encoding='utf-8') as f:
+        stages = {r['name']: r.get('failed', False) for r in json.load(f)['stages'] if r['parent'] is None}
+    assert stages == {'load': False, 'plots': False, 'pdf': True}
\ No newline at end of file
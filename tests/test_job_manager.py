@@ -0,0 +1,55 @@
+import queue
+import time
+import pytest
+from conftest import write_csv
+from job_manager import JobManager, ACTIVE_STATES, DONE
+from main import DockingAnalyzerApp, QUEUE_POLL_MS
+
+JOB_TIMEOUT_S = 120
+
+def test_updates_arrive_on_a_plain_queue(tmp_path):
+    # Nothing but put() is called from the pool's threads
+    task_queue = queue.Queue()
+    jobs = JobManager(task_queue, max_jobs=1)
+    try:
+        job = jobs.submit(write_csv(tmp_path / "screen.csv"), output_dir=str(tmp_path / "out"),
+                          store_results=False, render_profile='draft', bootstrap_iterations=20)
+        states = []
+        deadline = time.monotonic() + JOB_TIMEOUT_S
+        while not states or states[-1] in ACTIVE_STATES:
+            message = task_queue.get(timeout=max(deadline - time.monotonic(), 0.1))
+            assert message[0] == 'job_update' and message[1] == job.job_id
+            states.append(message[2])
+        assert states[-1] == DONE
+    finally:
+        jobs.shutdown()
+
+class StubRoot:
+    def __init__(self):
+        self.scheduled = []
+    
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+
+def test_queue_is_drained_on_the_tk_thread_and_polling_survives_errors():
+    app = DockingAnalyzerApp.__new__(DockingAnalyzerApp)
+    app.root = StubRoot()
+    app.task_queue = queue.Queue()
+    received = []
+    def job_updated(*args):
+        if args[0] == 'broken':
+            raise RuntimeError("handler failed")
+        received.append(args)
+    app.job_updated = job_updated
+    
+    app.task_queue.put(('job_update', 1, DONE, 100, "Analysis completed!"))
+    app.task_queue.put(('job_update', 2, DONE, 100, "Analysis completed!"))
+    app.check_queue()
+    assert [args[0] for args in received] == [1, 2]
+    assert app.root.scheduled == [(QUEUE_POLL_MS, app.check_queue)]
+    
+    # Tk reports the error; the next poll is already scheduled
+    app.task_queue.put(('job_update', 'broken', DONE, 100, ""))
+    with pytest.raises(RuntimeError):
+        app.check_queue()
+    assert len(app.root.scheduled) == 2
\ No newline at end of file
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from conftest import docking_frame
+from ligand_index import LigandIndex, BEST_POSE, RAW_POSES
+from pdf_generator import PDFGenerator
+
+def frame(converged=True):
+    df = docking_frame(ligands=300, poses=5)
+    df.columns = ['ligand', 'binding_affinity', 'rmsd_ub', 'rmsd_lb']
+    if converged:
+        # The first pose of every ligand is the converged one
+        df.loc[::5, ['rmsd_ub', 'rmsd_lb']] = 0.0
+    df.loc[7, 'binding_affinity'] = np.nan
+    return df
+
+@pytest.mark.parametrize('converged', [True, False])
+def test_raw_poses_are_the_best_candidate_poses(converged):
+    df = frame(converged)
+    pool = df[(df['rmsd_ub'] == 0) & (df['rmsd_lb'] == 0)] if converged else df
+    expected = pool['binding_affinity'].dropna().sort_values(kind='stable').head(10)
+    top = LigandIndex.for_frame(df).top(10, RAW_POSES)
+    assert top['binding_affinity'].tolist() == expected.tolist()
+
+@pytest.mark.parametrize('converged', [True, False])
+def test_best_pose_ranks_each_ligand_once(converged):
+    df = frame(converged)
+    pool = df[(df['rmsd_ub'] == 0) & (df['rmsd_lb'] == 0)] if converged else df
+    expected = pool.groupby('ligand')['binding_affinity'].min().sort_values(kind='stable').head(25)
+    top = LigandIndex.for_frame(df).top(25, BEST_POSE)
+    assert top['ligand'].is_unique
+    assert top['binding_affinity'].tolist() == expected.tolist()
+    assert (top['pose_count'] == df.groupby('ligand')['binding_affinity'].count()[top['ligand']].to_numpy()).all()
+
+def test_report_ranks_through_the_ligand_index(tmp_path):
+    df = frame()
+    for ranking in (BEST_POSE, RAW_POSES):
+        generator = PDFGenerator(df, [], str(tmp_path), ["a.csv", "b.csv"], ranking=ranking)
+        assert generator.get_top_ligands().equals(LigandIndex.for_frame(df).top(10, ranking))
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import threading
+import pytest
+from conftest import write_csv
+from data_loader import DataLoader
+from instrumentation import JobCancelled, RunMonitor
+from pdf_generator import PDFGenerator
+from plot_cache import PlotCache
+from plot_generator import PlotGenerator
+
+def build_report(tmp_path, profile='draft', cache=None):
+    csv_path = write_csv(tmp_path / "screen.csv")
+    df = DataLoader(csv_path, cache=False).load_data()
+    plots_dir = str(tmp_path / "plots")
+    os.makedirs(plots_dir, exist_ok=True)
+    plot_files = PlotGenerator(df, plots_dir, cache=cache, profile=profile).generate_all_plots()
+    return PDFGenerator(df, plot_files, plots_dir, csv_path, bootstrap_iterations=50)
+
+def embedded_images(pdf_path):
+    with open(pdf_path, 'rb') as f:
+        return f.read().count(b'/Subtype /Image')
+
+def test_image_directory_removed_on_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / "tmp"))
+    os.makedirs(tempfile.tempdir)
+    generator = build_report(tmp_path)
+    
+    def fail(*args):
+        raise RuntimeError("drawing failed")
+    monkeypatch.setattr(generator, 'add_appendix', fail)
+    generator.appendix = 10
+    with pytest.raises(Exception, match="drawing failed"):
+        generator.generate_pdf(str(tmp_path / "report.pdf"))
+    assert os.listdir(tempfile.tempdir) == []
+
+def test_cancel_is_not_reported_as_a_failure(tmp_path):
+    generator = build_report(tmp_path)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(JobCancelled):
+        generator.generate_pdf(str(tmp_path / "report.pdf"), RunMonitor(cancel_event=cancel_event))
+
+@pytest.mark.parametrize('profile', ['vector', 'svg'])
+def test_vector_profiles_embed_previews(tmp_path, profile):
+    generator = build_report(tmp_path, profile, cache=PlotCache())
+    generator.generate_pdf(str(tmp_path / "report.pdf"))
+    assert embedded_images(tmp_path / "report.pdf") == len(generator.plot_files)
+    
+    # Plots from the cache bring their previews along
+    again = tmp_path / "again"
+    again.mkdir()
+    cached = build_report(again, profile, cache=PlotCache())
+    assert len(PlotCache().read_index()) == len(generator.plot_files)
+    cached.generate_pdf(str(again / "report.pdf"))
+    assert embedded_images(again / "report.pdf") == len(cached.plot_files)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import pytest
+from conftest import docking_frame
+from data_loader import normalize_columns
+from plot_generator import PlotGenerator, PLOT_METHODS
+
+def normalized_frame(**frame_args):
+    df = docking_frame(**frame_args)
+    df.columns = normalize_columns(list(df.columns))
+    return df
+
+@pytest.mark.parametrize('lod_threshold', [None, 10])
+def test_all_plots_render(tmp_path, lod_threshold):
+    generator = PlotGenerator(normalized_frame(), str(tmp_path), lod_threshold=lod_threshold, profile='draft')
+    plot_files = generator.generate_all_plots()
+    assert len(plot_files) == len(PLOT_METHODS)
+    assert all(os.path.exists(os.path.join(tmp_path, filename)) for filename, _ in plot_files)
+
+@pytest.mark.parametrize('method', ['generate_3d_scatter', 'generate_affinity_vs_rmsd_ub',
+                                    'generate_affinity_vs_rmsd_lb', 'generate_pairwise_plot'])
+def test_density_view_without_rmsd_values(tmp_path, method):
+    # Above the LOD threshold with empty RMSD columns there is nothing to bin
+    df = normalized_frame()
+    df['rmsd_ub'] = np.nan
+    df['rmsd_lb'] = np.nan
+    generator = PlotGenerator(df, str(tmp_path), lod_threshold=10, profile='draft')
+    filename, _ = getattr(generator, method)()
+    assert os.path.exists(os.path.join(tmp_path, filename))
+@pytest.mark.parametrize('profile, extension, magic', [('vector', '.pdf', b'%PDF'), ('svg', '.svg', b'<?xml')])
+def test_vector_profiles(tmp_path, profile, extension, magic):
+    generator = PlotGenerator(normalized_frame(), str(tmp_path), profile=profile)
+    filename, _ = generator.generate_binding_distribution()
+    assert filename.endswith(extension)
+    with open(os.path.join(tmp_path, filename), 'rb') as f:
+        assert f.read(16).startswith(magic)
+
+def test_pairwise_diagonal_counts_rows_with_all_three_values(tmp_path, monkeypatch):
+    df = normalized_frame()
+    df.loc[:29, 'rmsd_lb'] = np.nan
+    generator = PlotGenerator(df, str(tmp_path), profile='draft')
+    drawn = {}
+    def record(ax, col, bins=30, rows=None, **kwargs):
+        drawn[col] = generator.bins.histogram(col, bins, rows)[0]
+    monkeypatch.setattr(generator, 'draw_histogram', record)
+    generator.generate_pairwise_plot()
+    complete = df.dropna()
+    for col in ['binding_affinity', 'rmsd_ub', 'rmsd_lb']:
+        assert drawn[col].sum() == len(complete)
+        edges = generator.bins.edges(col, 20)
+        assert drawn[col].tolist() == np.histogram(complete[col], edges)[0].tolist()
\ No newline at end of file
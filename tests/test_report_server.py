@@ -0,0 +1,102 @@
+import http.client
+import json
+import socket
+import threading
+import time
+import pytest
+from conftest import docking_frame
+from job_manager import ACTIVE_STATES, DONE
+from report_server import PooledHTTPServer, ReportCache, ReportService
+
+# An analysis with few resamples and draft plots takes a few seconds
+JOB_TIMEOUT_S = 120
+OPTIONS = "profile=draft&bootstrap=20"
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    root = tmp_path_factory.mktemp("server")
+    # Module-scoped fixtures run outside the per-test cache directory; the
+    # job processes are forked with one of their own
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('DOCKING_CACHE_DIR', str(root / "cache"))
+        service = ReportService(cache=ReportCache(str(root / "reports")), work_dir=str(root / "work"),
+                                max_jobs=1, store_results=False, log=lambda message: None)
+        service.start()
+        httpd = PooledHTTPServer(('127.0.0.1', 0), service, threads=4, max_upload_bytes=1024 * 1024)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        yield httpd
+        httpd.shutdown()
+        httpd.server_close()
+        service.shutdown()
+
+def request(server, method, path, body=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=JOB_TIMEOUT_S)
+    try:
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        data = response.read()
+        if response.getheader('Content-Type') == 'application/json':
+            data = json.loads(data)
+        return response.status, data
+    finally:
+        conn.close()
+
+def upload(server, csv_bytes, options=OPTIONS):
+    return request(server, 'POST', f"/jobs?name=screen.csv&{options}", csv_bytes)
+
+def wait_done(server, key):
+    deadline = time.monotonic() + JOB_TIMEOUT_S
+    while time.monotonic() < deadline:
+        status, payload = request(server, 'GET', f"/jobs/{key}")
+        assert status == 200
+        if payload['state'] not in ACTIVE_STATES:
+            return payload
+        time.sleep(0.2)
+    raise AssertionError(f"Job {key} did not finish")
+
+@pytest.fixture(scope='module')
+def finished(server):
+    csv_bytes = docking_frame().to_csv(index=False).encode()
+    status, payload = upload(server, csv_bytes)
+    assert status == 202
+    return csv_bytes, wait_done(server, payload['job'])
+
+def test_report_and_plots_are_served(server, finished):
+    _, payload = finished
+    assert payload['state'] == DONE
+    status, pdf = request(server, 'GET', payload['report'])
+    assert status == 200 and pdf.startswith(b'%PDF')
+    assert payload['plots']
+    status, image = request(server, 'GET', payload['plots'][0])
+    assert status == 200 and image.startswith(b'\x89PNG')
+
+def test_identical_upload_is_answered_from_the_cache(server, finished):
+    csv_bytes, payload = finished
+    status, again = upload(server, csv_bytes)
+    assert status == 200
+    assert again['job'] == payload['job'] and again['state'] == DONE
+    # Other options are another job
+    status, other = upload(server, csv_bytes, OPTIONS + "&ranking=raw_poses")
+    assert other['job'] != payload['job']
+    wait_done(server, other['job'])
+
+def test_paths_outside_the_report_are_not_served(server, finished):
+    key = finished[1]['job']
+    for path in (f"/jobs/{key}/plots/..%2F..%2Findex.json", f"/jobs/{key}/plots/../report",
+                 "/jobs/..%2F..%2Fetc/report", f"/jobs/{key}/upload"):
+        status, _ = request(server, 'GET', path)
+        assert status == 404, path
+
+def test_bad_requests(server):
+    status, payload = upload(server, b"Ligand\n", "profile=sketch")
+    assert status == 400 and "profile" in payload['error']
+    status, _ = request(server, 'GET', f"/jobs/{'0' * 64}")
+    assert status == 404
+
+def test_truncated_upload_is_rejected(server):
+    with socket.create_connection(server.server_address, timeout=10) as sock:
+        sock.sendall(b"POST /jobs?name=screen.csv HTTP/1.1\r\nHost: test\r\nContent-Length: 1000\r\n\r\n"
+                     b"Ligand,Binding Affinity\n")
+        sock.shutdown(socket.SHUT_WR)
+        response = sock.makefile('rb').readline()
+    assert response.split()[1] == b'400'
\ No newline at end of file
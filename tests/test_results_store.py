@@ -0,0 +1,151 @@
+import json
+import os
+import sqlite3
+import pandas as pd
+import pytest
+from conftest import write_csv
+from instrumentation import TIMINGS_FILENAME
+from pipeline import AnalysisPipeline
+from results_store import ResultsStore, COMPLETE, LOADING
+
+def poses(rows):
+    return pd.DataFrame(rows, columns=['ligand', 'binding_affinity', 'rmsd_ub', 'rmsd_lb'])
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultsStore(str(tmp_path / "results.sqlite")) as store:
+        yield store
+
+def test_finish_writes_the_summaries(store):
+    writer = store.begin_run("/screens/a.csv")
+    writer.add_poses(poses([('a', -7.0, 0, 0), ('a', -8.0, 1.2, 0.8), ('b', -6.0, 0, 0)]))
+    # Loading runs are left out of queries
+    assert store.poses('a').empty
+    
+    run_id = writer.finish()
+    run = store.runs().iloc[0]
+    assert (run['status'], run['rows'], run['ligands']) == (COMPLETE, 3, 2)
+    top = store.top(run_id=run_id)
+    assert top['ligand'].tolist() == ['a', 'b']
+    assert top.iloc[0][['best_affinity', 'converged_affinity', 'mean_affinity', 'pose_count']].tolist() == \
+        [-8.0, -7.0, -7.5, 2]
+
+def test_delete_run_restores_the_best_of_the_others(store):
+    first = store.add_run(poses([('a', -7.0, 0, 0), ('b', -9.0, 0, 0)]), "/screens/a.csv")
+    second = store.add_run(poses([('a', -8.0, 0, 0)]), "/screens/b.csv")
+    assert store.top()[['ligand', 'run_id']].values.tolist() == [['b', first], ['a', second]]
+    
+    store.delete_run(second)
+    assert store.top()[['ligand', 'best_affinity', 'run_id']].values.tolist() == \
+        [['b', -9.0, first], ['a', -7.0, first]]
+    assert store.history('a')['run_id'].tolist() == [first]
+    assert store.poses('a', run_id=second).empty
+
+def test_diff(store):
+    first = store.add_run(poses([('a', -7.0, 0, 0), ('b', -9.0, 0, 0), ('c', -5.0, 0, 0)]), "/screens/a.csv")
+    second = store.add_run(poses([('a', -8.5, 0, 0), ('b', -9.0, 0, 0), ('d', -6.0, 0, 0)]), "/screens/b.csv")
+    changed, counts = store.diff(first, second)
+    # Unchanged ligands are not listed
+    assert changed[['ligand', 'delta']].values.tolist() == [['a', -1.5]]
+    assert counts == {'only_in_a': 1, 'only_in_b': 1}
+
+def test_prune_keeps_the_newest_runs(store):
+    store.max_poses = 5
+    runs = [store.add_run(poses([(f'lig_{i}', -7.0, 0, 0)] * 2), f"/screens/{i}.csv") for i in range(4)]
+    stale = store.begin_run("/screens/crashed.csv").run_id
+    store.conn.execute("UPDATE runs SET created = '2000-01-01T00:00:00' WHERE run_id = ?", (stale,))
+    
+    assert store.prune() == runs[:2] + [stale]
+    assert store.runs()['run_id'].tolist() == [runs[3], runs[2]]
+    assert store.top()['ligand'].tolist() == ['lig_2', 'lig_3']
+
+def test_version_1_database_is_upgraded(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE runs (run_id INTEGER PRIMARY KEY, source TEXT NOT NULL, label TEXT NOT NULL,
+                           created TEXT NOT NULL, status TEXT NOT NULL, ranking TEXT, output_dir TEXT,
+                           rows INTEGER, ligands INTEGER);
+        INSERT INTO runs VALUES (1, '/screens/a.csv', 'a.csv', '2026-01-01T00:00:00', 'complete', NULL, NULL, 0, 0);
+        PRAGMA user_version = 1;""")
+    conn.close()
+    with ResultsStore(path) as store:
+        store.add_run(poses([('a', -7.0, 0, 0)]), "/screens/b.csv", fingerprint="b")
+        assert store.find_run("b") == 2
+
+def test_upgrade_by_another_process_is_not_repeated(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE runs (run_id INTEGER PRIMARY KEY, source TEXT NOT NULL, label TEXT NOT NULL,
+                           created TEXT NOT NULL, status TEXT NOT NULL, ranking TEXT, output_dir TEXT,
+                           rows INTEGER, ligands INTEGER);
+        PRAGMA user_version = 1;""")
+    conn.close()
+    
+    class Stale(sqlite3.Connection):
+        # Sees the version from before the other process upgraded the database
+        def execute(self, sql, *args):
+            if sql == "PRAGMA user_version" and not hasattr(self, 'checked'):
+                self.checked = True
+                ResultsStore(path).close()
+                return super().execute("SELECT 1")
+            return super().execute(sql, *args)
+    connect = sqlite3.connect
+    def connect_once(*args, **kwargs):
+        monkeypatch.setattr(sqlite3, 'connect', connect)
+        return connect(*args, factory=Stale, **kwargs)
+    monkeypatch.setattr(sqlite3, 'connect', connect_once)
+    with ResultsStore(path) as store:
+        store.add_run(poses([('a', -7.0, 0, 0)]), "/screens/a.csv", fingerprint="a")
+        assert store.find_run("a") == 1
+
+def analyze(tmp_path, csv_path, name):
+    pipeline = AnalysisPipeline(csv_path, str(tmp_path / name), render_profile='draft', bootstrap_iterations=20)
+    pipeline.run()
+    with open(os.path.join(pipeline.output_dir, TIMINGS_FILENAME), encoding='utf-8') as f:
+        return pipeline, json.load(f)['details']
+
+def test_unchanged_input_is_stored_once(tmp_path):
+    csv_path = write_csv(tmp_path / "screen.csv")
+    first, details = analyze(tmp_path, csv_path, "first")
+    assert details['results_store'] == "stored"
+    second, details = analyze(tmp_path, csv_path, "second")
+    assert details['results_store'] == "already stored"
+    assert second.run_id == first.run_id
+    
+    write_csv(csv_path, seed=1)
+    os.utime(csv_path, ns=(0, os.stat(csv_path).st_mtime_ns + 10**9))
+    third, _ = analyze(tmp_path, csv_path, "third")
+    assert third.run_id != first.run_id
+
+def test_failed_report_removes_its_run(tmp_path, monkeypatch):
+    import pipeline as pipeline_module
+    def fail(self, *args):
+        raise RuntimeError("drawing failed")
+    monkeypatch.setattr(pipeline_module.PDFGenerator, 'generate_pdf', fail)
+    with pytest.raises(RuntimeError):
+        analyze(tmp_path, write_csv(tmp_path / "screen.csv"), "out")
+    with ResultsStore() as store:
+        assert store.runs().empty
+
+def test_broken_database_does_not_stop_the_report(tmp_path, monkeypatch):
+    # A directory where the database file should be
+    os.makedirs(tmp_path / "results.sqlite")
+    monkeypatch.setenv('DOCKING_RESULTS_DB', str(tmp_path / "results.sqlite"))
+    pipeline, details = analyze(tmp_path, write_csv(tmp_path / "screen.csv"), "out")
+    assert os.path.exists(pipeline.pdf_path)
+    assert details['results_store'].startswith("failed: OperationalError")
+    assert pipeline.run_id is None
+
+def test_store_errors_leave_no_run(tmp_path, monkeypatch):
+    import results_store
+    def fail(self, frame):
+        raise sqlite3.OperationalError("database or disk is full")
+    monkeypatch.setattr(results_store.RunWriter, 'add_poses', fail)
+    pipeline, details = analyze(tmp_path, write_csv(tmp_path / "screen.csv"), "out")
+    assert os.path.exists(pipeline.pdf_path)
+    assert details['results_store'] == "failed: OperationalError: database or disk is full"
+    with ResultsStore() as store:
+        assert store.query("SELECT * FROM runs WHERE status = ?", (LOADING,)).empty
+        assert store.runs().empty
\ No newline at end of file
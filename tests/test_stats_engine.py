@@ -0,0 +1,30 @@
+import numpy as np
+from conftest import docking_frame
+from stats_engine import ColumnStats, DatasetStats, FineHistogram
+
+def test_infinities_are_counted_as_missing():
+    stats = ColumnStats.from_values(np.array([-7.0, np.inf, -8.0, np.nan, -np.inf]), 0.01)
+    assert (stats.count, stats.nan_count) == (2, 3)
+    described = stats.describe()
+    assert (described['mean'], described['min'], described['max'], described['50%']) == (-7.5, -8.0, -7.0, -7.5)
+
+def test_streamed_stats_skip_infinities():
+    df = docking_frame(ligands=20)
+    df.columns = ['ligand', 'binding_affinity', 'rmsd_ub', 'rmsd_lb']
+    broken = df.copy()
+    broken.loc[[3, 7], 'binding_affinity'] = [np.inf, -np.inf]
+    stats = DatasetStats()
+    for chunk in np.array_split(np.arange(len(broken)), 4):
+        stats.update(broken.iloc[chunk])
+    column = stats.column('binding_affinity')
+    expected = df['binding_affinity'].drop([3, 7])
+    assert (column.count, column.nan_count) == (len(expected), 2)
+    assert np.isclose(column.mean, expected.mean())
+    assert column.histogram.total == len(expected)
+
+def test_histogram_ignores_values_it_cannot_bin():
+    histogram = FineHistogram(0.01)
+    histogram.add([-7.0, -8.0])
+    histogram.add([1e300, np.inf, np.nan])
+    assert histogram.total == 2
+    assert np.isfinite(histogram.edges()).all()
\ No newline at end of file
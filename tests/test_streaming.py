@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from aggregates import SeenHashes
+from conftest import docking_frame, write_csv
+from data_loader import DataLoader
+from ligand_index import BEST_POSE, RAW_POSES
+from stats_engine import dataset_stats
+from watch import WatchSession
+
+def test_seen_hashes_keep_first_occurrences_only():
+    rng = np.random.default_rng(0)
+    seen = SeenHashes()
+    reference = set()
+    # Enough batches for the sorted runs to be merged several times
+    for size in rng.integers(1, 400, 60):
+        hashes = rng.integers(0, 2000, size).astype(np.uint64)
+        expected = []
+        for value in hashes.tolist():
+            expected.append(value not in reference)
+            reference.add(value)
+        assert seen.filter_new(hashes).tolist() == expected
+    assert len(seen) == len(reference)
+
+def screen_with_duplicates(tmp_path):
+    df = docking_frame(ligands=200)
+    # Repeats within a chunk and across chunks
+    df = pd.concat([df, df.iloc[:50], df.iloc[300:420], df.iloc[::7]], ignore_index=True)
+    return write_csv(tmp_path / "screen.csv", df.sample(frac=1, random_state=0))
+
+def test_streaming_drops_the_same_duplicates_as_a_full_load(tmp_path):
+    path = screen_with_duplicates(tmp_path)
+    full = DataLoader(path, cache=False).load_data()
+    summary = DataLoader(path, cache=False).stream_data(chunksize=97, sample_size=50)
+    assert summary.count == len(full) == 600
+    
+    expected = dataset_stats(full).describe('binding_affinity')
+    streamed = summary.describe('binding_affinity')
+    for key in ('count', 'mean', 'std', 'min', 'max'):
+        assert streamed[key] == pytest.approx(expected[key])
+    assert len(summary.sample) == 50
+
+@pytest.mark.parametrize('ranking', [RAW_POSES, BEST_POSE])
+def test_streamed_top_ligands_match_a_full_load(tmp_path, ranking):
+    path = screen_with_duplicates(tmp_path)
+    loader = DataLoader(path, cache=False)
+    full = loader.get_top_ligands(loader.load_data(), k=10, ranking=ranking)
+    streamed = loader.stream_data(chunksize=97, top_k=10).top_ligands(ranking)
+    assert streamed['binding_affinity'].tolist() == full['binding_affinity'].tolist()
+def test_equal_numbers_written_differently_are_duplicates(tmp_path):
+    path = tmp_path / "screen.csv"
+    path.write_text("Ligand,Binding Affinity,rmsd/ub,rmsd/lb\n"
+                    "A,-7.0,0,0\nA,-7.00,0,0\nA,-7,0.000,0.0\nB,-6.5,1.0,2\nB,-6.50,1,2.000\nB,-6.5,1.5,2\n")
+    loader = DataLoader(str(path), cache=False)
+    full = loader.load_data()
+    assert len(full) == 3
+    assert len(DataLoader(str(path), cache=False, compact=True).load_data()) == 3
+    summary = loader.stream_data(chunksize=2)
+    assert summary.count == 3
+    assert summary.describe('binding_affinity')['mean'] == pytest.approx(full['binding_affinity'].mean())
+    
+    watch = WatchSession(str(path), str(tmp_path / "out"), log=lambda message: None)
+    assert watch.poll() == 3
\ No newline at end of file
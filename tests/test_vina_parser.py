@@ -0,0 +1,45 @@
+import json
+import os
+from conftest import write_vina_logs
+from instrumentation import TIMINGS_FILENAME
+from pdf_generator import PDFGenerator
+from pipeline import AnalysisPipeline
+from vina_parser import VinaLoader, is_vina_directory, scan_vina_files
+
+def test_text_logs_are_a_vina_directory(tmp_path):
+    directory = write_vina_logs(tmp_path / "docked")
+    assert is_vina_directory(directory)
+    df = VinaLoader(directory, cache=False).load_data()
+    assert df['ligand'].nunique() == 6
+    assert len(df) == 18
+
+def test_other_text_files_are_not_logs(tmp_path):
+    directory = tmp_path / "docking"
+    directory.mkdir()
+    (directory / "conf.txt").write_text("receptor = rec.pdbqt\nexhaustiveness = 8\n")
+    (directory / "README.txt").write_text("Screen of the kinase set\n")
+    assert not is_vina_directory(str(directory))
+    
+    write_vina_logs(directory, count=2)
+    assert scan_vina_files(str(directory)).keys() == {"lig_0_log.txt", "lig_1_log.txt"}
+
+def test_unparsable_files_are_reported(tmp_path):
+    directory = write_vina_logs(tmp_path / "docked")
+    with open(os.path.join(directory, "broken_out.pdbqt"), 'w') as f:
+        f.write("MODEL 1\nREMARK VINA RESULT:  n/a  0.000  0.000\nENDMDL\n")
+    
+    output_dir = str(tmp_path / "out")
+    pipeline = AnalysisPipeline(directory, output_dir, store_results=False, bootstrap_iterations=20)
+    pipeline.run()
+    assert list(pipeline.unparsed_files) == ["broken_out.pdbqt"]
+    with open(os.path.join(output_dir, TIMINGS_FILENAME), encoding='utf-8') as f:
+        details = json.load(f)['details']
+    assert list(details['unparsed_files']) == ["broken_out.pdbqt"]
+    assert details['unparsed_files']["broken_out.pdbqt"].startswith("ValueError")
+
+def test_cover_note_names_unparsable_files(tmp_path):
+    failed = {f"<pose_{i}>.pdbqt": "ValueError" for i in range(8)}
+    generator = PDFGenerator(None, [], str(tmp_path), str(tmp_path), unparsed_files=failed)
+    note = generator.unparsed_note()
+    assert note.count("&lt;pose_") == 5
+    assert "8 result file(s)" in note and "3 more" in note
\ No newline at end of file
@@ -0,0 +1,41 @@
+from conftest import docking_frame, write_csv, write_vina_logs
+from data_loader import MultiSourceLoader
+from watch import WatchSession
+
+def session(tmp_path, source):
+    return WatchSession(str(source), str(tmp_path / "out"), log=lambda message: None)
+
+def test_vina_results_in_a_directory_that_started_empty(tmp_path):
+    source = tmp_path / "docking"
+    source.mkdir()
+    watch = session(tmp_path, source)
+    assert watch.poll() == 0
+    
+    write_vina_logs(source, count=4)
+    assert watch.poll() == 12
+    assert watch.vina
+    assert watch.aggregates.count == 12
+
+def test_csvs_in_a_directory_that_started_empty(tmp_path):
+    source = tmp_path / "screen"
+    source.mkdir()
+    watch = session(tmp_path, source)
+    assert watch.poll() == 0
+    
+    write_csv(source / "part_0.csv", ligands=5)
+    assert watch.poll() == 15
+    assert not watch.vina
+    # A second file joins the CSV tails of the running session
+    write_csv(source / "part_1.csv", ligands=5, seed=1)
+    assert watch.poll() == 15
+    assert len(watch.tails) == 2
+
+def test_identical_rows_in_two_files_are_kept_like_merge(tmp_path):
+    source = tmp_path / "screen"
+    source.mkdir()
+    frame = docking_frame(ligands=5)
+    write_csv(source / "part_0.csv", frame)
+    write_csv(source / "part_1.csv", frame)
+    watch = session(tmp_path, source)
+    merged = MultiSourceLoader(str(source), cache=False, use_processes=False).load_data()
+    assert watch.poll() == len(merged) == 30
\ No newline at end of file
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data_cache import DiskCache, cache_root
+
+# Bump whenever the parsers' output changes so cached scans are ignored
+VINA_CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+PDBQT_SUFFIXES = ('.pdbqt',)
+# Logs saved as text keep the log in their name; other .txt files in a
+# docking folder (conf.txt, README.txt) are not results
+LOG_SUFFIXES = ('.log', '_log.txt', '.log.txt')
+NAME_SUFFIXES = ('_out', '_log', '.out', '.log')
+
+RESULT_TAG = b'REMARK VINA RESULT:'
+TABLE_RULE = b'-----+'
+
+def default_vina_cache_dir():
+    return os.path.join(cache_root(), "vina")
+
+def ligand_name(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    for suffix in NAME_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def parse_pdbqt(data):
+    # One "REMARK VINA RESULT:  affinity  rmsd_lb  rmsd_ub" line per MODEL.
+    # Only those lines are sliced out of the buffer; the atom records are
+    # skipped by find() without creating a Python object per line.
+    values = []
+    start = data.find(RESULT_TAG)
+    while start != -1:
+        end = data.find(b'\n', start)
+        fields = data[start + len(RESULT_TAG):end if end != -1 else len(data)].split()
+        values.extend((float(fields[0]), float(fields[1]), float(fields[2])))
+        start = data.find(RESULT_TAG, end) if end != -1 else -1
+    return values
+
+def parse_log(data):
+    # The result table follows the "-----+------------+..." rule:
+    #    1       -7.5      0.000      0.000
+    values = []
+    start = data.find(TABLE_RULE)
+    if start == -1:
+        return values
+    for line in data[data.find(b'\n', start) + 1:].splitlines():
+        fields = line.split()
+        if len(fields) < 4 or not fields[0].isdigit():
+            break
+        values.extend((float(fields[1]), float(fields[2]), float(fields[3])))
+    return values
+
+def parse_vina_file(path):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        values = parse_pdbqt(data) if path.lower().endswith(PDBQT_SUFFIXES) else parse_log(data)
+        return values, None
+    except (OSError, ValueError, IndexError) as e:
+        return [], f"{type(e).__name__}: {e}"
+
+def scan_vina_files(directory):
+    # Iterative scandir: the DirEntry stat is free on Windows and one call
+    # per file elsewhere, and it gives the mtime/size the cache is keyed on
+    found = {}
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                lower = entry.name.lower()
+                is_pdbqt = lower.endswith(PDBQT_SUFFIXES)
+                if not is_pdbqt and not lower.endswith(LOG_SUFFIXES):
+                    continue
+                stat = entry.stat()
+                found[os.path.relpath(entry.path, directory)] = (stat.st_mtime_ns, stat.st_size, is_pdbqt)
+    
+    # A docked pose file and its log carry the same table; the pose file wins
+    pdbqt_keys = {(os.path.dirname(rel), ligand_name(rel)) for rel, info in found.items() if info[2]}
+    return {rel: info[:2] for rel, info in sorted(found.items())
+            if info[2] or (os.path.dirname(rel), ligand_name(rel)) not in pdbqt_keys}
+
+def is_vina_directory(path):
+    if not isinstance(path, str) or not os.path.isdir(path):
+        return False
+    pending = [path]
+    has_results = False
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith('.csv'):
+                    return False
+                elif entry.name.lower().endswith(PDBQT_SUFFIXES + LOG_SUFFIXES):
+                    has_results = True
+    return has_results
+
+class VinaCache(DiskCache):
+    # One entry per scanned directory: {relative path: (mtime_ns, size, values)}
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir or default_vina_cache_dir(), max_bytes)
+    
+    def key(self, directory):
+        payload = {'directory': os.path.abspath(directory), 'version': VINA_CACHE_VERSION}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    def get(self, directory):
+        key = self.key(directory)
+        entry = self.read_index().get(key)
+        if entry is None:
+            return {}
+        try:
+            with open(os.path.join(self.cache_dir, entry['file']), 'rb') as f:
+                files = pickle.load(f)
+        except Exception:
+            self.drop_entry(key)
+            return {}
+        self.touch_entry(key)
+        return files
+    
+    def put(self, directory, files):
+        key = self.key(directory)
+        filename = f"{key}.pickle"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(files, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, os.path.join(self.cache_dir, filename))
+        except OSError:
+            return
+        
+        self.add_entry(key, {
+            'file': filename,
+            'source': os.path.abspath(directory),
+            'bytes': os.path.getsize(os.path.join(self.cache_dir, filename)),
+            'last_used': time.time()
+        })
+
+class VinaLoader:
+    def __init__(self, directory, cache=True, max_workers=None):
+        self.directory = directory
+        self.cache = VinaCache() if cache is True else (cache or None)
+        self.max_workers = max_workers
+        self.parsed = 0
+        self.reused = 0
+        self.failed = {}
+    
+    def parse_files(self, rel_paths):
+        paths = [os.path.join(self.directory, rel) for rel in rel_paths]
+        workers = min(self.max_workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            return [parse_vina_file(path) for path in paths]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(parse_vina_file, paths,
+                                     chunksize=max(1, len(paths) // (workers * 8))))
+    
+    def scan(self):
+        found = scan_vina_files(self.directory)
+        cached = self.cache.get(self.directory) if self.cache is not None else {}
+        
+        files = {}
+        changed = []
+        for rel, (mtime_ns, size) in found.items():
+            previous = cached.get(rel)
+            if previous is not None and previous[0] == mtime_ns and previous[1] == size:
+                files[rel] = previous
+            else:
+                changed.append(rel)
+        
+        self.failed = {}
+        for rel, (values, error) in zip(changed, self.parse_files(changed)):
+            if error is not None:
+                self.failed[rel] = error
+                continue
+            files[rel] = found[rel] + (values,)
+        
+        self.parsed = len(changed) - len(self.failed)
+        self.reused = len(files) - self.parsed
+        if self.cache is not None and (changed or len(files) != len(cached)):
+            self.cache.put(self.directory, files)
+        return files
+    
+    def load_data(self):
+        files = self.scan()
+        rel_paths = [rel for rel in sorted(files) if files[rel][2]]
+        if not rel_paths:
+            raise ValueError(f"No Vina results found in {self.directory}")
+        
+        counts = np.array([len(files[rel][2]) // 3 for rel in rel_paths])
+        values = np.fromiter((v for rel in rel_paths for v in files[rel][2]), dtype=np.float64,
+                             count=int(counts.sum()) * 3).reshape(-1, 3)
+        file_codes = np.repeat(np.arange(len(rel_paths)), counts)
+        
+        names, name_codes = np.unique([ligand_name(rel) for rel in rel_paths], return_inverse=True)
+        df = pd.DataFrame({
+            'ligand': pd.Categorical.from_codes(name_codes[file_codes], categories=names),
+            'binding_affinity': values[:, 0],
+            'rmsd_ub': values[:, 2],
+            'rmsd_lb': values[:, 1],
+            'pose': np.arange(len(file_codes)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        })
+        
+        # Receptor-per-folder layouts reuse ligand names; keep them apart
+        folders = [os.path.dirname(rel) for rel in rel_paths]
+        if len(set(folders)) > 1:
+            folder_names, folder_codes = np.unique(folders, return_inverse=True)
+            df['source'] = pd.Categorical.from_codes(folder_codes[file_codes], categories=folder_names)
+        return df
\ No newline at end of file
@@ -0,0 +1,125 @@
+import tkinter as tk
+from tkinter import ttk
+
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_COLUMN_WIDTH = 110
+
+class RowListSource:
+    # A handful of rows already in memory (e.g. the first lines of a CSV)
+    def __init__(self, columns, rows):
+        self.columns = list(columns)
+        self.data = [tuple(row) for row in rows]
+    
+    def __len__(self):
+        return len(self.data)
+    
+    def rows(self, start, count):
+        return self.data[start:start + count]
+
+class VirtualTable(ttk.Frame):
+    # A Treeview that only ever holds the rows that fit on screen. Scrolling
+    # moves a window over the source, which needs len(), .columns and
+    # .rows(start, count); a page is formatted when it is shown.
+    def __init__(self, parent, on_sort=None, height=8):
+        super().__init__(parent)
+        self.on_sort = on_sort
+        self.source = RowListSource([], [])
+        self.offset = 0
+        self.visible = height
+        self.sort_column = None
+        self.descending = False
+        
+        self.tree = ttk.Treeview(self, height=height, show="headings", selectmode="browse")
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        for key, step in [("<Up>", -1), ("<Down>", 1)]:
+            self.tree.bind(key, lambda event, step=step: self.scroll_rows(step) or "break")
+        self.tree.bind("<Prior>", lambda event: self.scroll_rows(-self.visible) or "break")
+        self.tree.bind("<Next>", lambda event: self.scroll_rows(self.visible) or "break")
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda event: self.scroll_to(len(self.source)) or "break")
+    
+    def set_source(self, source, keep_position=False):
+        if list(source.columns) != list(self.source.columns):
+            self.tree["columns"] = list(source.columns)
+            for col in source.columns:
+                self.tree.heading(col, text=self.heading_text(col), command=lambda c=col: self.heading_clicked(c))
+                self.tree.column(col, width=DEFAULT_COLUMN_WIDTH, stretch=True)
+        self.source = source
+        self.scroll_to(self.offset if keep_position else 0)
+    
+    def set_sort_marker(self, column, descending):
+        self.sort_column = column
+        self.descending = descending
+        for col in self.source.columns:
+            self.tree.heading(col, text=self.heading_text(col))
+    
+    def heading_text(self, col):
+        if col != self.sort_column:
+            return col
+        return f"{col} {'▼' if self.descending else '▲'}"
+    
+    def heading_clicked(self, col):
+        if self.on_sort is not None:
+            descending = not self.descending if col == self.sort_column else False
+            self.on_sort(col, descending)
+    
+    def row_height(self):
+        height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            return int(height) or DEFAULT_ROW_HEIGHT
+        except (TypeError, ValueError):
+            return DEFAULT_ROW_HEIGHT
+    
+    def on_resize(self, event):
+        # The heading takes roughly one row
+        visible = max(1, event.height // self.row_height() - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+    
+    def on_mouse_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+    
+    def scroll_rows(self, count):
+        self.scroll_to(self.offset + count)
+    
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.source) - self.visible))
+        self.refresh()
+    
+    def yview(self, *args):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.source)))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll_rows(int(args[1]) * step)
+    
+    def refresh(self):
+        rows = self.source.rows(self.offset, self.visible)
+        items = self.tree.get_children()
+        for item in items[len(rows):]:
+            self.tree.delete(item)
+        for i, row in enumerate(rows):
+            if i < len(items):
+                self.tree.item(items[i], values=row)
+            else:
+                self.tree.insert("", "end", values=row)
+        
+        total = len(self.source)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
\ No newline at end of file
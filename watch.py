@@ -0,0 +1,243 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import traceback
+import pandas as pd
+from aggregates import RunningAggregates, SeenHashes
+from data_loader import normalize_columns, expand_sources, ingest_chunk
+from pdf_generator import PDFGenerator
+from plot_generator import PlotGenerator, PLOT_METHODS, RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+from plot_cache import PlotCache
+from pipeline import REPORT_FILENAME
+from ligand_index import BEST_POSE, RANKING_MODES
+from vina_parser import VinaLoader, scan_vina_files, is_vina_directory, ligand_name
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_DEBOUNCE = 10.0
+# Under a steady stream of rows the report is still refreshed this often
+DEFAULT_MAX_WAIT = 120.0
+
+# New bytes are parsed in blocks of this size, so a large backlog (the first
+# poll of an existing file) is ingested with bounded memory
+READ_BLOCK_SIZE = 64 * 1024 * 1024
+
+class SourceReset(Exception):
+    pass
+
+class CsvTail:
+    # Follows an appending CSV by byte offset. Only complete lines are parsed;
+    # a partially written last line is kept until its newline arrives.
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.names = None
+        self.pending = b''
+        # Rows are deduplicated within each file, as MultiSourceLoader does
+        self.seen = SeenHashes()
+    
+    def read_new(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self.offset:
+            raise SourceReset(f"{self.path} was truncated or replaced")
+        if size == self.offset:
+            return
+        
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            while True:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                self.offset += len(block)
+                data = self.pending + block
+                cut = data.rfind(b'\n') + 1
+                self.pending = data[cut:]
+                lines = data[:cut]
+                
+                if self.names is None and lines:
+                    header_end = lines.find(b'\n') + 1
+                    header = next(csv.reader([lines[:header_end].decode('utf-8-sig', errors='replace')]))
+                    self.names = normalize_columns(header)
+                    lines = lines[header_end:]
+                if lines.strip():
+                    # Read like DataLoader.stream_data; ingest_chunk parses
+                    # the numeric columns before dedup
+                    yield pd.read_csv(io.BytesIO(lines), header=None, names=self.names, dtype=str)
+
+class VinaTail:
+    # Picks up result files that are new or rewritten since the last poll
+    def __init__(self, directory):
+        self.directory = directory
+        self.known = {}
+        self.seen = SeenHashes()
+    
+    def read_new(self):
+        found = scan_vina_files(self.directory)
+        if any(rel not in found for rel in self.known):
+            raise SourceReset(f"Result files were removed from {self.directory}")
+        changed = [rel for rel, info in found.items() if self.known.get(rel) != info]
+        if not changed:
+            return
+        
+        results = VinaLoader(self.directory, cache=False).parse_files(changed)
+        ligands, values, poses, folders = [], [], [], []
+        for rel, (file_values, error) in zip(changed, results):
+            if error is not None:
+                # Most likely still being written; retried on the next poll
+                continue
+            self.known[rel] = found[rel]
+            count = len(file_values) // 3
+            ligands.extend([ligand_name(rel)] * count)
+            poses.extend(range(1, count + 1))
+            # Identical results from different receptor folders are not duplicates
+            folders.extend([os.path.dirname(rel)] * count)
+            values.extend(file_values)
+        if ligands:
+            yield pd.DataFrame({
+                'ligand': ligands,
+                'binding_affinity': values[0::3],
+                'rmsd_ub': values[2::3],
+                'rmsd_lb': values[1::3],
+                'pose': poses,
+                'source': folders
+            })
+
+class WatchSession:
+    def __init__(self, source, output_dir, ranking=BEST_POSE, render_profile=DEFAULT_RENDER_PROFILE,
+                 sample_size=100_000, log=print):
+        self.source = source
+        self.output_dir = output_dir
+        self.plots_dir = os.path.join(output_dir, "plots")
+        self.pdf_path = os.path.join(output_dir, REPORT_FILENAME)
+        self.ranking = ranking
+        self.render_profile = render_profile
+        self.sample_size = sample_size
+        self.log = log
+        # Plots whose inputs did not change since the last update come out
+        # of the plot cache instead of being drawn again
+        self.plot_cache = PlotCache()
+        self.plot_keys = {}
+        self.updates = 0
+        self.reset()
+    
+    def reset(self):
+        self.aggregates = RunningAggregates(sample_size=self.sample_size)
+        self.tails = {}
+        self.vina = False
+    
+    def current_tails(self):
+        # A watched directory may still be empty when the session starts, so
+        # the kind of input is decided again until some input has been found
+        if not self.tails:
+            self.vina = is_vina_directory(self.source)
+        if self.vina:
+            if not self.tails:
+                self.tails[self.source] = VinaTail(self.source)
+        elif os.path.isdir(self.source):
+            for path in expand_sources(self.source):
+                if path not in self.tails:
+                    self.tails[path] = CsvTail(path)
+        elif self.source not in self.tails:
+            self.tails[self.source] = CsvTail(self.source)
+        return list(self.tails.values())
+    
+    def poll(self):
+        # Returns the number of new, non-duplicate rows taken in
+        try:
+            added = 0
+            for tail in self.current_tails():
+                for chunk in tail.read_new():
+                    added += ingest_chunk(self.aggregates, chunk, tail.seen)
+            return added
+        except SourceReset as e:
+            self.log(f"{e}; starting over")
+            self.reset()
+            return self.poll()
+    
+    def update_report(self):
+        start = time.perf_counter()
+        os.makedirs(self.plots_dir, exist_ok=True)
+        
+        summary = self.aggregates
+        generator = PlotGenerator(summary.sample, self.plots_dir, summary=summary, cache=self.plot_cache,
+                                  profile=self.render_profile)
+        keys = generator.cache_keys()
+        changed = [name for name in PLOT_METHODS if keys.get(name) != self.plot_keys.get(name)]
+        plot_files = generator.generate_all_plots()
+        self.plot_keys = keys
+        
+        # Written next to the report and swapped in, so a viewer never sees
+        # a half-written file; a report locked by a viewer is kept until the next update
+        tmp_path = self.pdf_path + ".tmp"
+        PDFGenerator(summary.sample, plot_files, self.plots_dir, self.source, summary=summary,
+                     ranking=self.ranking).generate_pdf(tmp_path)
+        try:
+            os.replace(tmp_path, self.pdf_path)
+        except OSError as e:
+            self.log(f"Could not replace {self.pdf_path}: {e}")
+        
+        self.updates += 1
+        self.log(f"Update {self.updates}: {summary.count:,} rows, {len(changed)} of {len(PLOT_METHODS)} plots "
+                 f"changed, report written in {time.perf_counter() - start:.1f}s")
+    
+    def run(self, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE, max_wait=DEFAULT_MAX_WAIT,
+            once=False):
+        first_change = last_change = None
+        while True:
+            added = self.poll()
+            now = time.monotonic()
+            if added:
+                self.log(f"+{added:,} new rows ({self.aggregates.count:,} total)")
+                last_change = now
+                first_change = first_change or now
+            
+            settled = last_change is not None and now - last_change >= debounce
+            overdue = first_change is not None and now - first_change >= max_wait
+            if once or settled or overdue:
+                if self.aggregates.count:
+                    try:
+                        self.update_report()
+                    except Exception:
+                        self.log(f"Report update failed:\n{traceback.format_exc()}")
+                first_change = last_change = None
+                if once:
+                    return
+            time.sleep(interval)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Keep a docking report up to date while results are still being written.")
+    parser.add_argument('source', help="An appending CSV, a directory of CSVs or a directory of Vina results")
+    parser.add_argument('-o', '--output-dir', required=True, help="Directory for the report and plots")
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between checks for new data (default: 2)")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help="Update the report once no new rows arrived for this many seconds (default: 10)")
+    parser.add_argument('--max-wait', type=float, default=DEFAULT_MAX_WAIT,
+                        help="Update at least this often while rows keep arriving (default: 120)")
+    parser.add_argument('--ranking', choices=RANKING_MODES, default=BEST_POSE)
+    parser.add_argument('--profile', choices=sorted(RENDER_PROFILES), default='draft',
+                        help="Plot render profile (default: draft)")
+    parser.add_argument('--once', action='store_true',
+                        help="Ingest what is there, write the report and exit")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    session = WatchSession(args.source, args.output_dir, ranking=args.ranking, render_profile=args.profile,
+                           log=lambda message: print(message, flush=True))
+    try:
+        session.run(args.interval, args.debounce, args.max_wait, once=args.once)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file